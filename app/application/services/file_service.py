@@ -1,19 +1,112 @@
+import hashlib
 import os
+import tempfile
+from contextlib import suppress
+from dataclasses import dataclass
 from uuid import uuid4
-from fastapi import UploadFile
-from typing import Optional
+from fastapi import HTTPException, UploadFile
+from typing import Any, Dict, Optional
+
+import aiofiles
+import aiofiles.os
+import anyio
+from PIL import Image
+
+from app.config import MAX_FILE_SIZE, UPLOAD_CHUNK_SIZE
+from app.infrastructure.images.derivatives import image_metadata
+from app.infrastructure.storage.backend import storage as default_storage
+from app.infrastructure.storage.base import Storage
+
+# Сигнатуры (magic bytes) допустимых форматов изображений и расширение сохраняемого файла
+_IMAGE_SIGNATURES = (
+    (b"\xff\xd8\xff", ".jpg"),
+    (b"\x89PNG\r\n\x1a\n", ".png"),
+    (b"GIF87a", ".gif"),
+    (b"GIF89a", ".gif"),
+)
+
+
+def detect_image_extension(header: bytes) -> Optional[str]:
+    """Расширение по первым байтам файла; None - не изображение поддерживаемого формата"""
+    for signature, extension in _IMAGE_SIGNATURES:
+        if header.startswith(signature):
+            return extension
+    if header[:4] == b"RIFF" and header[8:12] == b"WEBP":
+        return ".webp"
+    return None
+
+
+@dataclass
+class UploadedImage:
+    path: str  # путь файла в хранилище
+    metadata: Dict[str, Any]  # размеры и заглушка, см. image_metadata
+
 
 class FileService:
-    def __init__(self, upload_dir: str = "uploads"):
-        self.upload_dir = upload_dir
-        os.makedirs(self.upload_dir, exist_ok=True)
-
-    async def save_upload(self, file: Optional[UploadFile]) -> Optional[str]:
-        if file and file.filename:
-            ext = os.path.splitext(file.filename)[1]
-            unique_name = f"product_{uuid4().hex}{ext}"
-            file_path = os.path.join(self.upload_dir, unique_name)
-            with open(file_path, "wb") as f:
-                f.write(await file.read())
-            return unique_name
-        return None 
\ No newline at end of file
+    def __init__(self, storage: Storage = default_storage, max_size: int = MAX_FILE_SIZE):
+        self.storage = storage
+        self.max_size = max_size
+        # Временный файл пишется рядом с файлами хранилища (перенос - атомарный rename)
+        # или, для удаленного хранилища, во временный каталог системы
+        self.tmp_dir = storage.local_directory or tempfile.gettempdir()
+
+    @staticmethod
+    def content_path(digest: str, extension: str) -> str:
+        """Путь файла по хешу содержимого: ab/cd/abcd....jpg (не больше 256 подкаталогов на уровень)"""
+        return f"{digest[:2]}/{digest[2:4]}/{digest}{extension}"
+
+    async def save_upload(self, file: Optional[UploadFile]) -> Optional[UploadedImage]:
+        """Потоковое сохранение изображения; возвращает путь файла в хранилище,
+        размеры и превью-заглушку.
+
+        Файл читается частями и пишется во временный файл без блокировки event loop,
+        загрузка прерывается сразу при превышении max_size. Тип определяется по
+        сигнатуре, а не по имени: расширение берется из нее. Имя файла - SHA-256
+        содержимого, поэтому повторная загрузка того же изображения дает тот же
+        путь и URL, а второй копии в хранилище не появляется. Размеры и заглушка
+        считываются из временного файла, и файл, который Pillow не открывает,
+        отклоняется. Готовый файл переносится в хранилище целиком, недописанный -
+        удаляется.
+        """
+        if not file or not file.filename:
+            return None
+        tmp_path = os.path.join(self.tmp_dir, f".{uuid4().hex}.part")
+        digest = hashlib.sha256()
+        extension: Optional[str] = None
+        size = 0
+        try:
+            async with aiofiles.open(tmp_path, "wb") as out:
+                while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                    if extension is None:
+                        extension = detect_image_extension(chunk)
+                        if extension is None:
+                            raise HTTPException(status_code=400, detail="Допустимы только изображения JPEG, PNG, GIF и WebP")
+                    size += len(chunk)
+                    if size > self.max_size:
+                        raise HTTPException(
+                            status_code=413,
+                            detail=f"Файл слишком большой (максимум {self.max_size // (1024 * 1024)} МБ)"
+                        )
+                    digest.update(chunk)
+                    await out.write(chunk)
+            if extension is None:
+                raise HTTPException(status_code=400, detail="Файл изображения пуст")
+            try:
+                metadata = await anyio.to_thread.run_sync(image_metadata, tmp_path)
+            except (OSError, ValueError, Image.DecompressionBombError):
+                raise HTTPException(status_code=400, detail="Файл поврежден или не является изображением")
+            file_name = self.content_path(digest.hexdigest(), extension)
+            # Такое изображение уже загружено - используется существующий файл.
+            # Время изменения обновляется, чтобы сборщик мусора не удалил его до сохранения продукта
+            if await anyio.to_thread.run_sync(self.storage.touch, file_name):
+                await aiofiles.os.remove(tmp_path)
+            else:
+                await anyio.to_thread.run_sync(self.storage.put_file, tmp_path, file_name)
+            return UploadedImage(file_name, metadata)
+        except BaseException:
+            with suppress(FileNotFoundError):
+                await aiofiles.os.remove(tmp_path)
+            raise
+
+
+file_service = FileService()
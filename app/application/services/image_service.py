@@ -0,0 +1,84 @@
+import asyncio
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence, Set
+
+from app.config import IMAGE_DERIVATIVE_WIDTHS, IMAGE_WORKERS
+from app.infrastructure.database.database import AsyncSessionLocal
+from app.infrastructure.images.derivatives import generate_stored_derivatives
+from app.infrastructure.storage.backend import storage
+from app.infrastructure.storage.base import Storage
+from app.infrastructure.repositories.async_crud import get_image_variants_by_path, set_product_image_variants
+
+logger = logging.getLogger(__name__)
+
+
+class ImageDerivativeService:
+    """Генерация уменьшенных копий изображений продуктов в пуле процессов.
+
+    Масштабирование и кодирование WebP/JPEG занимают CPU на сотни миллисекунд,
+    поэтому выполняются в отдельных процессах и после ответа на запрос загрузки:
+    до готовности копий страницы показывают исходное изображение.
+    """
+
+    def __init__(self, max_workers: int, widths: Sequence[int], storage: Storage):
+        self.max_workers = max_workers
+        self.widths = tuple(widths)
+        self.storage = storage
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._tasks: Set[asyncio.Task] = set()
+        self._in_flight: Dict[str, asyncio.Future] = {}
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # spawn: дочерний процесс не наследует потоки и соединения с БД родителя
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._executor
+
+    async def generate(self, file_name: str) -> List[Dict[str, Any]]:
+        """Копии файла; одновременные запросы одного файла ждут одну генерацию"""
+        future = self._in_flight.get(file_name)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = loop.run_in_executor(
+                self._get_executor(), generate_stored_derivatives, self.storage, file_name, self.widths
+            )
+            self._in_flight[file_name] = future
+            future.add_done_callback(lambda _: self._in_flight.pop(file_name, None))
+        return await asyncio.shield(future)
+
+    async def process_product_image(self, product_id: int, file_name: str) -> None:
+        async with AsyncSessionLocal() as db:
+            # Тот же файл у другого продукта: копии уже есть на диске
+            variants = await get_image_variants_by_path(db, file_name)
+        if variants is None:
+            variants = await self.generate(file_name)
+        async with AsyncSessionLocal() as db:
+            await set_product_image_variants(db, product_id, file_name, variants)
+
+    async def _process_logged(self, product_id: int, file_name: str) -> None:
+        try:
+            await self.process_product_image(product_id, file_name)
+        except Exception:
+            logger.exception("Ошибка генерации копий изображения %s продукта %s", file_name, product_id)
+
+    def schedule(self, product_id: int, file_name: Optional[str]) -> None:
+        """Фоновая генерация копий; вызывается после сохранения продукта"""
+        if not file_name:
+            return
+        task = asyncio.create_task(self._process_logged(product_id, file_name))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def stop(self) -> None:
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+
+image_service = ImageDerivativeService(IMAGE_WORKERS, IMAGE_DERIVATIVE_WIDTHS, storage)
@@ -0,0 +1,88 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict
+from passlib.context import CryptContext
+
+from app.config import PASSWORD_HASH_WORKERS
+
+# Настройка шифрования паролей
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+
+class PasswordService:
+    """Хеширование и проверка паролей bcrypt в отдельном пуле потоков.
+
+    Один вызов bcrypt блокирует поток на 100-300 мс, поэтому он не должен
+    выполняться в event loop. Число воркеров ограничивает параллелизм,
+    остальные вызовы ждут в очереди пула.
+    """
+
+    def __init__(self, max_workers: int):
+        self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="password-hash")
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._running = 0
+        self._completed = 0
+        self._peak_queue_depth = 0
+
+    async def hash(self, password: str) -> str:
+        return await self._submit(pwd_context.hash, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._submit(pwd_context.verify, plain_password, hashed_password)
+
+    def stats(self) -> Dict[str, int]:
+        """Метрики пула: глубина очереди, выполняющиеся и завершённые задачи"""
+        with self._lock:
+            return {
+                "max_workers": self.max_workers,
+                "queue_depth": self._queued,
+                "running": self._running,
+                "completed": self._completed,
+                "peak_queue_depth": self._peak_queue_depth,
+            }
+
+    async def _submit(self, func: Callable[..., Any], *args: Any) -> Any:
+        job = _Job()
+        with self._lock:
+            self._queued += 1
+            self._peak_queue_depth = max(self._peak_queue_depth, self._queued)
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(self._executor, self._run, job, func, args)
+        finally:
+            # Ожидающая задача отменена до старта воркера - задание не покинет очередь само
+            self._dequeue(job)
+
+    def _dequeue(self, job: "_Job") -> bool:
+        """Снимает задание с учета очереди ровно один раз"""
+        with self._lock:
+            if job.dequeued:
+                return False
+            job.dequeued = True
+            self._queued -= 1
+            return True
+
+    def _run(self, job: "_Job", func: Callable[..., Any], args: tuple) -> Any:
+        if not self._dequeue(job):
+            # Ожидающий уже отменен, результат никому не нужен
+            return None
+        with self._lock:
+            self._running += 1
+        try:
+            return func(*args)
+        finally:
+            with self._lock:
+                self._running -= 1
+                self._completed += 1
+
+
+class _Job:
+    __slots__ = ("dequeued",)
+
+    def __init__(self) -> None:
+        self.dequeued = False
+
+password_service = PasswordService(max_workers=PASSWORD_HASH_WORKERS)
@@ -0,0 +1,57 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from app.config import SOFT_DELETE_RETENTION_DAYS, SOFT_DELETE_PURGE_INTERVAL_SECONDS
+from app.infrastructure.database.database import AsyncSessionLocal
+from app.infrastructure.repositories.async_crud import purge_deleted_products
+
+logger = logging.getLogger(__name__)
+
+
+class SoftDeletePurgeService:
+    """Периодическое окончательное удаление продуктов, помеченных удаленными.
+
+    Продукт удаляется из БД, если с момента пометки (modified_at) прошло больше
+    retention_days дней. Файлы изображений удаляет upload_gc_service.
+    """
+
+    def __init__(self, retention_days: int, interval_seconds: int):
+        self.retention_days = retention_days
+        self.interval_seconds = interval_seconds
+        self._task: Optional[asyncio.Task] = None
+
+    async def purge_once(self) -> int:
+        deleted_before = datetime.now(timezone.utc) - timedelta(days=self.retention_days)
+        async with AsyncSessionLocal() as db:
+            purged = await purge_deleted_products(db, deleted_before)
+        if purged:
+            logger.info("Удалено %s продуктов, помеченных удаленными до %s", purged, deleted_before)
+        return purged
+
+    async def _run_forever(self) -> None:
+        while True:
+            try:
+                await self.purge_once()
+            except Exception:
+                logger.exception("Ошибка очистки удаленных продуктов")
+            await asyncio.sleep(self.interval_seconds)
+
+    def start(self) -> None:
+        if self.retention_days <= 0 or self._task is not None:
+            return
+        self._task = asyncio.create_task(self._run_forever())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+
+purge_service = SoftDeletePurgeService(SOFT_DELETE_RETENTION_DAYS, SOFT_DELETE_PURGE_INTERVAL_SECONDS)
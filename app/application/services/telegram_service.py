@@ -7,7 +7,10 @@ from sqlalchemy import func
 
 from app.domain.entities.models import User, Invitation
 from app.domain.entities.schemas import UserCreate
-from app.infrastructure.repositories.crud import create_user, get_restaurants_by_manager
+from app.infrastructure.repositories.crud import get_restaurants_by_manager, bump_cache_version
+from app.application.services.user_service import UserService
+from app.infrastructure.cache.access_cache import invalidate_restaurant_access, invalidate_user_access
+from app.infrastructure.cache.identity_cache import invalidate_identity
 
 
 class TelegramService:
@@ -124,7 +127,7 @@ class TelegramService:
         return None
     
     @staticmethod
-    def register_user(
+    async def register_user(
         db: Session, 
         username: str, 
         password: str, 
@@ -141,7 +144,7 @@ class TelegramService:
             role=role
         )
         
-        user = create_user(db, user_create)
+        user = await UserService.create_user(db, user_create)
         
         # Устанавливаем Telegram данные
         user.telegram_id = telegram_data.get('id')  # type: ignore
@@ -172,9 +175,14 @@ class TelegramService:
                 invitation.telegram_id = telegram_data.get('id')  # type: ignore
                 invitation.used_at = datetime.now(timezone.utc)  # type: ignore
         
+        bump_cache_version(db)
         db.commit()
         db.refresh(user)
         
+        # Новый пользователь и возможная привязка официанта к ресторану меняют решения о доступе
+        invalidate_user_access(int(user.id))  # type: ignore
+        invalidate_identity(username)
+        
         return user
     
     @staticmethod
@@ -192,7 +200,9 @@ class TelegramService:
             # Если у ресторана еще нет официанта, назначаем текущего
             if not restaurant.waiter_id:  # type: ignore
                 restaurant.waiter_id = waiter_id  # type: ignore
+                bump_cache_version(db)
                 db.commit()
+                invalidate_restaurant_access()
     
     @staticmethod
     def get_manager_waiters(db: Session, manager_id: int) -> list[User]:
@@ -0,0 +1,120 @@
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Optional, Set
+
+from app.config import UPLOAD_GC_GRACE_SECONDS, UPLOAD_GC_INTERVAL_SECONDS
+from app.infrastructure.database.database import SessionLocal
+from app.infrastructure.images.derivatives import image_key
+from app.infrastructure.repositories.crud import delete_released_stored_files, iter_referenced_image_paths
+from app.infrastructure.storage.backend import storage
+from app.infrastructure.storage.base import Storage
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class UploadGCReport:
+    scanned: int = 0
+    orphaned: int = 0
+    removed: int = 0
+    reclaimed_bytes: int = 0
+    skipped_recent: int = 0
+    released_records: int = 0
+
+
+class UploadGarbageCollector:
+    """Удаление файлов хранилища, на которые не ссылается ни один продукт.
+
+    Ссылками считаются image_path всех продуктов, включая мягко удаленные (их
+    можно восстановить), и уменьшенные копии этих изображений. В памяти
+    держится только множество ключей используемых изображений; список файлов
+    читается потоково. Файлы моложе grace_seconds не трогаются: это загрузки,
+    продукт для которых еще не сохранен, и копии, которые еще пишутся.
+    """
+
+    def __init__(self, storage: Storage, grace_seconds: int, interval_seconds: int):
+        self.storage = storage
+        self.grace_seconds = grace_seconds
+        self.interval_seconds = interval_seconds
+        self._task: Optional[asyncio.Task] = None
+
+    def _referenced_keys(self) -> Set[str]:
+        db = SessionLocal()
+        try:
+            return {image_key(path) for path in iter_referenced_image_paths(db)}
+        finally:
+            db.close()
+
+    def collect(self, dry_run: bool = False, quarantine_dir: Optional[str] = None) -> UploadGCReport:
+        """Один проход сборки; dry_run - только отчет, quarantine_dir - перенос вместо удаления.
+
+        quarantine_dir - каталог вне хранилища (для S3 - префикс ключа вне S3_PREFIX).
+        """
+        report = UploadGCReport()
+        # Индекс строится до обхода: файл, загруженный во время прохода, моложе grace_seconds
+        referenced = self._referenced_keys()
+        cutoff = time.time() - self.grace_seconds
+        for stored in self.storage.iter_objects():
+            report.scanned += 1
+            if image_key(stored.path) in referenced:
+                continue
+            if stored.mtime > cutoff:
+                report.skipped_recent += 1
+                continue
+            report.orphaned += 1
+            if dry_run:
+                report.reclaimed_bytes += stored.size
+                continue
+            try:
+                if quarantine_dir:
+                    self.storage.quarantine(stored.path, quarantine_dir)
+                elif not self.storage.delete(stored.path):
+                    continue
+            except FileNotFoundError:
+                continue
+            report.removed += 1
+            report.reclaimed_bytes += stored.size
+        if not dry_run:
+            db = SessionLocal()
+            try:
+                report.released_records = delete_released_stored_files(db)
+            finally:
+                db.close()
+        return report
+
+    async def collect_once(self) -> UploadGCReport:
+        report = await asyncio.to_thread(self.collect)
+        if report.removed:
+            logger.info(
+                "Удалено неиспользуемых файлов: %s (%s байт) из %s",
+                report.removed, report.reclaimed_bytes, report.scanned,
+            )
+        return report
+
+    async def _run_forever(self) -> None:
+        while True:
+            try:
+                await self.collect_once()
+            except Exception:
+                logger.exception("Ошибка очистки неиспользуемых файлов")
+            await asyncio.sleep(self.interval_seconds)
+
+    def start(self) -> None:
+        if self.interval_seconds <= 0 or self._task is not None:
+            return
+        self._task = asyncio.create_task(self._run_forever())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+
+upload_gc_service = UploadGarbageCollector(storage, UPLOAD_GC_GRACE_SECONDS, UPLOAD_GC_INTERVAL_SECONDS)
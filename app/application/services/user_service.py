@@ -0,0 +1,42 @@
+from typing import Any, Callable, Optional, Union
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.application.services.password_service import password_service
+from app.domain.entities.models import User
+from app.domain.entities.schemas import UserCreate
+from app.infrastructure.repositories import crud
+
+
+async def _call(db: Union[Session, AsyncSession], func: Callable[..., Any], *args: Any) -> Any:
+    # Запросы - синхронным crud: напрямую для Session бота, через run_sync для AsyncSession
+    if isinstance(db, AsyncSession):
+        return await db.run_sync(func, *args)
+    return func(db, *args)
+
+
+class UserService:
+    """Создание и аутентификация пользователей, смена пароля.
+
+    bcrypt выполняется в пуле password_service до обращения к БД, поэтому
+    crud остаётся синхронным и получает уже готовый хеш.
+    """
+
+    @staticmethod
+    async def create_user(db: Union[Session, AsyncSession], user: UserCreate) -> User:
+        hashed_password = await password_service.hash(user.password)
+        return await _call(db, crud.create_user, user, hashed_password)
+
+    @staticmethod
+    async def change_password(db: Union[Session, AsyncSession], user: User, new_password: str) -> User:
+        hashed_password = await password_service.hash(new_password)
+        return await _call(db, crud.set_user_password, user, hashed_password)
+
+    @staticmethod
+    async def authenticate_user(db: Union[Session, AsyncSession], username: str, password: str) -> Optional[User]:
+        user = await _call(db, crud.get_user_by_username, username)
+        if not user:
+            return None
+        if not await password_service.verify(password, user.hashed_password):  # type: ignore
+            return None
+        return user
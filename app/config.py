@@ -5,6 +5,22 @@ load_dotenv()
 
 # Database
 DATABASE_URL = os.getenv("DATABASE_URL", "")
+# URL для асинхронного движка; по умолчанию выводится из DATABASE_URL (aiosqlite / asyncpg)
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL", "")
+
+# Пул соединений (PostgreSQL и другие серверные СУБД)
+DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT: int = int(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE: int = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING: bool = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+
+# PRAGMA для SQLite, применяются при каждом подключении
+SQLITE_JOURNAL_MODE: str = os.getenv("SQLITE_JOURNAL_MODE", "WAL")
+SQLITE_SYNCHRONOUS: str = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")
+SQLITE_BUSY_TIMEOUT_MS: int = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+SQLITE_MMAP_SIZE: int = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+SQLITE_CACHE_SIZE: int = int(os.getenv("SQLITE_CACHE_SIZE", "-65536"))  # отрицательное значение - в КиБ
 
 # JWT
 SECRET_KEY = os.getenv("SECRET_KEY", "your-secret-key-here")
@@ -23,8 +39,85 @@ ADMIN_ID = int(os.getenv("ADMIN_ID", ""))
 
 # Настройки для загрузки файлов
 UPLOAD_DIR: str = "uploads"
+UPLOADS_URL_PREFIX: str = "/uploads/"
 MAX_FILE_SIZE: int = 5 * 1024 * 1024  # 5MB
+UPLOAD_CHUNK_SIZE: int = 64 * 1024
+# Изображения ресторанов, кроме демо, отдаются только пользователям с доступом к ресторану
+UPLOADS_ACCESS_CONTROL: bool = os.getenv("UPLOADS_ACCESS_CONTROL", "false").lower() == "true"
+# За nginx: файлы отдает nginx по X-Accel-Redirect на этот internal-location (например /_uploads/)
+UPLOADS_ACCEL_REDIRECT_PREFIX: str = os.getenv("UPLOADS_ACCEL_REDIRECT_PREFIX", "")
+
+# Хранилище загруженных файлов: local (каталог UPLOAD_DIR) или s3 (S3-совместимое, например MinIO)
+STORAGE_BACKEND: str = os.getenv("STORAGE_BACKEND", "local").lower()
+S3_BUCKET: str = os.getenv("S3_BUCKET", "")
+S3_PREFIX: str = os.getenv("S3_PREFIX", "uploads/")
+S3_ENDPOINT_URL: str = os.getenv("S3_ENDPOINT_URL", "")  # пусто - AWS S3
+S3_REGION: str = os.getenv("S3_REGION", "")
+S3_ACCESS_KEY_ID: str = os.getenv("S3_ACCESS_KEY_ID", "")  # пусто - стандартная цепочка учетных данных boto3
+S3_SECRET_ACCESS_KEY: str = os.getenv("S3_SECRET_ACCESS_KEY", "")
+# Публичный адрес бакета или CDN: страницы ссылаются на файлы напрямую (не для UPLOADS_ACCESS_CONTROL)
+S3_PUBLIC_URL: str = os.getenv("S3_PUBLIC_URL", "")
+# Срок действия подписанной ссылки, на которую /uploads перенаправляет при хранении в S3
+S3_PRESIGNED_URL_EXPIRES: int = int(os.getenv("S3_PRESIGNED_URL_EXPIRES", "3600"))
+
+# Уменьшенные копии изображений продуктов (ширины в пикселях) и пул процессов для их генерации
+IMAGE_DERIVATIVE_WIDTHS: tuple = (320, 640, 1280)
+IMAGE_WORKERS: int = int(os.getenv("IMAGE_WORKERS", "2"))
+
+# Очистка мягко удаленных продуктов (0 - не удалять)
+SOFT_DELETE_RETENTION_DAYS: int = int(os.getenv("SOFT_DELETE_RETENTION_DAYS", "30"))
+SOFT_DELETE_PURGE_INTERVAL_SECONDS: int = int(os.getenv("SOFT_DELETE_PURGE_INTERVAL_SECONDS", str(24 * 60 * 60)))
+
+# Удаление файлов uploads/, на которые не ссылается ни один продукт (0 - только командой gc_uploads.py).
+# Файлы моложе UPLOAD_GC_GRACE_SECONDS не удаляются
+UPLOAD_GC_GRACE_SECONDS: int = int(os.getenv("UPLOAD_GC_GRACE_SECONDS", str(24 * 60 * 60)))
+UPLOAD_GC_INTERVAL_SECONDS: int = int(os.getenv("UPLOAD_GC_INTERVAL_SECONDS", str(24 * 60 * 60)))
+
+# Пагинация списков API
+MAX_PAGE_SIZE: int = int(os.getenv("MAX_PAGE_SIZE", "100"))
 
 # Настройки приложения
 APP_NAME: str = "TastySkills"
-DEBUG: bool = True 
\ No newline at end of file
+DEBUG: bool = True
+# Уровень логов модулей app.* в веб-процессе (конфигурация uvicorn их не выводит)
+LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO").upper()
+
+# Кэш проверок доступа к ресторанам
+ACCESS_CACHE_TTL_SECONDS: int = int(os.getenv("ACCESS_CACHE_TTL_SECONDS", "60"))
+ACCESS_CACHE_MAX_SIZE: int = 10000
+# Как часто процесс сверяет общий счетчик сбросов в БД (cache_versions): изменение
+# доступа в другом процессе (бот, другой воркер) видно не позже чем через столько секунд
+ACCESS_CACHE_SYNC_SECONDS: float = float(os.getenv("ACCESS_CACHE_SYNC_SECONDS", "1"))
+
+# Кэш пользователей по JWT
+IDENTITY_CACHE_TTL_SECONDS: int = int(os.getenv("IDENTITY_CACHE_TTL_SECONDS", "60"))
+IDENTITY_CACHE_MAX_SIZE: int = 10000
+
+# Шаблоны: байткод компилируется при старте в общий для воркеров каталог;
+# TEMPLATE_AUTO_RELOAD=true для разработки (перечитывать измененные шаблоны)
+TEMPLATES_DIR: str = "templates"
+STATIC_DIR: str = "static"
+TEMPLATE_BYTECODE_CACHE_DIR: str = os.getenv("TEMPLATE_BYTECODE_CACHE_DIR", ".jinja_cache")
+TEMPLATE_AUTO_RELOAD: bool = os.getenv("TEMPLATE_AUTO_RELOAD", "false").lower() == "true"
+# Идентификатор выпуска (например, git SHA) для ETag страниц; пусто - хеш содержимого
+# шаблонов и статики, вычисляемый при старте
+RELEASE_ID: str = os.getenv("RELEASE_ID", "")
+
+# Сжатие ответов (gzip/brotli); сжатые форматы изображений и архивов не трогаются
+COMPRESSION_MIN_SIZE: int = int(os.getenv("COMPRESSION_MIN_SIZE", "500"))
+GZIP_LEVEL: int = 6
+BROTLI_QUALITY: int = 5
+COMPRESSION_EXCLUDED_TYPES: tuple = (
+    "image/", "video/", "audio/", "font/woff", "application/zip", "application/gzip",
+    "application/x-brotli", "application/pdf", "application/octet-stream",
+)
+# Расширения файлов static/, для которых сборка пишет сжатые копии .gz/.br
+PRECOMPRESS_EXTENSIONS: tuple = (".css", ".js", ".svg", ".html", ".txt", ".json", ".map", ".xml")
+
+# Кэш отрендеренных публичных страниц меню (анонимные GET демо-ресторана)
+PAGE_CACHE_MAX_ENTRIES: int = int(os.getenv("PAGE_CACHE_MAX_ENTRIES", "512"))
+PAGE_CACHE_MAX_BYTES: int = int(os.getenv("PAGE_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+PAGE_CACHE_STALE_SECONDS: int = int(os.getenv("PAGE_CACHE_STALE_SECONDS", "30"))
+
+# Пул потоков для bcrypt
+PASSWORD_HASH_WORKERS: int = int(os.getenv("PASSWORD_HASH_WORKERS", "2"))
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey, Text
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey, Text, Index, JSON, false, text
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 from datetime import datetime, timezone
@@ -23,7 +23,7 @@ class User(Base):
     
     waiter_link = Column(String, nullable=True)
     
-    manager_id = Column(Integer, ForeignKey("users.id"), nullable=True)
+    manager_id = Column(Integer, ForeignKey("users.id"), nullable=True, index=True)
     
     managed_restaurants = relationship("Restaurant", foreign_keys="Restaurant.manager_id", back_populates="manager")
     waiter_restaurants = relationship("Restaurant", foreign_keys="Restaurant.waiter_id", back_populates="waiter")
@@ -38,8 +38,8 @@ class Restaurant(Base):
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, index=True)
     concept = Column(Text, nullable=True)
-    manager_id = Column(Integer, ForeignKey("users.id"), nullable=True)
-    waiter_id = Column(Integer, ForeignKey("users.id"), nullable=True)
+    manager_id = Column(Integer, ForeignKey("users.id"), nullable=True, index=True)
+    waiter_id = Column(Integer, ForeignKey("users.id"), nullable=True, index=True)
     created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
     
     manager = relationship("User", foreign_keys=[manager_id], back_populates="managed_restaurants")
@@ -52,7 +52,7 @@ class Section(Base):
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, index=True)
     description = Column(Text, nullable=True)
-    restaurant_id = Column(Integer, ForeignKey("restaurants.id"))
+    restaurant_id = Column(Integer, ForeignKey("restaurants.id"), index=True)
     created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
     
     restaurant = relationship("Restaurant", back_populates="sections")
@@ -64,8 +64,8 @@ class Category(Base):
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String, index=True)
     description = Column(Text, nullable=True)
-    section_id = Column(Integer, ForeignKey("sections.id"))
-    restaurant_id = Column(Integer, ForeignKey("restaurants.id"))
+    section_id = Column(Integer, ForeignKey("sections.id"), index=True)
+    restaurant_id = Column(Integer, ForeignKey("restaurants.id"), index=True)
     created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
     
     section = relationship("Section", back_populates="categories")
@@ -74,6 +74,14 @@ class Category(Base):
 
 class Product(Base):
     __tablename__ = "products"
+    __table_args__ = (
+        # Продукты категории: WHERE category_id = ? ORDER BY id. Частичный индекс только
+        # по живым строкам, условие совпадает с фильтром из soft_delete (is_deleted = 0)
+        Index(
+            "ix_products_live_category_id_id", "category_id", "id",
+            sqlite_where=text("is_deleted = 0"), postgresql_where=text("is_deleted = false"),
+        ),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String, index=True)
@@ -85,11 +93,20 @@ class Product(Base):
     table_setting = Column(Text, nullable=True)
     gastronomic_pairings = Column(Text, nullable=True)
     image_path = Column(String, nullable=True)
-    category_id = Column(Integer, ForeignKey("categories.id"))
-    restaurant_id = Column(Integer, ForeignKey("restaurants.id"))
+    # image_path без расширения и суффикса ширины (общий для копий): по нему /uploads
+    # находит рестораны изображения при проверке доступа
+    image_key = Column(String, nullable=True, index=True)
+    # Уменьшенные копии image_path: [{"name", "width", "height", "format"}], заполняются в фоне
+    image_variants = Column(JSON(none_as_null=True), nullable=True)
+    # Размеры image_path и размытая заглушка (data URI) для разметки, заполняются при загрузке
+    image_width = Column(Integer, nullable=True)
+    image_height = Column(Integer, nullable=True)
+    image_placeholder = Column(Text, nullable=True)
+    category_id = Column(Integer, ForeignKey("categories.id"), index=True)
+    restaurant_id = Column(Integer, ForeignKey("restaurants.id"), index=True)
     created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
     modified_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
-    is_deleted = Column(Boolean, default=False)
+    is_deleted = Column(Boolean, default=False, nullable=False, server_default=false())
     
     category = relationship("Category", back_populates="products")
     restaurant = relationship("Restaurant")
@@ -98,7 +115,7 @@ class TelegramSession(Base):
     __tablename__ = "telegram_sessions"
     
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id"))
+    user_id = Column(Integer, ForeignKey("users.id"), index=True)
     telegram_id = Column(Integer, index=True)
     state = Column(String, default="start")
     data = Column(Text, nullable=True)
@@ -107,15 +124,67 @@ class TelegramSession(Base):
     
     user = relationship("User", back_populates="telegram_sessions")
 
+class StoredFile(Base):
+    """Загруженный файл в uploads/ и число продуктов, которые на него ссылаются.
+
+    Файлы хранятся по хешу содержимого, поэтому одинаковые изображения разных
+    продуктов - это один файл и одна запись. Файлы с ref_count = 0 больше
+    никем не используются.
+    """
+    __tablename__ = "stored_files"
+
+    id = Column(Integer, primary_key=True, index=True)
+    path = Column(String, unique=True, index=True)  # путь относительно UPLOAD_DIR, как в Product.image_path
+    sha256 = Column(String(64), nullable=True)  # None - файл загружен до хранения по хешу
+    ref_count = Column(Integer, default=0, nullable=False)
+    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+
+class CacheVersion(Base):
+    """Счетчик сбросов кэшей в памяти процессов (см. app.infrastructure.cache.invalidation).
+
+    Увеличивается в той же транзакции, что и изменение, после которого кэш
+    устарел; процессы сверяют его со значением, которое видели последним.
+    """
+    __tablename__ = "cache_versions"
+
+    name = Column(String, primary_key=True)
+    version = Column(Integer, default=0, nullable=False)
+
 class Invitation(Base):
     __tablename__ = "invitations"
     
     id = Column(Integer, primary_key=True, index=True)
     code = Column(String, unique=True, index=True)
-    manager_id = Column(Integer, ForeignKey("users.id"))
+    manager_id = Column(Integer, ForeignKey("users.id"), index=True)
     telegram_id = Column(Integer, nullable=True)
     is_used = Column(Boolean, default=False)
     created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
     used_at = Column(DateTime, nullable=True)
     
-    manager = relationship("User", foreign_keys=[manager_id]) 
\ No newline at end of file
+    manager = relationship("User", foreign_keys=[manager_id]) 
+
+class MenuEvent(Base):
+    """Журнал изменений меню (только добавление записей).
+
+    Пишется функциями crud в той же транзакции, что и само изменение.
+    Внешних ключей нет, чтобы журнал переживал удаление сущностей.
+    """
+    __tablename__ = "menu_events"
+    __table_args__ = (
+        # Лента ресторана: WHERE restaurant_id IN (...) ORDER BY id DESC
+        Index("ix_menu_events_restaurant_id_id", "restaurant_id", "id"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    restaurant_id = Column(Integer, nullable=True)
+    section_id = Column(Integer, nullable=True)
+    category_id = Column(Integer, nullable=True)
+    entity_type = Column(String)  # restaurant, section, category, product
+    entity_id = Column(Integer)
+    action = Column(String)  # created, updated, deleted
+    title = Column(String, nullable=True)  # название сущности на момент изменения
+    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+    
+    restaurant = relationship("Restaurant", primaryjoin="foreign(MenuEvent.restaurant_id) == Restaurant.id", viewonly=True)
+    section = relationship("Section", primaryjoin="foreign(MenuEvent.section_id) == Section.id", viewonly=True)
+    category = relationship("Category", primaryjoin="foreign(MenuEvent.category_id) == Category.id", viewonly=True)
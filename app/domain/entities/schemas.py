@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Optional, List
+from typing import Any, Dict, Optional, List, Generic, TypeVar
 from datetime import datetime
 
 class UserBase(BaseModel):
@@ -133,7 +133,7 @@ class ProductBase(BaseModel):
     table_setting: Optional[str] = None
     gastronomic_pairings: Optional[str] = None
     image_path: Optional[str] = None
-    is_deleted: Optional[bool] = False
+    is_deleted: bool = False
 
 class ProductCreate(ProductBase):
     category_id: int
@@ -159,6 +159,24 @@ class Product(ProductBase):
     created_at: datetime
     modified_at: datetime
     is_deleted: bool = False
+    image_variants: Optional[List[Dict[str, Any]]] = None
+    image_width: Optional[int] = None
+    image_height: Optional[int] = None
+    image_placeholder: Optional[str] = None
+
+    class Config:
+        from_attributes = True
+
+class MenuEvent(BaseModel):
+    id: int
+    restaurant_id: Optional[int] = None
+    section_id: Optional[int] = None
+    category_id: Optional[int] = None
+    entity_type: str
+    entity_id: int
+    action: str
+    title: Optional[str] = None
+    created_at: datetime
 
     class Config:
         from_attributes = True
@@ -173,6 +191,12 @@ class TokenData(BaseModel):
 class Message(BaseModel):
     message: str
 
+PageItem = TypeVar("PageItem")
+
+class Page(BaseModel, Generic[PageItem]):
+    items: List[PageItem]
+    next_cursor: Optional[str] = None
+
 class RestaurantWithRelations(Restaurant):
     sections: List['Section'] = []
     manager: Optional[User] = None
@@ -0,0 +1,66 @@
+"""
+Кэш решений о доступе к ресторанам.
+
+Проверка доступа выполняется на каждой странице и каждом POST управления,
+поэтому ID демо-ресторана и решения по ключу (user_id, role, restaurant_id)
+кэшируются в памяти процесса. Там же лежат рестораны, которым принадлежит
+изображение из /uploads (по ключу image_key), - их проверяет каждый запрос
+картинки при UPLOADS_ACCESS_CONTROL. Кэш сбрасывается явно при изменении
+ресторанов, продуктов с изображениями и регистрации пользователей; другие процессы (воркеры, бот) узнают о сбросе
+через общий счетчик в БД (см. invalidation), TTL - страховка сверху.
+"""
+from typing import Any, Callable, Iterable, Optional, Tuple
+
+from app.config import ACCESS_CACHE_TTL_SECONDS, ACCESS_CACHE_MAX_SIZE
+from app.infrastructure.cache.ttl_cache import TTLCache, MISSING
+
+_DEMO_KEY = "demo_restaurant_id"
+
+_demo_cache = TTLCache(ttl=ACCESS_CACHE_TTL_SECONDS)
+_decision_cache = TTLCache(ttl=ACCESS_CACHE_TTL_SECONDS, maxsize=ACCESS_CACHE_MAX_SIZE)
+_image_cache = TTLCache(ttl=ACCESS_CACHE_TTL_SECONDS, maxsize=ACCESS_CACHE_MAX_SIZE)
+
+
+def get_cached_demo_restaurant_id(loader: Callable[[], Optional[int]]) -> Optional[int]:
+    """Получение ID демо-ресторана с загрузкой через loader при промахе"""
+    value: Any = _demo_cache.get(_DEMO_KEY)
+    if value is MISSING:
+        value = loader()
+        _demo_cache.set(_DEMO_KEY, value)
+    return value
+
+
+def get_access_decision(user_id: int, role: str, restaurant_id: int) -> Optional[bool]:
+    """Закэшированное решение о доступе или None при промахе"""
+    value = _decision_cache.get((user_id, role, restaurant_id))
+    return None if value is MISSING else value
+
+
+def set_access_decision(user_id: int, role: str, restaurant_id: int, allowed: bool) -> None:
+    _decision_cache.set((user_id, role, restaurant_id), allowed)
+
+
+def get_cached_image_restaurant_ids(key: str, loader: Callable[[], Iterable[int]]) -> Tuple[int, ...]:
+    """Рестораны изображения key с загрузкой через loader при промахе"""
+    value: Any = _image_cache.get(key)
+    if value is MISSING:
+        value = tuple(loader())
+        _image_cache.set(key, value)
+    return value
+
+
+def invalidate_restaurant_access() -> None:
+    """Сброс при создании/изменении/удалении ресторана: меняется и демо-ресторан, и принадлежность"""
+    _demo_cache.clear()
+    _decision_cache.clear()
+    _image_cache.clear()
+
+
+def invalidate_image_access(key: str) -> None:
+    """Сброс при появлении, смене или удалении продукта с изображением key"""
+    _image_cache.invalidate(key)
+
+
+def invalidate_user_access(user_id: int) -> None:
+    """Сброс решений конкретного пользователя (регистрация, смена роли или менеджера)"""
+    _decision_cache.invalidate_where(lambda key: key[0] == user_id)
@@ -0,0 +1,53 @@
+"""
+Кэш аутентифицированных пользователей по полю ``sub`` JWT-токена.
+
+Вместо ORM-объекта хранится неизменяемый снимок с полями, нужными для
+проверок доступа и шаблонов, поэтому его безопасно разделять между запросами.
+Отсутствующие пользователи (устаревшие cookies) тоже кэшируются.
+"""
+from dataclasses import dataclass
+from typing import Any, Callable, Optional
+
+from app.config import IDENTITY_CACHE_TTL_SECONDS, IDENTITY_CACHE_MAX_SIZE
+from app.infrastructure.cache.ttl_cache import TTLCache, MISSING
+
+
+@dataclass(frozen=True)
+class CurrentUser:
+    """Снимок текущего пользователя"""
+    id: int
+    username: str
+    role: str
+    manager_id: Optional[int]
+    is_active: bool
+
+    @classmethod
+    def from_model(cls, user: Any) -> "CurrentUser":
+        return cls(
+            id=int(user.id),
+            username=str(user.username),
+            role=str(user.role),
+            manager_id=int(user.manager_id) if user.manager_id is not None else None,
+            is_active=bool(user.is_active),
+        )
+
+
+_identity_cache = TTLCache(ttl=IDENTITY_CACHE_TTL_SECONDS, maxsize=IDENTITY_CACHE_MAX_SIZE)
+
+
+def get_identity(username: str, loader: Callable[[], Optional[CurrentUser]]) -> Optional[CurrentUser]:
+    """Получение снимка пользователя с загрузкой через loader при промахе"""
+    value: Any = _identity_cache.get(username)
+    if value is MISSING:
+        value = loader()
+        _identity_cache.set(username, value)
+    return value
+
+
+def invalidate_identity(username: Optional[str]) -> None:
+    if username:
+        _identity_cache.invalidate(username)
+
+
+def clear_identities() -> None:
+    _identity_cache.clear()
@@ -0,0 +1,50 @@
+"""
+Общий для процессов сигнал сброса кэшей доступа и пользователей.
+
+Кэши access_cache и identity_cache живут в памяти процесса, и явный сброс
+доходит только до процесса, который его вызвал: отзыв доступа в боте не
+виден веб-воркерам до истечения TTL. Поэтому вместе со сбросом в той же
+транзакции увеличивается счетчик в таблице cache_versions. Каждый процесс
+сверяет его не чаще раза в ACCESS_CACHE_SYNC_SECONDS (один запрос по
+первичному ключу) и при расхождении очищает свои кэши целиком.
+"""
+import threading
+import time
+from typing import Callable, Optional
+
+from app.config import ACCESS_CACHE_SYNC_SECONDS
+from app.infrastructure.cache.access_cache import invalidate_restaurant_access
+from app.infrastructure.cache.identity_cache import clear_identities
+
+ACCESS_VERSION = "access"
+
+
+def clear_local_caches() -> None:
+    invalidate_restaurant_access()
+    clear_identities()
+
+
+class SharedInvalidation:
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._seen_version: Optional[int] = None
+        self._checked_at = float("-inf")
+
+    def sync(self, load_version: Callable[[], int]) -> bool:
+        """Сверка счетчика; True - счетчик изменился и кэши процесса очищены"""
+        now = time.monotonic()
+        with self._lock:
+            if now - self._checked_at < self.interval:
+                return False
+            self._checked_at = now
+        version = load_version()
+        with self._lock:
+            changed = self._seen_version is not None and version != self._seen_version
+            self._seen_version = version
+        if changed:
+            clear_local_caches()
+        return changed
+
+
+shared_invalidation = SharedInvalidation(ACCESS_CACHE_SYNC_SECONDS)
@@ -0,0 +1,161 @@
+"""
+Кэш отрендеренных страниц.
+
+Запись хранится по ключу (обычно путь запроса) вместе с версией данных, из
+которых она построена. Если версия совпадает, страница отдается из памяти.
+Если версия выросла, устаревшая страница еще stale_seconds отдается сразу, а
+перерисовка идет в фоне (stale-while-revalidate). Одновременные промахи по
+одному ключу и версии ждут одну общую отрисовку (single-flight).
+
+Кэш используется только из event loop, поэтому блокировки не нужны.
+"""
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Tuple
+
+from app.config import PAGE_CACHE_MAX_ENTRIES, PAGE_CACHE_MAX_BYTES, PAGE_CACHE_STALE_SECONDS
+
+logger = logging.getLogger(__name__)
+
+HIT = "HIT"
+MISS = "MISS"
+STALE = "STALE"
+
+
+@dataclass(frozen=True)
+class CachedPage:
+    """Полностью вычитанный HTTP-ответ"""
+    status: int
+    headers: List[Tuple[bytes, bytes]]
+    body: bytes
+
+    def header(self, name: bytes) -> Optional[str]:
+        for key, value in self.headers:
+            if key.lower() == name:
+                return value.decode("latin-1")
+        return None
+
+    @property
+    def cacheable(self) -> bool:
+        # Ошибки и редиректы не кэшируются; ответ с cookie персональный
+        return self.status == 200 and self.header(b"set-cookie") is None
+
+
+@dataclass
+class _Entry:
+    version: int
+    page: CachedPage
+    stale_since: Optional[float] = None
+
+
+Renderer = Callable[[], Awaitable[CachedPage]]
+
+
+class PageCache:
+    """LRU-кэш страниц с ограничением по числу записей и суммарному размеру"""
+
+    def __init__(self, max_entries: int, max_bytes: int, stale_seconds: float):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.stale_seconds = stale_seconds
+        self._entries: "OrderedDict[Hashable, _Entry]" = OrderedDict()
+        self._flights: Dict[Tuple[Hashable, int], "asyncio.Task[CachedPage]"] = {}
+        self._bytes = 0
+        self._counters = {HIT: 0, MISS: 0, STALE: 0}
+        self._renders = 0
+
+    async def get(self, key: Hashable, version: int, render: Renderer) -> Tuple[CachedPage, str]:
+        """Страница для версии version и источник ответа: HIT, STALE или MISS"""
+        entry = self._entries.get(key)
+        if entry is not None:
+            if entry.version == version:
+                self._entries.move_to_end(key)
+                self._counters[HIT] += 1
+                return entry.page, HIT
+            if entry.version < version:
+                now = time.monotonic()
+                if entry.stale_since is None:
+                    entry.stale_since = now
+                if now - entry.stale_since < self.stale_seconds:
+                    self._flight(key, version, render)
+                    self._counters[STALE] += 1
+                    return entry.page, STALE
+        self._counters[MISS] += 1
+        # shield: отмена запроса-инициатора не прерывает отрисовку для остальных
+        page = await asyncio.shield(self._flight(key, version, render))
+        return page, MISS
+
+    def _flight(self, key: Hashable, version: int, render: Renderer) -> "asyncio.Task[CachedPage]":
+        """Единственная отрисовка ключа для версии; повторные вызовы получают ту же задачу"""
+        task = self._flights.get((key, version))
+        if task is None:
+            task = asyncio.ensure_future(self._render(key, version, render))
+            self._flights[(key, version)] = task
+            task.add_done_callback(lambda done: self._finish_flight(key, version, done))
+        return task
+
+    def _finish_flight(self, key: Hashable, version: int, task: "asyncio.Task[CachedPage]") -> None:
+        self._flights.pop((key, version), None)
+        if not task.cancelled() and task.exception() is not None:
+            # Исключение получат ожидающие запросы; для фоновой перерисовки только пишем в лог
+            logger.warning("Ошибка отрисовки страницы %s: %r", key, task.exception())
+
+    async def _render(self, key: Hashable, version: int, render: Renderer) -> CachedPage:
+        self._renders += 1
+        try:
+            page = await render()
+        except Exception:
+            self._discard_outdated(key, version)
+            raise
+        if page.cacheable:
+            self._store(key, version, page)
+        else:
+            # Страница пропала (404) или стала недоступной - устаревшую копию не отдаем
+            self._discard_outdated(key, version)
+        return page
+
+    def _store(self, key: Hashable, version: int, page: CachedPage) -> None:
+        current = self._entries.get(key)
+        if current is not None and current.version > version:
+            # Более поздняя отрисовка уже сохранена
+            return
+        if len(page.body) > self.max_bytes:
+            self._discard(key)
+            return
+        self._discard(key)
+        self._entries[key] = _Entry(version, page)
+        self._bytes += len(page.body)
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= len(evicted.page.body)
+
+    def _discard_outdated(self, key: Hashable, version: int) -> None:
+        current = self._entries.get(key)
+        if current is not None and current.version <= version:
+            self._discard(key)
+
+    def _discard(self, key: Hashable) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= len(entry.page.body)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "hits": self._counters[HIT],
+            "stale_hits": self._counters[STALE],
+            "misses": self._counters[MISS],
+            "renders": self._renders,
+            "in_flight": len(self._flights),
+        }
+
+
+page_cache = PageCache(PAGE_CACHE_MAX_ENTRIES, PAGE_CACHE_MAX_BYTES, PAGE_CACHE_STALE_SECONDS)
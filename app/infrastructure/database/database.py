@@ -1,21 +1,173 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.orm import sessionmaker, Session
-from typing import Generator
-from app.config import DATABASE_URL
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from threading import Lock
+from typing import Any, AsyncGenerator, Dict, Generator
+from app.infrastructure.database import soft_delete  # noqa: F401  регистрирует фильтр удаленных продуктов
+from app.config import (
+    DATABASE_URL, ASYNC_DATABASE_URL,
+    DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_TIMEOUT, DB_POOL_RECYCLE, DB_POOL_PRE_PING,
+    SQLITE_JOURNAL_MODE, SQLITE_SYNCHRONOUS, SQLITE_BUSY_TIMEOUT_MS,
+    SQLITE_MMAP_SIZE, SQLITE_CACHE_SIZE,
+)
+
+
+def is_sqlite_url(url: str) -> bool:
+    return url.startswith("sqlite")
+
+
+def get_async_database_url(url: str) -> str:
+    """Преобразование синхронного URL базы данных в URL с асинхронным драйвером"""
+    if url.startswith("sqlite://"):
+        return url.replace("sqlite://", "sqlite+aiosqlite://", 1)
+    if url.startswith("postgresql://"):
+        return url.replace("postgresql://", "postgresql+asyncpg://", 1)
+    if url.startswith("postgres://"):
+        return url.replace("postgres://", "postgresql+asyncpg://", 1)
+    return url
+
+
+def is_sqlite_memory_url(url: str) -> bool:
+    return is_sqlite_url(url) and (":memory:" in url or url.rstrip("/").endswith("sqlite"))
+
+
+def get_pool_options() -> Dict[str, Any]:
+    return {
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+    }
+
+
+def get_engine_options(url: str) -> Dict[str, Any]:
+    """Параметры движка: для SQLite - отключение проверки потока, для остальных СУБД - настройки пула"""
+    if is_sqlite_url(url):
+        return {"connect_args": {"check_same_thread": False}}
+    return get_pool_options()
+
+
+def _set_sqlite_pragmas(dbapi_connection: Any, connection_record: Any) -> None:
+    """Применение PRAGMA к каждому новому соединению SQLite"""
+    cursor = dbapi_connection.cursor()
+    # journal_mode сохраняется в файле БД, остальные PRAGMA действуют на соединение
+    cursor.execute(f"PRAGMA journal_mode={SQLITE_JOURNAL_MODE}")
+    cursor.execute(f"PRAGMA synchronous={SQLITE_SYNCHRONOUS}")
+    cursor.execute(f"PRAGMA busy_timeout={int(SQLITE_BUSY_TIMEOUT_MS)}")
+    cursor.execute(f"PRAGMA mmap_size={int(SQLITE_MMAP_SIZE)}")
+    cursor.execute(f"PRAGMA cache_size={int(SQLITE_CACHE_SIZE)}")
+    cursor.close()
+
+
+class PoolStats:
+    """Счетчики выдачи соединений из пула движка"""
+
+    def __init__(self, name: str, engine: Engine):
+        self.name = name
+        self.engine = engine
+        self._lock = Lock()
+        self.connects = 0
+        self.checkouts = 0
+        self.checkins = 0
+        self.peak_checked_out = 0
+        event.listen(engine, "connect", self._on_connect)
+        event.listen(engine, "checkout", self._on_checkout)
+        event.listen(engine, "checkin", self._on_checkin)
+
+    def _on_connect(self, dbapi_connection: Any, connection_record: Any) -> None:
+        with self._lock:
+            self.connects += 1
+
+    def _on_checkout(self, dbapi_connection: Any, connection_record: Any, connection_proxy: Any) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.peak_checked_out = max(self.peak_checked_out, self.checkouts - self.checkins)
+
+    def _on_checkin(self, dbapi_connection: Any, connection_record: Any) -> None:
+        with self._lock:
+            self.checkins += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        pool = self.engine.pool
+        with self._lock:
+            data: Dict[str, Any] = {
+                "pool_class": type(pool).__name__,
+                "connects": self.connects,
+                "checkouts": self.checkouts,
+                "checkins": self.checkins,
+                "checked_out": self.checkouts - self.checkins,
+                "peak_checked_out": self.peak_checked_out,
+            }
+        # size/overflow есть только у QueuePool и его асинхронного варианта
+        for attr in ("size", "overflow", "checkedin"):
+            method = getattr(pool, attr, None)
+            if callable(method):
+                data[attr] = method()
+        data["status"] = pool.status()
+        return data
+
+
+def create_db_engine(url: str) -> Engine:
+    """Создание синхронного движка с настройками из конфигурации"""
+    db_engine = create_engine(url, **get_engine_options(url))
+    if is_sqlite_url(url):
+        event.listen(db_engine, "connect", _set_sqlite_pragmas)
+    return db_engine
+
+
+def create_async_db_engine(url: str) -> AsyncEngine:
+    """Создание асинхронного движка с настройками из конфигурации"""
+    options = get_engine_options(url)
+    if is_sqlite_url(url) and not is_sqlite_memory_url(url):
+        # aiosqlite по умолчанию работает с NullPool и открывает файл (и применяет PRAGMA)
+        # на каждый запрос; пул сохраняет соединения между запросами
+        options.update(poolclass=AsyncAdaptedQueuePool, **get_pool_options())
+        # Соединение с файлом не обрывается, как серверное: pre-ping только добавлял бы
+        # SELECT 1 (четыре перехода в поток aiosqlite) к каждой выдаче соединения из пула
+        options["pool_pre_ping"] = False
+    db_engine = create_async_engine(url, **options)
+    if is_sqlite_url(url):
+        # События пула вешаются на синхронный движок, лежащий под асинхронным
+        event.listen(db_engine.sync_engine, "connect", _set_sqlite_pragmas)
+    return db_engine
+
 
 # Создаем движок базы данных
-engine = create_engine(
-    DATABASE_URL, 
-    connect_args={"check_same_thread": False} if "sqlite" in DATABASE_URL else {}
-)
+engine = create_db_engine(DATABASE_URL)
 
 # Создаем фабрику сессий
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Асинхронный движок для веб-интерфейса и API (бот использует синхронный)
+async_engine = create_async_db_engine(ASYNC_DATABASE_URL or get_async_database_url(DATABASE_URL))
+
+# expire_on_commit=False: после commit атрибуты не перечитываются лениво,
+# что в асинхронной сессии вызвало бы ввод-вывод вне event loop
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+pool_stats = {
+    "sync": PoolStats("sync", engine),
+    "async": PoolStats("async", async_engine.sync_engine),
+}
+
+
+def get_pool_stats() -> Dict[str, Dict[str, Any]]:
+    """Снимок состояния пулов соединений обоих движков"""
+    return {name: stats.snapshot() for name, stats in pool_stats.items()}
+
+
 # Dependency
 def get_db() -> Generator[Session, None, None]:
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close() 
\ No newline at end of file
+        db.close()
+
+
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -0,0 +1,36 @@
+"""
+Фильтрация мягко удаленных продуктов на уровне сессии.
+
+Ко всем ORM-запросам (в том числе ленивой и selectin-загрузке связей) добавляется
+условие products.is_deleted = false, так что удаленные строки не покидают БД.
+Колонка NOT NULL со значением по умолчанию false (миграция 0009): строки
+с NULL этим условием были бы скрыты.
+
+Чтобы получить и удаленные строки, запрос выполняется с опцией include_deleted:
+
+    db.query(Product).execution_options(include_deleted=True)
+"""
+from sqlalchemy import event, false
+from sqlalchemy.orm import ORMExecuteState, Session, with_loader_criteria
+
+from app.domain.entities.models import Product
+
+INCLUDE_DELETED = "include_deleted"
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _exclude_deleted_products(execute_state: ORMExecuteState) -> None:
+    if (
+        execute_state.is_select
+        # refresh и догрузка атрибутов уже загруженного объекта не фильтруются,
+        # иначе refresh после delete_product не нашел бы строку
+        and not execute_state.is_column_load
+        # загрузка связей получает условие через propagate_to_loaders
+        and not execute_state.is_relationship_load
+        and not execute_state.execution_options.get(INCLUDE_DELETED, False)
+    ):
+        execute_state.statement = execute_state.statement.options(
+            # false() рендерится литералом (is_deleted = 0), а не параметром,
+            # чтобы SQLite мог использовать частичные индексы по живым строкам
+            with_loader_criteria(Product, lambda cls: cls.is_deleted == false(), include_aliases=True)
+        )
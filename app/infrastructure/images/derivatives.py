@@ -0,0 +1,134 @@
+"""
+Уменьшенные копии изображений продуктов (WebP и JPEG нескольких ширин),
+размеры и размытые превью-заглушки.
+
+Модуль выполняется в дочерних процессах пула, поэтому зависит только от
+Pillow и стандартной библиотеки - без конфигурации и базы данных.
+Хранилище передается в процесс аргументом.
+"""
+import base64
+import io
+import os
+import re
+import tempfile
+from typing import Any, Dict, List, Sequence
+
+from PIL import Image, ImageOps
+
+WEBP_QUALITY = 80
+JPEG_QUALITY = 82
+
+# Превью-заглушка: WebP не больше PLACEHOLDER_SIZE по большей стороне, встраивается в страницу
+PLACEHOLDER_SIZE = 16
+PLACEHOLDER_QUALITY = 40
+
+_EXIF_ORIENTATION = 0x0112
+
+# Уменьшенная копия: <имя исходника>_<ширина>w.<ext>
+_DERIVATIVE_SUFFIX = re.compile(r"_\d+w$")
+
+
+def image_key(path: str) -> str:
+    """Общий ключ исходного файла и его копий: путь без расширения и суффикса ширины"""
+    stem = os.path.splitext(path)[0]
+    return _DERIVATIVE_SUFFIX.sub("", stem)
+
+
+def _has_alpha(image: Image.Image) -> bool:
+    return image.mode in ("RGBA", "LA", "PA") or (image.mode == "P" and "transparency" in image.info)
+
+
+def _flatten(image: Image.Image) -> Image.Image:
+    """RGB-копия для JPEG: прозрачные области заливаются белым"""
+    if image.mode != "RGBA":
+        return image.convert("RGB")
+    background = Image.new("RGB", image.size, (255, 255, 255))
+    background.paste(image, mask=image.getchannel("A"))
+    return background
+
+
+def _save_atomic(image: Image.Image, path: str, image_format: str, **options: Any) -> None:
+    # Одно и то же изображение могут обрабатывать два процесса сразу
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    image.save(tmp_path, format=image_format, **options)
+    os.replace(tmp_path, path)
+
+
+def derivative_widths(source_width: int, widths: Sequence[int]) -> List[int]:
+    """Ширины копий: без увеличения, копии шире оригинала заменяются его шириной"""
+    return sorted({min(width, source_width) for width in widths})
+
+
+def generate_derivatives(upload_dir: str, file_name: str, widths: Sequence[int]) -> List[Dict[str, Any]]:
+    """Запись копий file_name рядом с ним; возвращает их имена, размеры и форматы"""
+    stem = os.path.splitext(file_name)[0]
+    with Image.open(os.path.join(upload_dir, file_name)) as source:
+        # Поворот по EXIF до масштабирования, иначе фото с телефона окажутся на боку
+        image = ImageOps.exif_transpose(source)
+        image = image.convert("RGBA" if _has_alpha(image) else "RGB")
+
+    variants: List[Dict[str, Any]] = []
+    for width in derivative_widths(image.width, widths):
+        height = max(1, round(image.height * width / image.width))
+        resized = image if width == image.width else image.resize((width, height), Image.LANCZOS)
+        outputs = (
+            ("webp", "WEBP", resized, {"quality": WEBP_QUALITY, "method": 4}),
+            ("jpeg", "JPEG", _flatten(resized), {"quality": JPEG_QUALITY, "optimize": True, "progressive": True}),
+        )
+        for image_format, pil_format, output, options in outputs:
+            name = f"{stem}_{width}w.{'jpg' if image_format == 'jpeg' else image_format}"
+            _save_atomic(output, os.path.join(upload_dir, name), pil_format, **options)
+            variants.append({"name": name, "width": width, "height": height, "format": image_format})
+    return variants
+
+
+def generate_stored_derivatives(storage: Any, file_name: str, widths: Sequence[int]) -> List[Dict[str, Any]]:
+    """generate_derivatives для файла в хранилище (app.infrastructure.storage).
+
+    Локальное хранилище обрабатывается на месте. Из удаленного исходник
+    скачивается во временный каталог, а готовые копии загружаются обратно.
+    """
+    if storage.local_directory:
+        return generate_derivatives(storage.local_directory, file_name, widths)
+    with tempfile.TemporaryDirectory() as work_dir:
+        source = os.path.join(work_dir, *file_name.split("/"))
+        os.makedirs(os.path.dirname(source), exist_ok=True)
+        storage.download(file_name, source)
+        variants = generate_derivatives(work_dir, file_name, widths)
+        for variant in variants:
+            storage.put_file(os.path.join(work_dir, *variant["name"].split("/")), variant["name"])
+    return variants
+
+
+def image_metadata(path: str) -> Dict[str, Any]:
+    """Размеры изображения с учетом поворота по EXIF и превью-заглушка (data URI).
+
+    Заглушка - фон тега img до загрузки изображения: браузер растягивает ее
+    с размытием. Для изображений с прозрачностью заглушки нет (None): она
+    оставалась бы видна сквозь прозрачные области.
+    """
+    with Image.open(path) as source:
+        width, height = source.size
+        if source.getexif().get(_EXIF_ORIENTATION, 1) in (5, 6, 7, 8):
+            width, height = height, width
+        # JPEG декодируется сразу уменьшенным в 2-8 раз: весь кадр для заглушки не нужен
+        source.draft("RGB", (PLACEHOLDER_SIZE * 2, PLACEHOLDER_SIZE * 2))
+        preview = ImageOps.exif_transpose(source)
+        placeholder = None
+        if not _has_alpha(preview):
+            preview = preview.convert("RGB")
+            preview.thumbnail((PLACEHOLDER_SIZE, PLACEHOLDER_SIZE))
+            buffer = io.BytesIO()
+            preview.save(buffer, format="WEBP", quality=PLACEHOLDER_QUALITY)
+            placeholder = "data:image/webp;base64," + base64.b64encode(buffer.getvalue()).decode("ascii")
+    return {"width": width, "height": height, "placeholder": placeholder}
+
+
+def stored_image_metadata(storage: Any, file_name: str) -> Dict[str, Any]:
+    """image_metadata для файла в хранилище; из удаленного файл скачивается во временный каталог"""
+    if storage.local_directory:
+        return image_metadata(os.path.join(storage.local_directory, *file_name.split("/")))
+    with tempfile.TemporaryDirectory() as work_dir:
+        source = os.path.join(work_dir, os.path.basename(file_name))
+        storage.download(file_name, source)
+        return image_metadata(source)
@@ -0,0 +1,78 @@
+"""
+Асинхронные версии функций crud для AsyncSession.
+
+Запросы не дублируются: функции из crud выполняются через AsyncSession.run_sync,
+где SQLAlchemy исполняет синхронный ORM-код в greenlet поверх асинхронного
+драйвера (aiosqlite / asyncpg). Ввод-вывод при этом не блокирует event loop.
+
+Связи, которые шаблоны читают после выхода из run_sync, должны быть загружены
+заранее (get_*_with_relations, get_menu_tree), иначе ленивая загрузка
+вызовет MissingGreenlet.
+"""
+from functools import wraps
+from typing import Any, Awaitable, Callable
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.infrastructure.repositories import crud
+
+
+def _run_sync(func: Callable[..., Any]) -> Callable[..., Awaitable[Any]]:
+    @wraps(func)
+    async def wrapper(db: AsyncSession, *args: Any, **kwargs: Any) -> Any:
+        return await db.run_sync(func, *args, **kwargs)
+    return wrapper
+
+
+get_user = _run_sync(crud.get_user)
+get_user_by_username = _run_sync(crud.get_user_by_username)
+get_users = _run_sync(crud.get_users)
+create_user = _run_sync(crud.create_user)
+update_user = _run_sync(crud.update_user)
+delete_user = _run_sync(crud.delete_user)
+
+get_restaurant = _run_sync(crud.get_restaurant)
+get_restaurant_with_relations = _run_sync(crud.get_restaurant_with_relations)
+get_restaurants = _run_sync(crud.get_restaurants)
+get_restaurants_page = _run_sync(crud.get_restaurants_page)
+get_restaurants_by_manager = _run_sync(crud.get_restaurants_by_manager)
+get_restaurants_by_waiter_via_manager = _run_sync(crud.get_restaurants_by_waiter_via_manager)
+get_accessible_restaurant_ids = _run_sync(crud.get_accessible_restaurant_ids)
+create_restaurant = _run_sync(crud.create_restaurant)
+update_restaurant = _run_sync(crud.update_restaurant)
+delete_restaurant = _run_sync(crud.delete_restaurant)
+
+get_section = _run_sync(crud.get_section)
+get_section_with_relations = _run_sync(crud.get_section_with_relations)
+get_sections = _run_sync(crud.get_sections)
+get_sections_page = _run_sync(crud.get_sections_page)
+get_sections_by_restaurant = _run_sync(crud.get_sections_by_restaurant)
+create_section = _run_sync(crud.create_section)
+update_section = _run_sync(crud.update_section)
+delete_section = _run_sync(crud.delete_section)
+
+get_category = _run_sync(crud.get_category)
+get_category_with_relations = _run_sync(crud.get_category_with_relations)
+get_categories = _run_sync(crud.get_categories)
+get_categories_page = _run_sync(crud.get_categories_page)
+get_categories_by_section = _run_sync(crud.get_categories_by_section)
+create_category = _run_sync(crud.create_category)
+update_category = _run_sync(crud.update_category)
+delete_category = _run_sync(crud.delete_category)
+
+get_product = _run_sync(crud.get_product)
+get_product_with_relations = _run_sync(crud.get_product_with_relations)
+get_products = _run_sync(crud.get_products)
+get_products_page = _run_sync(crud.get_products_page)
+get_products_by_category = _run_sync(crud.get_products_by_category)
+get_product_neighbors = _run_sync(crud.get_product_neighbors)
+create_product = _run_sync(crud.create_product)
+update_product = _run_sync(crud.update_product)
+delete_product = _run_sync(crud.delete_product)
+purge_deleted_products = _run_sync(crud.purge_deleted_products)
+set_product_image_variants = _run_sync(crud.set_product_image_variants)
+get_image_variants_by_path = _run_sync(crud.get_image_variants_by_path)
+
+get_menu_tree = _run_sync(crud.get_menu_tree)
+get_menu_events_page = _run_sync(crud.get_menu_events_page)
+get_menu_version = _run_sync(crud.get_menu_version)
+
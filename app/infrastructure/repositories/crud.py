@@ -1,9 +1,35 @@
-from sqlalchemy.orm import Session
-from app.domain.entities.models import User, Restaurant, Section, Category, Product, TelegramSession
+from sqlalchemy import case, func
+from sqlalchemy.orm import Session, selectinload, joinedload
+from sqlalchemy.orm.attributes import set_committed_value
+from app.domain.entities.models import User, Restaurant, Section, Category, Product, TelegramSession, MenuEvent, StoredFile, CacheVersion
 from app.domain.entities.schemas import UserCreate, RestaurantCreate, SectionCreate, CategoryCreate, ProductCreate, TelegramUserCreate, TelegramSessionCreate
-from app.presentation.api.auth import get_password_hash, verify_password
-from typing import Optional, List, Dict, Any
+from app.infrastructure.cache.access_cache import invalidate_image_access, invalidate_restaurant_access, invalidate_user_access
+from app.infrastructure.cache.identity_cache import invalidate_identity
+from app.infrastructure.cache.invalidation import ACCESS_VERSION, shared_invalidation
+from app.infrastructure.images.derivatives import image_key
+from app.infrastructure.repositories.pagination import clamp_page_size, decode_cursor, encode_cursor, paginate
+from typing import Optional, List, Dict, Any, Iterator, Tuple
+from datetime import datetime
 import json
+import posixpath
+
+def bump_cache_version(db: Session, name: str = ACCESS_VERSION) -> None:
+    """Сигнал другим процессам сбросить кэши; фиксируется вместе с изменением"""
+    updated = (
+        db.query(CacheVersion)
+        .filter(CacheVersion.name == name)
+        .update({CacheVersion.version: CacheVersion.version + 1}, synchronize_session=False)
+    )
+    if not updated:
+        db.add(CacheVersion(name=name, version=1))
+
+def get_cache_version(db: Session, name: str = ACCESS_VERSION) -> int:
+    version = db.query(CacheVersion.version).filter(CacheVersion.name == name).scalar()
+    return version or 0
+
+def sync_access_caches(db: Session) -> None:
+    """Сброс кэшей доступа и пользователей процесса, если их сбросил другой процесс"""
+    shared_invalidation.sync(lambda: get_cache_version(db))
 
 def get_user(db: Session, user_id: int) -> Optional[User]:
     return db.query(User).filter(User.id == user_id).first()
@@ -15,22 +41,22 @@ def get_user_by_telegram_id(db: Session, telegram_id: int) -> Optional[User]:
     return db.query(User).filter(User.telegram_id == telegram_id).first()
 
 def get_users(db: Session, skip: int = 0, limit: int = 100) -> List[User]:
-    return db.query(User).offset(skip).limit(limit).all()
+    return db.query(User).order_by(User.id).offset(skip).limit(clamp_page_size(limit)).all()
 
-def create_user(db: Session, user: UserCreate) -> User:
-    hashed_password = get_password_hash(user.password)
+def create_user(db: Session, user: UserCreate, hashed_password: str) -> User:
     db_user = User(
         username=user.username,
         hashed_password=hashed_password,
         role=user.role
     )
     db.add(db_user)
+    bump_cache_version(db)
     db.commit()
     db.refresh(db_user)
+    invalidate_identity(user.username)
     return db_user
 
-def create_telegram_user(db: Session, user: TelegramUserCreate) -> User:
-    hashed_password = get_password_hash(user.password)
+def create_telegram_user(db: Session, user: TelegramUserCreate, hashed_password: str) -> User:
     db_user = User(
         username=user.username,
         hashed_password=hashed_password,
@@ -42,24 +68,42 @@ def create_telegram_user(db: Session, user: TelegramUserCreate) -> User:
         is_telegram_user=True
     )
     db.add(db_user)
+    bump_cache_version(db)
     db.commit()
     db.refresh(db_user)
+    invalidate_identity(user.username)
     return db_user
 
+def set_user_password(db: Session, user: User, hashed_password: str) -> User:
+    """Смена пароля: снимки пользователя сбрасываются и в других процессах"""
+    user.hashed_password = hashed_password  # type: ignore
+    bump_cache_version(db)
+    db.commit()
+    invalidate_identity(str(user.username))
+    return user
+
 def update_user(db: Session, user_id: int, user_update: Any) -> Optional[User]:
     db_user = get_user(db, user_id)
     if db_user:
+        old_username = str(db_user.username)
         for field, value in user_update.dict(exclude_unset=True).items():
             setattr(db_user, field, value)
+        bump_cache_version(db)
         db.commit()
         db.refresh(db_user)
+        invalidate_user_access(user_id)
+        invalidate_identity(old_username)
+        invalidate_identity(str(db_user.username))
     return db_user
 
 def delete_user(db: Session, user_id: int) -> Optional[User]:
     db_user = get_user(db, user_id)
     if db_user:
         db.delete(db_user)
+        bump_cache_version(db)
         db.commit()
+        invalidate_user_access(user_id)
+        invalidate_identity(str(db_user.username))
     return db_user
 
 def get_telegram_session(db: Session, telegram_id: int) -> Optional[TelegramSession]:
@@ -105,11 +149,114 @@ def get_session_data(db: Session, telegram_id: int) -> Dict[str, Any]:
             return {}
     return {}
 
+def record_menu_event(db: Session, action: str, entity: Any) -> None:
+    """Запись изменения ресторана, раздела, категории или продукта в журнал menu_events.
+
+    Запись добавляется в текущую транзакцию и фиксируется вместе с изменением.
+    """
+    if entity.id is None:
+        db.flush()
+    event = MenuEvent(action=action, entity_id=entity.id)
+    if isinstance(entity, Restaurant):
+        event.entity_type = "restaurant"
+        event.restaurant_id = entity.id
+        event.title = entity.name
+    elif isinstance(entity, Section):
+        event.entity_type = "section"
+        event.restaurant_id = entity.restaurant_id
+        event.section_id = entity.id
+        event.title = entity.name
+    elif isinstance(entity, Category):
+        event.entity_type = "category"
+        event.restaurant_id = entity.restaurant_id
+        event.section_id = entity.section_id
+        event.category_id = entity.id
+        event.title = entity.title
+    elif isinstance(entity, Product):
+        event.entity_type = "product"
+        event.restaurant_id = entity.restaurant_id
+        event.section_id = entity.category.section_id if entity.category else None
+        event.category_id = entity.category_id
+        event.title = entity.title
+    else:
+        raise ValueError(f"Unsupported menu entity: {type(entity).__name__}")
+    db.add(event)
+
+def get_menu_events_page(
+    db: Session,
+    restaurant_ids: Optional[List[int]] = None,
+    cursor: Optional[str] = None,
+    limit: int = 20,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+) -> Tuple[List[MenuEvent], Optional[str]]:
+    """Журнал изменений меню от новых записей к старым, пагинация по курсору (id).
+
+    Ресторан, раздел и категория (текущие названия) подгружаются тем же запросом.
+    """
+    query = db.query(MenuEvent).options(
+        joinedload(MenuEvent.restaurant),
+        joinedload(MenuEvent.section),
+        joinedload(MenuEvent.category),
+    )
+    if created_from is not None:
+        query = query.filter(MenuEvent.created_at >= created_from)
+    if created_to is not None:
+        query = query.filter(MenuEvent.created_at < created_to)
+    if restaurant_ids is None:
+        return paginate(query, [MenuEvent.id], cursor, limit, descending=True)
+    if len(restaurant_ids) == 1:
+        query = query.filter(MenuEvent.restaurant_id == restaurant_ids[0])
+        return paginate(query, [MenuEvent.id], cursor, limit, descending=True)
+
+    # Для нескольких ресторанов IN (...) ORDER BY id заставил бы БД сортировать всю историю.
+    # Вместо этого по индексу (restaurant_id, id) берется не больше limit + 1 id
+    # каждого ресторана, а страница собирается из самых новых среди них
+    limit = clamp_page_size(limit)
+    id_query = query.with_entities(MenuEvent.id)
+    if cursor:
+        id_query = id_query.filter(MenuEvent.id < decode_cursor(cursor, 1)[0])
+    ids: List[int] = []
+    for restaurant_id in set(restaurant_ids):
+        ids.extend(
+            row.id for row in id_query.filter(MenuEvent.restaurant_id == restaurant_id)
+            .order_by(MenuEvent.id.desc()).limit(limit + 1)
+        )
+    ids = sorted(ids, reverse=True)[:limit + 1]
+    page_ids = ids[:limit]
+    events = query.filter(MenuEvent.id.in_(page_ids)).order_by(MenuEvent.id.desc()).all() if page_ids else []
+    next_cursor = encode_cursor([page_ids[-1]]) if len(ids) > limit else None
+    return events, next_cursor
+
 def get_restaurant(db: Session, restaurant_id: int) -> Optional[Restaurant]:
     return db.query(Restaurant).filter(Restaurant.id == restaurant_id).first()
 
 def get_restaurants(db: Session, skip: int = 0, limit: int = 100) -> List[Restaurant]:
-    return db.query(Restaurant).offset(skip).limit(limit).all()
+    return db.query(Restaurant).order_by(Restaurant.id).offset(skip).limit(clamp_page_size(limit)).all()
+
+def get_restaurants_page(db: Session, cursor: Optional[str] = None, limit: int = 100) -> Tuple[List[Restaurant], Optional[str]]:
+    return paginate(db.query(Restaurant), [Restaurant.id], cursor, limit)
+
+def get_menu_version(db: Session, restaurant_id: Optional[int] = None) -> Optional[Any]:
+    """Версия меню ресторана (или всех ресторанов): id и время последней записи menu_events.
+
+    Любое изменение через crud добавляет запись в журнал, поэтому версия растет
+    при каждой записи. Запрос читает одну строку индекса (restaurant_id, id).
+    """
+    query = db.query(MenuEvent.id, MenuEvent.created_at)
+    if restaurant_id is not None:
+        query = query.filter(MenuEvent.restaurant_id == restaurant_id)
+    return query.order_by(MenuEvent.id.desc()).first()
+
+def get_accessible_restaurant_ids(db: Session, user_id: int, role: str) -> Optional[List[int]]:
+    """ID ресторанов, изменения которых видит пользователь; None - все рестораны (админ)"""
+    if role == "admin":
+        return None
+    if role == "manager":
+        return [r.id for r in get_restaurants_by_manager(db, user_id)]
+    if role == "waiter":
+        return [r.id for r in get_restaurants_by_waiter_via_manager(db, user_id)]
+    return []
 
 def get_restaurants_by_manager(db: Session, manager_id: int) -> List[Restaurant]:
     return db.query(Restaurant).filter(Restaurant.manager_id == manager_id).all()
@@ -130,8 +277,11 @@ def get_restaurants_by_waiter_via_manager(db: Session, waiter_id: int) -> List[R
 def create_restaurant(db: Session, restaurant: RestaurantCreate) -> Restaurant:
     db_restaurant = Restaurant(**restaurant.dict())
     db.add(db_restaurant)
+    record_menu_event(db, "created", db_restaurant)
+    bump_cache_version(db)
     db.commit()
     db.refresh(db_restaurant)
+    invalidate_restaurant_access()
     return db_restaurant
 
 def update_restaurant(db: Session, restaurant_id: int, restaurant_update: Any) -> Optional[Restaurant]:
@@ -139,22 +289,47 @@ def update_restaurant(db: Session, restaurant_id: int, restaurant_update: Any) -
     if db_restaurant:
         for field, value in restaurant_update.dict(exclude_unset=True).items():
             setattr(db_restaurant, field, value)
+        record_menu_event(db, "updated", db_restaurant)
+        bump_cache_version(db)
         db.commit()
         db.refresh(db_restaurant)
+        invalidate_restaurant_access()
     return db_restaurant
 
 def delete_restaurant(db: Session, restaurant_id: int) -> Optional[Restaurant]:
     db_restaurant = get_restaurant(db, restaurant_id)
     if db_restaurant:
+        record_menu_event(db, "deleted", db_restaurant)
         db.delete(db_restaurant)
+        bump_cache_version(db)
         db.commit()
+        invalidate_restaurant_access()
     return db_restaurant
 
 def get_section(db: Session, section_id: int) -> Optional[Section]:
     return db.query(Section).filter(Section.id == section_id).first()
 
+def get_restaurant_with_relations(db: Session, restaurant_id: int) -> Optional[Restaurant]:
+    return (
+        db.query(Restaurant)
+        .options(selectinload(Restaurant.sections), joinedload(Restaurant.manager), joinedload(Restaurant.waiter))
+        .filter(Restaurant.id == restaurant_id)
+        .first()
+    )
+
+def get_section_with_relations(db: Session, section_id: int) -> Optional[Section]:
+    return (
+        db.query(Section)
+        .options(joinedload(Section.restaurant), selectinload(Section.categories))
+        .filter(Section.id == section_id)
+        .first()
+    )
+
 def get_sections(db: Session, skip: int = 0, limit: int = 100) -> List[Section]:
-    return db.query(Section).offset(skip).limit(limit).all()
+    return db.query(Section).order_by(Section.id).offset(skip).limit(clamp_page_size(limit)).all()
+
+def get_sections_page(db: Session, cursor: Optional[str] = None, limit: int = 100) -> Tuple[List[Section], Optional[str]]:
+    return paginate(db.query(Section), [Section.id], cursor, limit)
 
 def get_sections_by_restaurant(db: Session, restaurant_id: int) -> List[Section]:
     return db.query(Section).filter(Section.restaurant_id == restaurant_id).all()
@@ -162,6 +337,7 @@ def get_sections_by_restaurant(db: Session, restaurant_id: int) -> List[Section]
 def create_section(db: Session, section: SectionCreate) -> Section:
     db_section = Section(**section.dict())
     db.add(db_section)
+    record_menu_event(db, "created", db_section)
     db.commit()
     db.refresh(db_section)
     return db_section
@@ -171,6 +347,7 @@ def update_section(db: Session, section_id: int, section_update: Any) -> Optiona
     if db_section:
         for field, value in section_update.dict(exclude_unset=True).items():
             setattr(db_section, field, value)
+        record_menu_event(db, "updated", db_section)
         db.commit()
         db.refresh(db_section)
     return db_section
@@ -178,6 +355,7 @@ def update_section(db: Session, section_id: int, section_update: Any) -> Optiona
 def delete_section(db: Session, section_id: int) -> Optional[Section]:
     db_section = get_section(db, section_id)
     if db_section:
+        record_menu_event(db, "deleted", db_section)
         db.delete(db_section)
         db.commit()
     return db_section
@@ -185,18 +363,27 @@ def delete_section(db: Session, section_id: int) -> Optional[Section]:
 def get_category(db: Session, category_id: int) -> Optional[Category]:
     return db.query(Category).filter(Category.id == category_id).first()
 
+def get_category_with_relations(db: Session, category_id: int) -> Optional[Category]:
+    return (
+        db.query(Category)
+        .options(joinedload(Category.section), joinedload(Category.restaurant), selectinload(Category.products))
+        .filter(Category.id == category_id)
+        .first()
+    )
+
 def get_categories(db: Session, skip: int = 0, limit: int = 100) -> List[Category]:
-    return db.query(Category).offset(skip).limit(limit).all()
+    return db.query(Category).order_by(Category.id).offset(skip).limit(clamp_page_size(limit)).all()
+
+def get_categories_page(db: Session, cursor: Optional[str] = None, limit: int = 100) -> Tuple[List[Category], Optional[str]]:
+    return paginate(db.query(Category), [Category.id], cursor, limit)
 
 def get_categories_by_section(db: Session, section_id: int) -> List[Category]:
     return db.query(Category).filter(Category.section_id == section_id).all()
 
-def get_categories_by_restaurant(db: Session, restaurant_id: int) -> List[Category]:
-    return db.query(Category).filter(Category.restaurant_id == restaurant_id).all()
-
 def create_category(db: Session, category: CategoryCreate) -> Category:
     db_category = Category(**category.dict())
     db.add(db_category)
+    record_menu_event(db, "created", db_category)
     db.commit()
     db.refresh(db_category)
     return db_category
@@ -206,6 +393,7 @@ def update_category(db: Session, category_id: int, category_update: Any) -> Opti
     if db_category:
         for field, value in category_update.dict(exclude_unset=True).items():
             setattr(db_category, field, value)
+        record_menu_event(db, "updated", db_category)
         db.commit()
         db.refresh(db_category)
     return db_category
@@ -213,62 +401,337 @@ def update_category(db: Session, category_id: int, category_update: Any) -> Opti
 def delete_category(db: Session, category_id: int) -> Optional[Category]:
     db_category = get_category(db, category_id)
     if db_category:
+        record_menu_event(db, "deleted", db_category)
         db.delete(db_category)
         db.commit()
     return db_category
 
-def get_product(db: Session, product_id: int) -> Optional[Product]:
-    return db.query(Product).filter(Product.id == product_id).first()
+def get_product(db: Session, product_id: int, include_deleted: bool = False) -> Optional[Product]:
+    return (
+        db.query(Product)
+        .execution_options(include_deleted=include_deleted)
+        .filter(Product.id == product_id)
+        .first()
+    )
+
+def get_product_with_relations(db: Session, product_id: int) -> Optional[Product]:
+    return (
+        db.query(Product)
+        .options(joinedload(Product.category).joinedload(Category.section), joinedload(Product.restaurant))
+        .filter(Product.id == product_id)
+        .first()
+    )
 
 def get_products(db: Session, skip: int = 0, limit: int = 100) -> List[Product]:
-    return db.query(Product).offset(skip).limit(limit).all()
+    return db.query(Product).order_by(Product.id).offset(skip).limit(clamp_page_size(limit)).all()
+
+def get_products_page(db: Session, cursor: Optional[str] = None, limit: int = 100) -> Tuple[List[Product], Optional[str]]:
+    return paginate(db.query(Product), [Product.id], cursor, limit)
 
 def get_products_by_category(db: Session, category_id: int) -> List[Product]:
-    return db.query(Product).filter(Product.category_id == category_id).all()
+    return db.query(Product).filter(Product.category_id == category_id).order_by(Product.id).all()
 
 def get_products_by_restaurant(db: Session, restaurant_id: int) -> List[Product]:
     return db.query(Product).filter(Product.restaurant_id == restaurant_id).all()
 
-def get_recent_products(db: Session, limit: int = 10) -> List[Product]:
-    return db.query(Product).order_by(Product.modified_at.desc()).limit(limit).all()
+def get_product_neighbors(db: Session, category_id: int, product_id: int) -> Tuple[Optional[Any], Optional[Any]]:
+    """Предыдущий и следующий (по id) неудалённые продукты категории.
 
-def get_recent_products_by_restaurants(db: Session, restaurant_ids: List[int], limit: int = 10) -> List[Product]:
-    return db.query(Product).filter(Product.restaurant_id.in_(restaurant_ids)).order_by(Product.modified_at.desc()).limit(limit).all()
+    Два запроса с LIMIT 1 по индексу (category_id, id), возвращаются только id и title.
+    """
+    prev_product = (
+        db.query(Product.id, Product.title)
+        .filter(Product.category_id == category_id, Product.id < product_id)
+        .order_by(Product.id.desc())
+        .first()
+    )
+    next_product = (
+        db.query(Product.id, Product.title)
+        .filter(Product.category_id == category_id, Product.id > product_id)
+        .order_by(Product.id.asc())
+        .first()
+    )
+    return prev_product, next_product
+
+def _content_hash_from_path(path: str) -> Optional[str]:
+    """SHA-256 из имени файла вида ab/cd/<sha256>.jpg; None для старых имен product_<uuid>"""
+    stem = posixpath.splitext(posixpath.basename(path))[0]
+    if len(stem) == 64 and all(c in "0123456789abcdef" for c in stem):
+        return stem
+    return None
+
+def add_file_ref(db: Session, path: Optional[str]) -> None:
+    """Учет еще одной ссылки на загруженный файл (в текущей транзакции)"""
+    if not path:
+        return
+    updated = (
+        db.query(StoredFile)
+        .filter(StoredFile.path == path)
+        .update({StoredFile.ref_count: StoredFile.ref_count + 1}, synchronize_session=False)
+    )
+    if not updated:
+        db.add(StoredFile(path=path, sha256=_content_hash_from_path(path), ref_count=1))
+
+def release_file_ref(db: Session, path: Optional[str], count: int = 1) -> None:
+    """Снятие ссылок на файл; запись с ref_count = 0 остается для сборщика мусора"""
+    if not path:
+        return
+    db.query(StoredFile).filter(StoredFile.path == path, StoredFile.ref_count > 0).update(
+        {StoredFile.ref_count: case((StoredFile.ref_count > count, StoredFile.ref_count - count), else_=0)},
+        synchronize_session=False,
+    )
 
-def create_product(db: Session, product: ProductCreate) -> Product:
+def iter_referenced_image_paths(db: Session, batch_size: int = 1000) -> Iterator[str]:
+    """Все image_path продуктов, включая мягко удаленные, без загрузки списка целиком"""
+    query = (
+        db.query(Product.image_path)
+        .execution_options(include_deleted=True, yield_per=batch_size)
+        .filter(Product.image_path.isnot(None), Product.image_path != "")
+        .distinct()
+    )
+    for (image_path,) in query:
+        yield image_path
+
+def get_image_restaurant_ids(db: Session, key: str) -> List[int]:
+    """Рестораны продуктов с изображением key (путь без расширения, общий для копий)"""
+    rows = db.query(Product.restaurant_id).filter(Product.image_key == key).distinct().all()
+    return [restaurant_id for (restaurant_id,) in rows]
+
+def delete_released_stored_files(db: Session) -> int:
+    """Удаление записей о файлах без ссылок (после сборки мусора в uploads/)"""
+    deleted = (
+        db.query(StoredFile)
+        .filter(StoredFile.ref_count <= 0)
+        .delete(synchronize_session=False)
+    )
+    db.commit()
+    return deleted
+
+def _apply_image_metadata(db_product: Product, metadata: Optional[Dict[str, Any]]) -> None:
+    """Размеры и заглушка изображения ({"width", "height", "placeholder"}); None - неизвестны"""
+    metadata = metadata or {}
+    db_product.image_width = metadata.get("width")  # type: ignore
+    db_product.image_height = metadata.get("height")  # type: ignore
+    db_product.image_placeholder = metadata.get("placeholder")  # type: ignore
+
+def _product_image_key(path: Optional[str]) -> Optional[str]:
+    return image_key(path) if path else None
+
+def _image_access_changed(db: Session, *paths: Optional[str]) -> List[str]:
+    """Набор ресторанов изображений paths меняется: сигнал другим процессам
+    (в текущей транзакции), ключи для сброса кэша после commit"""
+    keys = [key for key in {_product_image_key(path) for path in paths} if key]
+    if keys:
+        bump_cache_version(db)
+    return keys
+
+def create_product(db: Session, product: ProductCreate, image_metadata: Optional[Dict[str, Any]] = None) -> Product:
     db_product = Product(**product.dict())
+    db_product.image_key = _product_image_key(db_product.image_path)  # type: ignore
+    _apply_image_metadata(db_product, image_metadata)
     db.add(db_product)
+    add_file_ref(db, db_product.image_path)
+    record_menu_event(db, "created", db_product)
+    changed_keys = _image_access_changed(db, db_product.image_path)
     db.commit()
     db.refresh(db_product)
+    for key in changed_keys:
+        invalidate_image_access(key)
     return db_product
 
-def update_product(db: Session, product_id: int, product_update: Any) -> Optional[Product]:
+def update_product(
+    db: Session, product_id: int, product_update: Any, image_metadata: Optional[Dict[str, Any]] = None
+) -> Optional[Product]:
+    """image_metadata - размеры и заглушка нового изображения из product_update"""
     db_product = get_product(db, product_id)
     if db_product:
+        previous_image_path = db_product.image_path
+        previous_restaurant_id = db_product.restaurant_id
         for field, value in product_update.dict(exclude_unset=True).items():
             setattr(db_product, field, value)
+        changed_keys: List[str] = []
+        if db_product.image_path != previous_image_path:
+            # Копии, размеры и заглушка относятся к прежнему изображению
+            db_product.image_key = _product_image_key(db_product.image_path)  # type: ignore
+            db_product.image_variants = None  # type: ignore
+            _apply_image_metadata(db_product, image_metadata)
+            release_file_ref(db, previous_image_path)
+            add_file_ref(db, db_product.image_path)
+            changed_keys = _image_access_changed(db, previous_image_path, db_product.image_path)
+        elif db_product.restaurant_id != previous_restaurant_id:
+            changed_keys = _image_access_changed(db, db_product.image_path)
+        elif image_metadata is not None:
+            _apply_image_metadata(db_product, image_metadata)
+        record_menu_event(db, "updated", db_product)
         db.commit()
         db.refresh(db_product)
+        for key in changed_keys:
+            invalidate_image_access(key)
     return db_product
 
 def delete_product(db: Session, product_id: int) -> Optional[Product]:
     db_product = get_product(db, product_id)
     if db_product:
         db_product.is_deleted = True # type: ignore
+        record_menu_event(db, "deleted", db_product)
+        changed_keys = _image_access_changed(db, db_product.image_path)
         db.commit()
         db.refresh(db_product)
+        for key in changed_keys:
+            invalidate_image_access(key)
     return db_product
 
-def get_first_product_by_category(db: Session, category_id: int):
-    return db.query(Product).filter(Product.category_id == category_id).order_by(Product.id.asc()).first()
+def _record_image_change(db: Session, product_id: int) -> None:
+    """Событие об обработке изображения живого продукта (удаленный не показывается)"""
+    db_product = get_product(db, product_id)
+    if db_product:
+        record_menu_event(db, "updated", db_product)
+
+def set_product_image_variants(db: Session, product_id: int, image_path: str, variants: List[Dict[str, Any]]) -> bool:
+    """Сохранение копий изображения, если у продукта все еще image_path.
+
+    Копии генерируются в фоне, и за это время изображение могло смениться.
+    modified_at не меняется, но в журнал пишется событие: разметка страниц
+    (srcset) меняется, и версия меню для ETag и кэша страниц должна вырасти.
+    """
+    updated = (
+        db.query(Product)
+        .execution_options(include_deleted=True)
+        .filter(Product.id == product_id, Product.image_path == image_path)
+        .update(
+            {Product.image_variants: variants, Product.modified_at: Product.modified_at},
+            synchronize_session=False,
+        )
+    )
+    if updated:
+        _record_image_change(db, product_id)
+    db.commit()
+    return updated > 0
+
+def set_product_image_metadata(db: Session, product_id: int, image_path: str, metadata: Dict[str, Any]) -> bool:
+    """Сохранение размеров и заглушки изображения, если у продукта все еще image_path
+    (для backfill). Как и для image_variants: modified_at не меняется, событие пишется.
+    """
+    updated = (
+        db.query(Product)
+        .execution_options(include_deleted=True)
+        .filter(Product.id == product_id, Product.image_path == image_path)
+        .update(
+            {
+                Product.image_width: metadata["width"],
+                Product.image_height: metadata["height"],
+                Product.image_placeholder: metadata["placeholder"],
+                Product.modified_at: Product.modified_at,
+            },
+            synchronize_session=False,
+        )
+    )
+    if updated:
+        _record_image_change(db, product_id)
+    db.commit()
+    return updated > 0
+
+def get_image_variants_by_path(db: Session, image_path: str) -> Optional[List[Dict[str, Any]]]:
+    """Готовые копии того же файла у другого продукта (файлы хранятся по хешу содержимого)"""
+    row = (
+        db.query(Product.image_variants)
+        .execution_options(include_deleted=True)
+        .filter(Product.image_path == image_path, Product.image_variants.isnot(None))
+        .first()
+    )
+    return row[0] if row else None
+
+def get_products_without_image_variants(db: Session) -> List[Product]:
+    """Продукты с изображением, для которого еще не созданы копии (для backfill)"""
+    return (
+        db.query(Product)
+        .execution_options(include_deleted=True)
+        .filter(Product.image_path.isnot(None), Product.image_path != "", Product.image_variants.is_(None))
+        .order_by(Product.id)
+        .all()
+    )
 
-def authenticate_user(db: Session, username: str, password: str) -> Optional[User]:
-    user = get_user_by_username(db, username)
-    if not user:
-        return None
-    if not verify_password(password, user.hashed_password):  # type: ignore
+def get_products_without_image_metadata(db: Session) -> List[Product]:
+    """Продукты с изображением, загруженным до сохранения размеров (для backfill)"""
+    return (
+        db.query(Product)
+        .execution_options(include_deleted=True)
+        .filter(Product.image_path.isnot(None), Product.image_path != "", Product.image_width.is_(None))
+        .order_by(Product.id)
+        .all()
+    )
+
+def purge_deleted_products(db: Session, deleted_before: datetime) -> int:
+    """Окончательное удаление продуктов, помеченных удаленными раньше deleted_before"""
+    expired = (
+        db.query(Product)
+        .execution_options(include_deleted=True)
+        .filter(Product.is_deleted == True, Product.modified_at < deleted_before)
+    )
+    # Мягко удаленный продукт можно восстановить, поэтому ссылку на изображение
+    # он держит до окончательного удаления
+    image_refs = (
+        expired.with_entities(Product.image_path, func.count(Product.id))
+        .filter(Product.image_path.isnot(None), Product.image_path != "")
+        .group_by(Product.image_path)
+        .all()
+    )
+    purged = expired.delete(synchronize_session=False)
+    for image_path, count in image_refs:
+        release_file_ref(db, image_path, count)
+    db.commit()
+    return purged
+
+def get_menu_tree(db: Session, restaurant_id: int) -> Optional[Restaurant]:
+    """Загрузка дерева меню ресторана (разделы, категории, первые продукты и их количество)
+    за постоянное число запросов, независимо от размера меню.
+
+    Каждой категории проставляются атрибуты ``first_product`` и ``products_count``
+    (учитываются только неудалённые продукты). Обратные связи (section.restaurant,
+    category.section, category.restaurant) заполняются загруженными объектами:
+    шаблон, который рендерится уже после выхода из сессии (потоковый ответ),
+    не вызывает ленивую загрузку.
+    """
+    restaurant = (
+        db.query(Restaurant)
+        .options(selectinload(Restaurant.sections).selectinload(Section.categories))
+        .filter(Restaurant.id == restaurant_id)
+        .first()
+    )
+    if not restaurant:
         return None
-    return user
+
+    # Одним агрегатом получаем первый продукт и количество продуктов по каждой категории
+    stats = (
+        db.query(Product.category_id, func.min(Product.id), func.count(Product.id))
+        .filter(Product.restaurant_id == restaurant_id)
+        .group_by(Product.category_id)
+        .all()
+    )
+    first_ids = [first_id for _, first_id, _ in stats]
+    first_products = {
+        p.category_id: p for p in db.query(Product).filter(Product.id.in_(first_ids)).all()
+    } if first_ids else {}
+    counts = {category_id: count for category_id, _, count in stats}
+
+    for section in restaurant.sections:
+        set_committed_value(section, "restaurant", restaurant)
+        for category in section.categories:
+            set_committed_value(category, "section", section)
+            set_committed_value(category, "restaurant", restaurant)
+            category.first_product = first_products.get(category.id)
+            category.products_count = counts.get(category.id, 0)
+    return restaurant
+
+def find_section_in_tree(restaurant: Restaurant, section_id: int) -> Optional[Section]:
+    return next((s for s in restaurant.sections if s.id == section_id), None)
+
+def find_category_in_tree(restaurant: Restaurant, category_id: int) -> Optional[Category]:
+    for section in restaurant.sections:
+        for category in section.categories:
+            if category.id == category_id:
+                return category
+    return None
 
 def authenticate_telegram_user(db: Session, telegram_id: int) -> Optional[User]:
     return get_user_by_telegram_id(db, telegram_id) 
\ No newline at end of file
@@ -0,0 +1,94 @@
+"""
+Keyset-пагинация (по курсору) для списков.
+
+Вместо OFFSET страница начинается строго после последней строки предыдущей:
+WHERE (col1, col2) > (:v1, :v2) ORDER BY col1, col2 LIMIT n. Скорость не зависит
+от номера страницы, а вставки во время обхода не приводят к пропускам и повторам.
+
+Курсор непрозрачен для клиента: это base64url от JSON со значениями ключа
+сортировки последней строки страницы.
+"""
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Any, List, Optional, Sequence, Tuple, TypeVar
+
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import InstrumentedAttribute, Query
+
+from app.config import MAX_PAGE_SIZE
+
+T = TypeVar("T")
+
+_DATETIME_TAG = "$dt"
+
+
+class InvalidCursorError(ValueError):
+    """Курсор поврежден или получен для другого списка"""
+
+
+def clamp_page_size(limit: int) -> int:
+    return max(1, min(limit, MAX_PAGE_SIZE))
+
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return {_DATETIME_TAG: value.isoformat()}
+    return value
+
+
+def _decode_value(value: Any) -> Any:
+    if isinstance(value, dict) and _DATETIME_TAG in value:
+        return datetime.fromisoformat(value[_DATETIME_TAG])
+    return value
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    raw = json.dumps([_encode_value(value) for value in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int) -> List[Any]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise InvalidCursorError("Invalid cursor")
+    if not isinstance(values, list) or len(values) != size:
+        raise InvalidCursorError("Invalid cursor")
+    try:
+        return [_decode_value(value) for value in values]
+    except (TypeError, ValueError):
+        raise InvalidCursorError("Invalid cursor")
+
+
+def _after(columns: Sequence[InstrumentedAttribute], values: Sequence[Any], descending: bool) -> Any:
+    """Условие "строка после курсора" для составного ключа, раскрытое через OR/AND"""
+    conditions = []
+    for i, column in enumerate(columns):
+        equal_prefix = [columns[j] == values[j] for j in range(i)]
+        step = column < values[i] if descending else column > values[i]
+        conditions.append(and_(*equal_prefix, step))
+    return or_(*conditions)
+
+
+def paginate(
+    query: Query,
+    columns: Sequence[InstrumentedAttribute],
+    cursor: Optional[str] = None,
+    limit: int = MAX_PAGE_SIZE,
+    descending: bool = False,
+) -> Tuple[List[Any], Optional[str]]:
+    """Страница query по ключу columns; последний столбец ключа должен быть уникальным (обычно id)"""
+    limit = clamp_page_size(limit)
+    if cursor:
+        query = query.filter(_after(columns, decode_cursor(cursor, len(columns)), descending))
+    order = [column.desc() for column in columns] if descending else list(columns)
+    # Лишняя строка показывает, есть ли следующая страница, без отдельного COUNT
+    rows = query.order_by(*order).limit(limit + 1).all()
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, encode_cursor([getattr(last, column.key) for column in columns])
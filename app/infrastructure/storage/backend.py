@@ -0,0 +1,36 @@
+from app.config import (
+    STORAGE_BACKEND, UPLOAD_DIR, UPLOADS_URL_PREFIX, UPLOADS_ACCESS_CONTROL,
+    S3_BUCKET, S3_PREFIX, S3_ENDPOINT_URL, S3_REGION, S3_ACCESS_KEY_ID, S3_SECRET_ACCESS_KEY, S3_PUBLIC_URL,
+)
+from app.infrastructure.storage.base import Storage
+from app.infrastructure.storage.local import LocalStorage
+
+
+def create_storage() -> Storage:
+    """Драйвер хранилища по STORAGE_BACKEND: local (каталог UPLOAD_DIR) или s3"""
+    if STORAGE_BACKEND == "s3":
+        from app.infrastructure.storage.s3 import S3Storage
+        return S3Storage(
+            S3_BUCKET,
+            UPLOADS_URL_PREFIX,
+            prefix=S3_PREFIX,
+            endpoint_url=S3_ENDPOINT_URL,
+            region=S3_REGION,
+            access_key_id=S3_ACCESS_KEY_ID,
+            secret_access_key=S3_SECRET_ACCESS_KEY,
+            public_url=S3_PUBLIC_URL,
+        )
+    if STORAGE_BACKEND != "local":
+        raise ValueError(f"Unsupported STORAGE_BACKEND: {STORAGE_BACKEND}")
+    return LocalStorage(UPLOAD_DIR, UPLOADS_URL_PREFIX)
+
+
+storage = create_storage()
+
+
+def upload_url(path: str) -> str:
+    """URL загруженного файла для шаблонов"""
+    if UPLOADS_ACCESS_CONTROL:
+        # Доступ проверяет /uploads - прямая ссылка на хранилище обошла бы проверку
+        return UPLOADS_URL_PREFIX + path
+    return storage.url(path)
@@ -0,0 +1,64 @@
+"""
+Хранилище загруженных файлов.
+
+Пути файлов - относительные, с "/" (как Product.image_path). Методы
+синхронные: из обработчиков они вызываются в потоке, а сборщик мусора и
+генерация копий изображений и так работают вне event loop.
+"""
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Iterator, Optional
+
+
+@dataclass
+class StoredObject:
+    path: str
+    size: int
+    mtime: float  # время последнего изменения, unix time
+
+
+class Storage(ABC):
+    """Базовый класс драйверов хранилища: драйвер без любого из абстрактных
+    методов не создается (TypeError при запуске, а не при первом вызове)"""
+
+    # Каталог с файлами, если хранилище локальное: файлы можно открыть напрямую
+    local_directory: Optional[str] = None
+
+    def __init__(self, url_prefix: str):
+        self.url_prefix = url_prefix
+
+    @abstractmethod
+    def exists(self, path: str) -> bool:
+        ...
+
+    @abstractmethod
+    def put_file(self, source: str, path: str) -> None:
+        """Перемещение локального файла source в хранилище под именем path"""
+
+    @abstractmethod
+    def download(self, path: str, destination: str) -> None:
+        """Потоковая запись файла хранилища в локальный файл destination"""
+
+    @abstractmethod
+    def touch(self, path: str) -> bool:
+        """Обновление времени изменения; False - файла нет"""
+
+    @abstractmethod
+    def delete(self, path: str) -> bool:
+        ...
+
+    @abstractmethod
+    def quarantine(self, path: str, destination: str) -> None:
+        """Перенос файла в карантин destination вместо удаления"""
+
+    @abstractmethod
+    def iter_objects(self) -> Iterator[StoredObject]:
+        """Все файлы хранилища; список не строится в памяти целиком"""
+
+    def url(self, path: str) -> str:
+        """URL файла для страниц"""
+        return self.url_prefix + path
+
+    def download_url(self, path: str, expires_in: int) -> Optional[str]:
+        """Временная прямая ссылка на файл в обход приложения; None - не поддерживается"""
+        return None
@@ -0,0 +1,68 @@
+import os
+import shutil
+from contextlib import suppress
+from typing import Iterator
+
+from app.infrastructure.storage.base import Storage, StoredObject
+
+
+def iter_files(directory: str) -> Iterator[os.DirEntry]:
+    """Обход дерева через os.scandir без построения списка файлов в памяти"""
+    pending = [directory]
+    while pending:
+        with os.scandir(pending.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    pending.append(entry.path)
+                elif entry.is_file(follow_symlinks=False):
+                    yield entry
+
+
+class LocalStorage(Storage):
+    """Файлы в локальном каталоге; отдаются приложением (UploadFiles)"""
+
+    def __init__(self, directory: str, url_prefix: str):
+        super().__init__(url_prefix)
+        self.local_directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _full_path(self, path: str) -> str:
+        return os.path.join(self.local_directory, *path.split("/"))
+
+    def exists(self, path: str) -> bool:
+        return os.path.isfile(self._full_path(path))
+
+    def put_file(self, source: str, path: str) -> None:
+        target = self._full_path(path)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        os.replace(source, target)
+
+    def download(self, path: str, destination: str) -> None:
+        shutil.copyfile(self._full_path(path), destination)
+
+    def touch(self, path: str) -> bool:
+        try:
+            os.utime(self._full_path(path))
+        except FileNotFoundError:
+            return False
+        return True
+
+    def delete(self, path: str) -> bool:
+        with suppress(FileNotFoundError):
+            os.remove(self._full_path(path))
+            return True
+        return False
+
+    def quarantine(self, path: str, destination: str) -> None:
+        target = os.path.join(destination, *path.split("/"))
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        os.replace(self._full_path(path), target)
+
+    def iter_objects(self) -> Iterator[StoredObject]:
+        for entry in iter_files(self.local_directory):
+            try:
+                stat_result = entry.stat(follow_symlinks=False)
+            except FileNotFoundError:
+                continue
+            path = os.path.relpath(entry.path, self.local_directory).replace(os.sep, "/")
+            yield StoredObject(path, stat_result.st_size, stat_result.st_mtime)
@@ -0,0 +1,134 @@
+"""
+Драйвер S3-совместимого объектного хранилища (AWS S3, MinIO, Ceph RGW).
+
+Несколько экземпляров приложения за балансировщиком работают с одним
+бакетом вместо общего диска. Страницы ссылаются на файлы напрямую
+(public_url, например CDN перед бакетом) или через /uploads, который
+перенаправляет на подписанную временную ссылку: байты изображений идут
+клиенту из хранилища, минуя приложение.
+"""
+import mimetypes
+import os
+from contextlib import suppress
+from typing import Any, Dict, Iterator, Optional
+
+from app.infrastructure.storage.base import Storage, StoredObject
+
+try:
+    import boto3
+    from botocore.exceptions import ClientError
+except ImportError:  # нужен только для STORAGE_BACKEND=s3
+    boto3 = None
+
+# Имена файлов содержат хеш содержимого - объект под ключом не меняется
+OBJECT_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+class S3Storage(Storage):
+    def __init__(
+        self,
+        bucket: str,
+        url_prefix: str,
+        prefix: str = "",
+        endpoint_url: Optional[str] = None,
+        region: Optional[str] = None,
+        access_key_id: Optional[str] = None,
+        secret_access_key: Optional[str] = None,
+        public_url: Optional[str] = None,
+    ):
+        if boto3 is None:
+            raise RuntimeError("Для хранилища S3 установите пакет boto3")
+        super().__init__(url_prefix)
+        self.bucket = bucket
+        self.prefix = prefix
+        self.public_url = public_url.rstrip("/") + "/" if public_url else None
+        self._client_options: Dict[str, Any] = {
+            "endpoint_url": endpoint_url or None,
+            "region_name": region or None,
+            "aws_access_key_id": access_key_id or None,
+            "aws_secret_access_key": secret_access_key or None,
+        }
+        self._client: Any = None
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # Драйвер передается в процессы генерации копий; клиент создается там заново
+        state = self.__dict__.copy()
+        state["_client"] = None
+        return state
+
+    @property
+    def client(self) -> Any:
+        if self._client is None:
+            self._client = boto3.client("s3", **self._client_options)
+        return self._client
+
+    def _key(self, path: str) -> str:
+        return self.prefix + path
+
+    def _object_headers(self, path: str) -> Dict[str, str]:
+        return {
+            "ContentType": mimetypes.guess_type(path)[0] or "application/octet-stream",
+            "CacheControl": OBJECT_CACHE_CONTROL,
+        }
+
+    def exists(self, path: str) -> bool:
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=self._key(path))
+        except ClientError as e:
+            if e.response["Error"]["Code"] in ("404", "NoSuchKey", "NotFound"):
+                return False
+            raise
+        return True
+
+    def put_file(self, source: str, path: str) -> None:
+        # upload_file читает файл частями и для больших файлов использует multipart upload
+        self.client.upload_file(source, self.bucket, self._key(path), ExtraArgs=self._object_headers(path))
+        os.remove(source)
+
+    def download(self, path: str, destination: str) -> None:
+        self.client.download_file(self.bucket, self._key(path), destination)
+
+    def touch(self, path: str) -> bool:
+        # Копирование объекта в себя с заменой метаданных обновляет LastModified
+        try:
+            self.client.copy_object(
+                Bucket=self.bucket,
+                Key=self._key(path),
+                CopySource={"Bucket": self.bucket, "Key": self._key(path)},
+                MetadataDirective="REPLACE",
+                **self._object_headers(path),
+            )
+        except ClientError as e:
+            if e.response["Error"]["Code"] in ("404", "NoSuchKey", "NotFound"):
+                return False
+            raise
+        return True
+
+    def delete(self, path: str) -> bool:
+        self.client.delete_object(Bucket=self.bucket, Key=self._key(path))
+        return True
+
+    def quarantine(self, path: str, destination: str) -> None:
+        """destination - префикс ключа, лучше вне prefix, чтобы файлы не попадали в обход"""
+        target = destination.strip("/") + "/" + path
+        self.client.copy_object(
+            Bucket=self.bucket, Key=target, CopySource={"Bucket": self.bucket, "Key": self._key(path)}
+        )
+        with suppress(ClientError):
+            self.delete(path)
+
+    def iter_objects(self) -> Iterator[StoredObject]:
+        paginator = self.client.get_paginator("list_objects_v2")
+        for page in paginator.paginate(Bucket=self.bucket, Prefix=self.prefix):
+            for item in page.get("Contents", []):
+                yield StoredObject(item["Key"][len(self.prefix):], item["Size"], item["LastModified"].timestamp())
+
+    def url(self, path: str) -> str:
+        if self.public_url:
+            return self.public_url + self._key(path)
+        return super().url(path)
+
+    def download_url(self, path: str, expires_in: int) -> Optional[str]:
+        return self.client.generate_presigned_url(
+            "get_object", Params={"Bucket": self.bucket, "Key": self._key(path)}, ExpiresIn=expires_in
+        )
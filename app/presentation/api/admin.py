@@ -0,0 +1,21 @@
+from typing import Any, Dict
+from fastapi import APIRouter, Depends
+from app.presentation.api.auth import get_current_admin_user
+from app.infrastructure.cache.identity_cache import CurrentUser
+from app.infrastructure.database.database import get_pool_stats
+from app.application.services.password_service import password_service
+from app.infrastructure.cache.page_cache import page_cache
+
+router = APIRouter(prefix="/admin", tags=["admin"])
+
+
+@router.get("/stats")
+async def read_runtime_stats(
+    current_user: CurrentUser = Depends(get_current_admin_user)
+) -> Dict[str, Any]:
+    """Состояние пулов соединений с БД, пула хеширования паролей и кэша страниц"""
+    return {
+        "database_pools": get_pool_stats(),
+        "password_hasher": password_service.stats(),
+        "page_cache": page_cache.stats(),
+    }
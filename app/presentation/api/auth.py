@@ -1,18 +1,17 @@
 from datetime import datetime, timedelta
 from typing import Optional, List
 from jose import JWTError, jwt
-from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status, APIRouter, Request
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
-from app.infrastructure.database.database import get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.infrastructure.database.database import get_db, get_async_db
 from app.domain.entities.models import User
 from app.domain.entities.schemas import TokenData
 from app.config import SECRET_KEY, ALGORITHM
 from app.domain.entities.models import Restaurant
-
-# Настройка шифрования паролей
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+from app.infrastructure.cache.identity_cache import CurrentUser, get_identity
+from app.infrastructure.repositories.crud import sync_access_caches
 
 # Настройка JWT токенов
 security = HTTPBearer()
@@ -20,26 +19,6 @@ security = HTTPBearer()
 router = APIRouter()
 
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Проверка пароля"""
-    return pwd_context.verify(plain_password, hashed_password)
-
-
-def get_password_hash(password: str) -> str:
-    """Хеширование пароля"""
-    return pwd_context.hash(password)
-
-
-def authenticate_user(db: Session, username: str, password: str) -> Optional[User]:
-    """Аутентификация пользователя"""
-    user = db.query(User).filter(User.username == username).first()
-    if not user:
-        return None
-    if not verify_password(password, user.hashed_password):  # type: ignore
-        return None
-    return user
-
-
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Создание JWT токена"""
     to_encode = data.copy()
@@ -52,10 +31,20 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     return encoded_jwt
 
 
-def get_current_user(
+def load_current_user(db: Session, username: str) -> Optional[CurrentUser]:
+    """Получение снимка пользователя по username из токена (с кэшированием)"""
+    sync_access_caches(db)
+
+    def loader() -> Optional[CurrentUser]:
+        user = db.query(User).filter(User.username == username).first()
+        return CurrentUser.from_model(user) if user else None
+    return get_identity(username, loader)
+
+
+async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
-) -> User:
+    db: AsyncSession = Depends(get_async_db)
+) -> CurrentUser:
     """Получение текущего пользователя из токена"""
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -75,7 +64,7 @@ def get_current_user(
     except JWTError:
         raise credentials_exception
     
-    user = db.query(User).filter(User.username == token_data.username).first()
+    user = await db.run_sync(load_current_user, token_data.username)
     if user is None:
         raise credentials_exception
     return user
@@ -84,7 +73,7 @@ def get_current_user(
 def get_current_user_from_cookies(
     request: Request,
     db: Session = Depends(get_db)
-) -> Optional[User]:
+) -> Optional[CurrentUser]:
     """Получение текущего пользователя из cookies (для веб-интерфейса)"""
     token = request.cookies.get("access_token")
     if not token:
@@ -98,18 +87,17 @@ def get_current_user_from_cookies(
     except JWTError:
         return None
     
-    user = db.query(User).filter(User.username == username).first()
-    return user
+    return load_current_user(db, username)
 
 
-def get_current_active_user(current_user: User = Depends(get_current_user)) -> User:
+def get_current_active_user(current_user: CurrentUser = Depends(get_current_user)) -> CurrentUser:
     """Получение активного пользователя"""
-    if not current_user.is_active:  # type: ignore
+    if not current_user.is_active:
         raise HTTPException(status_code=400, detail="Inactive user")
     return current_user
 
 
-def get_current_staff_user(current_user: User = Depends(get_current_user)) -> User:
+def get_current_staff_user(current_user: CurrentUser = Depends(get_current_user)) -> CurrentUser:
     """Получение пользователя с правами staff"""
     if not current_user.is_staff and not current_user.is_superuser:
         raise HTTPException(
@@ -119,7 +107,7 @@ def get_current_staff_user(current_user: User = Depends(get_current_user)) -> Us
     return current_user
 
 
-def get_current_superuser(current_user: User = Depends(get_current_user)) -> User:
+def get_current_superuser(current_user: CurrentUser = Depends(get_current_user)) -> CurrentUser:
     """Получение суперпользователя"""
     if not current_user.is_superuser:
         raise HTTPException(
@@ -129,6 +117,16 @@ def get_current_superuser(current_user: User = Depends(get_current_user)) -> Use
     return current_user
 
 
+def get_current_admin_user(current_user: CurrentUser = Depends(get_current_active_user)) -> CurrentUser:
+    """Получение пользователя с ролью администратора"""
+    if current_user.role != "admin":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions"
+        )
+    return current_user
+
+
 def get_user_restaurants(user: User, db: Session) -> List[Restaurant]:
     """Получение ресторанов, доступных пользователю"""
     if user.is_superuser:
@@ -1,34 +1,36 @@
 from datetime import timedelta
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
-from app.infrastructure.database.database import get_db
-from app.presentation.api.auth import authenticate_user, create_access_token, get_current_active_user
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.infrastructure.database.database import get_async_db
+from app.presentation.api.auth import create_access_token, get_current_active_user
 from app.domain.entities.schemas import Token, User, UserCreate
-from app.infrastructure.repositories.crud import create_user, get_user_by_username
+from app.infrastructure.repositories.async_crud import get_user, get_user_by_username
+from app.application.services.user_service import UserService
+from app.infrastructure.cache.identity_cache import CurrentUser
 from app.config import ACCESS_TOKEN_EXPIRE_MINUTES
 
 router = APIRouter(prefix="/auth", tags=["authentication"])
 
 
 @router.post("/register", response_model=User)
-def register(user: UserCreate, db: Session = Depends(get_db)):
+async def register(user: UserCreate, db: AsyncSession = Depends(get_async_db)):
     """Регистрация нового пользователя"""
     # Проверяем, существует ли пользователь с таким именем
-    db_user = get_user_by_username(db, username=user.username)
+    db_user = await get_user_by_username(db, username=user.username)
     if db_user:
         raise HTTPException(
             status_code=400,
             detail="Username already registered"
         )
     
-    return create_user(db=db, user=user)
+    return await UserService.create_user(db, user)
 
 
 @router.post("/login", response_model=Token)
-def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
+async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(get_async_db)):
     """Вход в систему"""
-    user = authenticate_user(db, form_data.username, form_data.password)
+    user = await UserService.authenticate_user(db, form_data.username, form_data.password)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -45,6 +47,10 @@ def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depend
 
 
 @router.get("/me", response_model=User)
-def read_users_me(current_user: User = Depends(get_current_active_user)):
+async def read_users_me(current_user: CurrentUser = Depends(get_current_active_user), db: AsyncSession = Depends(get_async_db)):
     """Получение информации о текущем пользователе"""
-    return current_user 
\ No newline at end of file
+    # В кэше хранится только снимок, полный профиль читаем из базы
+    user = await get_user(db, current_user.id)
+    if user is None:
+        raise HTTPException(status_code=404, detail="User not found")
+    return user 
\ No newline at end of file
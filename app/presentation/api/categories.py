@@ -1,36 +1,49 @@
-from typing import List, Any
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from app.infrastructure.database.database import get_db
+from typing import List, Any, Optional, Union
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.infrastructure.database.database import get_async_db
 from app.presentation.api.auth import get_current_active_user
-from app.domain.entities.models import User
-from app.domain.entities.schemas import Category, CategoryCreate, CategoryWithRelations
-from app.infrastructure.repositories.crud import (
-    create_category, get_category, get_categories
+from app.infrastructure.cache.identity_cache import CurrentUser
+from app.domain.entities.schemas import Page, Category, CategoryCreate, CategoryWithRelations
+from app.infrastructure.repositories.pagination import InvalidCursorError
+from app.presentation.api.conditional import conditional_menu_get
+from app.infrastructure.repositories.async_crud import (
+    create_category, get_category_with_relations, get_categories, get_categories_page
 )
 
-router = APIRouter(prefix="/categories", tags=["categories"])
+router = APIRouter(prefix="/categories", tags=["categories"], dependencies=[Depends(conditional_menu_get)])
 
 
-@router.get("/", response_model=List[Category])
-def read_categories(
+@router.get("/", response_model=Union[List[Category], Page[Category]])
+async def read_categories(
     skip: int = 0,
-    limit: int = 100,
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    limit: int = Query(100, ge=1),
+    cursor: Optional[str] = None,
+    current_user: CurrentUser = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_async_db)
 ) -> Any:
-    """Получение списка категорий"""
-    return get_categories(db, skip=skip, limit=limit)
+    """Получение списка категорий
+
+    По умолчанию ответ - список со смещением skip. С параметром cursor (пустым
+    для первой страницы) ответ - страница {items, next_cursor} с обходом по курсору.
+    """
+    if cursor is None:
+        return await get_categories(db, skip=skip, limit=limit)
+    try:
+        items, next_cursor = await get_categories_page(db, cursor=cursor, limit=limit)
+    except InvalidCursorError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return {"items": items, "next_cursor": next_cursor}
 
 
 @router.get("/{category_id}", response_model=CategoryWithRelations)
-def read_category(
+async def read_category(
     category_id: int,
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    current_user: CurrentUser = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_async_db)
 ) -> Any:
     """Получение детальной информации о категории"""
-    category = get_category(db, category_id=category_id)
+    category = await get_category_with_relations(db, category_id=category_id)
     if category is None:
         raise HTTPException(status_code=404, detail="Category not found")
     
@@ -38,10 +51,10 @@ def read_category(
 
 
 @router.post("/", response_model=Category)
-def create_new_category(
+async def create_new_category(
     category: CategoryCreate,
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    current_user: CurrentUser = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_async_db)
 ) -> Any:
     """Создание новой категории (только для staff)"""
-    return create_category(db=db, category=category) 
\ No newline at end of file
+    return await create_category(db=db, category=category) 
\ No newline at end of file
@@ -0,0 +1,239 @@
+"""
+Сжатие HTTP-ответов (brotli, gzip) и раздача заранее сжатой статики.
+
+CompressionMiddleware сжимает ответы приложения по Accept-Encoding клиента:
+маленькие ответы (меньше COMPRESSION_MIN_SIZE) и уже сжатые форматы
+(изображения, архивы) отправляются как есть. Потоковые ответы сжимаются
+по частям с flush, чтобы не терять ранний первый байт.
+
+Для static/ сжатие выполняется один раз при сборке (compress_static.py):
+рядом с файлом пишутся копии .br и .gz, которые PrecompressedStaticFiles
+отдает напрямую, без сжатия на каждый запрос.
+"""
+import gzip
+import mimetypes
+import os
+import stat
+import zlib
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import anyio
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+
+from app.config import (
+    COMPRESSION_MIN_SIZE, GZIP_LEVEL, BROTLI_QUALITY,
+    COMPRESSION_EXCLUDED_TYPES, PRECOMPRESS_EXTENSIONS,
+)
+
+try:
+    import brotli
+except ImportError:  # без пакета brotli остается только gzip
+    brotli = None
+
+Scope = Dict[str, Any]
+Message = Dict[str, Any]
+Receive = Callable[[], Awaitable[Message]]
+Send = Callable[[Message], Awaitable[None]]
+ASGIApp = Callable[[Scope, Receive, Send], Awaitable[None]]
+
+# Суффиксы сжатых копий статики в порядке предпочтения
+PRECOMPRESSED_SUFFIXES: List[Tuple[str, str]] = [("br", ".br"), ("gzip", ".gz")]
+
+
+def accepted_encodings(headers: Headers) -> List[str]:
+    """Кодировки из Accept-Encoding, которые сервер умеет отдавать, в порядке предпочтения"""
+    accepted = set()
+    for item in headers.get("accept-encoding", "").split(","):
+        name, _, params = item.strip().partition(";")
+        quality = params.strip()
+        if quality.startswith("q="):
+            try:
+                if float(quality[2:]) <= 0:
+                    continue
+            except ValueError:
+                continue
+        accepted.add(name.strip().lower())
+    supported = ["br", "gzip"] if brotli is not None else ["gzip"]
+    return [encoding for encoding in supported if encoding in accepted]
+
+
+def is_compressible(headers: Headers) -> bool:
+    if "content-encoding" in headers:
+        return False
+    content_type = headers.get("content-type", "").lower()
+    return not content_type.startswith(COMPRESSION_EXCLUDED_TYPES)
+
+
+class _Compressor:
+    def __init__(self, encoding: str):
+        self.encoding = encoding
+        if encoding == "br":
+            self._brotli = brotli.Compressor(quality=BROTLI_QUALITY)
+        else:
+            # wbits=31: поток в формате gzip (с заголовком и контрольной суммой)
+            self._zlib = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        """Сжатие очередной части с выталкиванием буфера, чтобы клиент получил ее сразу"""
+        if self.encoding == "br":
+            return self._brotli.process(data) + self._brotli.flush()
+        return self._zlib.compress(data) + self._zlib.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self, data: bytes = b"") -> bytes:
+        if self.encoding == "br":
+            return self._brotli.process(data) + self._brotli.finish()
+        return self._zlib.compress(data) + self._zlib.flush()
+
+
+class CompressionMiddleware:
+    """ASGI-middleware сжатия ответов по Accept-Encoding"""
+
+    def __init__(self, app: ASGIApp, minimum_size: int = COMPRESSION_MIN_SIZE):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encodings = accepted_encodings(Headers(scope=scope))
+        if not encodings:
+            await self.app(scope, receive, send)
+            return
+        await _CompressionResponder(self.app, encodings[0], self.minimum_size)(scope, receive, send)
+
+
+class _CompressionResponder:
+    def __init__(self, app: ASGIApp, encoding: str, minimum_size: int):
+        self.app = app
+        self.encoding = encoding
+        self.minimum_size = minimum_size
+        self.send: Send
+        self.start_message: Optional[Message] = None
+        self.compressor: Optional[_Compressor] = None
+        self.passthrough = False
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        self.send = send
+        await self.app(scope, receive, self.send_compressed)
+
+    async def send_compressed(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            # Решение о сжатии откладывается до первой части тела
+            self.start_message = message
+            return
+        if message["type"] != "http.response.body":
+            if self.start_message is not None and self.compressor is None and not self.passthrough:
+                # Тело отправляет сам сервер (pathsend, zerocopysend) - сжимать нечего
+                self.passthrough = True
+                await self.send(self.start_message)
+            await self.send(message)
+            return
+        if self.passthrough:
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        if self.compressor is None:
+            assert self.start_message is not None
+            headers = MutableHeaders(raw=self.start_message["headers"])
+            status = self.start_message["status"]
+            small = not more_body and len(body) < self.minimum_size
+            if status < 200 or status in (204, 304) or small or not is_compressible(headers):
+                self.passthrough = True
+                await self.send(self.start_message)
+                await self.send(message)
+                return
+            self.compressor = _Compressor(self.encoding)
+            headers["Content-Encoding"] = self.encoding
+            headers.add_vary_header("Accept-Encoding")
+            if more_body:
+                del headers["Content-Length"]
+            else:
+                body = self.compressor.finish(body)
+                headers["Content-Length"] = str(len(body))
+                await self.send(self.start_message)
+                await self.send({"type": "http.response.body", "body": body})
+                return
+            await self.send(self.start_message)
+
+        body = self.compressor.compress(body) if more_body else self.compressor.finish(body)
+        await self.send({"type": "http.response.body", "body": body, "more_body": more_body})
+
+
+class PrecompressedStaticFiles(StaticFiles):
+    """StaticFiles, отдающий готовую копию file.br / file.gz, если клиент ее принимает.
+
+    Копия используется, только если она не старее исходного файла: после
+    правки CSS без повторной сборки отдается актуальный несжатый файл.
+    """
+
+    def _lookup_precompressed(self, path: str, suffix: str) -> Optional[Tuple[str, os.stat_result]]:
+        _, source_stat = self.lookup_path(path)
+        if source_stat is None or not stat.S_ISREG(source_stat.st_mode):
+            return None
+        compressed_path, compressed_stat = self.lookup_path(path + suffix)
+        if compressed_stat is None or not stat.S_ISREG(compressed_stat.st_mode):
+            return None
+        if compressed_stat.st_mtime < source_stat.st_mtime:
+            return None
+        return compressed_path, compressed_stat
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        if scope["method"] in ("GET", "HEAD"):
+            request_headers = Headers(scope=scope)
+            available = dict(PRECOMPRESSED_SUFFIXES)
+            for encoding in accepted_encodings(request_headers):
+                found = await anyio.to_thread.run_sync(self._lookup_precompressed, path, available[encoding])
+                if found is None:
+                    continue
+                full_path, stat_result = found
+                media_type = mimetypes.guess_type(path)[0] or "text/plain"
+                response = FileResponse(
+                    full_path, stat_result=stat_result, method=scope["method"], media_type=media_type
+                )
+                response.headers["Content-Encoding"] = encoding
+                response.headers.add_vary_header("Accept-Encoding")
+                if self.is_not_modified(response.headers, request_headers):
+                    return NotModifiedResponse(response.headers)
+                return response
+        return await super().get_response(path, scope)
+
+
+def _write_if_smaller(path: str, data: bytes, source_size: int) -> bool:
+    if len(data) >= source_size:
+        # Сжатие не дало выигрыша - устаревшую копию убираем, чтобы ее не отдавали
+        if os.path.exists(path):
+            os.remove(path)
+        return False
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+    return True
+
+
+def precompress_directory(directory: str) -> int:
+    """Запись копий .gz (и .br при наличии brotli) для текстовых файлов каталога; возвращает число записанных копий"""
+    written = 0
+    for root, _, files in os.walk(directory):
+        for name in files:
+            if not name.endswith(PRECOMPRESS_EXTENSIONS):
+                continue
+            source = os.path.join(root, name)
+            source_mtime = os.stat(source).st_mtime
+            with open(source, "rb") as f:
+                data = f.read()
+            variants = [(".gz", lambda: gzip.compress(data, compresslevel=9, mtime=0))]
+            if brotli is not None:
+                variants.append((".br", lambda: brotli.compress(data, quality=11)))
+            for suffix, compress in variants:
+                target = source + suffix
+                if os.path.exists(target) and os.stat(target).st_mtime >= source_mtime:
+                    continue
+                if _write_if_smaller(target, compress(), len(data)):
+                    written += 1
+    return written
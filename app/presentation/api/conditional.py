@@ -0,0 +1,162 @@
+"""
+Условные GET-запросы по версии меню (ETag / Last-Modified).
+
+Версия меню - id последней записи журнала menu_events ресторана (или всех
+ресторанов). Проверка If-None-Match выполняется до загрузки сущностей и
+рендеринга: при совпадении сразу возвращается 304 через исключение NotModified.
+"""
+import hashlib
+import os
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Dict, Optional
+
+from fastapi import Depends, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import RELEASE_ID, STATIC_DIR, TEMPLATES_DIR
+from app.infrastructure.cache.identity_cache import CurrentUser
+from app.infrastructure.database.database import get_async_db
+from app.presentation.api.auth import get_current_active_user
+from app.infrastructure.repositories.async_crud import get_menu_version
+
+
+# Сжатые копии (.gz/.br) повторяют исходные файлы и есть не на каждом хосте
+_DERIVED_SUFFIXES = (".gz", ".br", ".pyc")
+
+
+def _build_token(release_id: str, *directories: str) -> str:
+    """Отпечаток выпуска: RELEASE_ID из конфигурации либо хеш содержимого шаблонов
+    и статики. Зависит только от содержимого, а не от mtime и путей на диске,
+    поэтому одинаков на всех хостах за балансировщиком и после повторного деплоя.
+    """
+    digest = hashlib.sha1()
+    if release_id:
+        digest.update(release_id.encode())
+        return digest.hexdigest()[:8]
+    for directory in directories:
+        for root, dirs, files in os.walk(directory):
+            dirs.sort()
+            for name in sorted(files):
+                if name.endswith(_DERIVED_SUFFIXES):
+                    continue
+                path = os.path.join(root, name)
+                relative_path = os.path.relpath(path, directory).replace(os.sep, "/")
+                digest.update(f"{os.path.basename(directory)}/{relative_path}\0".encode())
+                with open(path, "rb") as f:
+                    digest.update(hashlib.sha1(f.read()).digest())
+    return digest.hexdigest()[:8]
+
+
+BUILD_TOKEN = _build_token(RELEASE_ID, TEMPLATES_DIR, STATIC_DIR)
+
+
+class NotModified(Exception):
+    """Ресурс не изменился, клиенту отправляется 304"""
+
+    def __init__(self, validators: "Validators"):
+        self.validators = validators
+
+
+@dataclass(frozen=True)
+class Validators:
+    etag: str
+    last_modified: Optional[datetime]
+    vary: str
+    # Last-Modified не различает пользователей, поэтому для персональных страниц
+    # If-Modified-Since не проверяется - только ETag
+    use_last_modified: bool
+
+    def headers(self) -> Dict[str, str]:
+        headers = {"ETag": self.etag, "Cache-Control": "private, no-cache", "Vary": self.vary}
+        if self.last_modified is not None:
+            headers["Last-Modified"] = format_datetime(self.last_modified, usegmt=True)
+        return headers
+
+    def is_fresh(self, request: Request) -> bool:
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match is not None:
+            tags = [tag.strip() for tag in if_none_match.split(",")]
+            return "*" in tags or self.etag in tags
+        if_modified_since = request.headers.get("if-modified-since")
+        if self.use_last_modified and if_modified_since and self.last_modified is not None:
+            try:
+                since = parsedate_to_datetime(if_modified_since)
+            except (TypeError, ValueError):
+                return False
+            return self.last_modified.replace(microsecond=0) <= since
+        return False
+
+    def check(self, request: Request) -> "Validators":
+        if self.is_fresh(request):
+            raise NotModified(self)
+        return self
+
+    def apply(self, response: Response) -> Response:
+        response.headers.update(self.headers())
+        return response
+
+
+def _as_utc(value: Optional[datetime]) -> Optional[datetime]:
+    if value is None:
+        return None
+    # SQLite возвращает время без часового пояса, в БД хранится UTC
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
+
+
+def settled_last_modified(value: Optional[datetime], now: Optional[datetime] = None) -> Optional[datetime]:
+    """Last-Modified, если секунда последнего изменения уже прошла, иначе None.
+
+    Дата в Last-Modified / If-Modified-Since с точностью до секунды: вторая правка
+    в ту же секунду дала бы то же значение и устаревший 304. Пока секунда не
+    закончилась, ответ несет только ETag; любая следующая правка попадет в более
+    позднюю секунду, чем отданный клиенту Last-Modified.
+    """
+    if value is None:
+        return None
+    now = now or datetime.now(timezone.utc)
+    if now < value.replace(microsecond=0) + timedelta(seconds=1):
+        return None
+    return value
+
+
+async def menu_validators(
+    db: AsyncSession,
+    restaurant_id: Optional[int] = None,
+    *variant: Any,
+    vary: str = "Authorization",
+    use_last_modified: bool = True,
+) -> Optional[Validators]:
+    """Валидаторы по версии меню; variant - всё, от чего еще зависит ответ (пользователь, роль)"""
+    version = await get_menu_version(db, restaurant_id)
+    if version is None:
+        return None
+    parts = [BUILD_TOKEN, str(restaurant_id or "all"), str(version.id), *(str(part) for part in variant)]
+    return Validators(
+        etag=f'W/"{"-".join(parts)}"',
+        last_modified=settled_last_modified(_as_utc(version.created_at)),
+        vary=vary,
+        use_last_modified=use_last_modified,
+    )
+
+
+async def conditional_menu_get(
+    request: Request,
+    response: Response,
+    current_user: CurrentUser = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_async_db)
+) -> None:
+    """Зависимость роутеров API меню: для GET - 304 до выполнения обработчика
+    либо заголовки валидаторов в ответе. Аутентификация проверяется раньше, чем ETag.
+    """
+    if request.method not in ("GET", "HEAD"):
+        return
+    restaurant_id = request.path_params.get("restaurant_id")
+    validators = await menu_validators(db, int(restaurant_id) if restaurant_id is not None else None)
+    if validators is not None:
+        validators.check(request).apply(response)
+
+
+async def not_modified_handler(request: Request, exc: NotModified) -> Response:
+    return Response(status_code=304, headers=exc.validators.headers())
@@ -1,22 +1,48 @@
+import logging
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
-import os
 from typing import Dict, Any
-from app.infrastructure.database.database import engine
+from uvicorn.logging import DefaultFormatter
+from app.infrastructure.database.database import engine, async_engine
 from app.domain.entities.models import Base
-from app.config import UPLOAD_DIR, APP_NAME
-from app.presentation.api import auth, restaurants, sections, categories, products
+from app.config import STATIC_DIR, APP_NAME, LOG_LEVEL
+from app.presentation.api import auth, admin, restaurants, sections, categories, products, menu_events
 from app.presentation.web.web import router as web_router
 from starlette.exceptions import HTTPException
 from app.presentation.web.web import custom_http_exception_handler
+from app.presentation.web.page_cache import PageCacheMiddleware
+from app.presentation.api.compression import CompressionMiddleware
+from app.presentation.web.assets import FingerprintedStaticFiles, asset_manifest
+from app.presentation.web.uploads import UploadFiles
+from app.presentation.web.templating import precompile_templates
+from app.application.services.purge_service import purge_service
+from app.application.services.image_service import image_service
+from app.application.services.upload_gc_service import upload_gc_service
+from app.presentation.api.conditional import NotModified, not_modified_handler
+
+
+def configure_logging() -> None:
+    """Вывод логов модулей app.* в формате uvicorn.
+
+    Конфигурация логирования uvicorn настраивает только свои логгеры, а у
+    корневого нет обработчиков: сообщения INFO приложения (прогрев шаблонов,
+    манифест статики, фоновые задачи) иначе теряются.
+    """
+    app_logger = logging.getLogger("app")
+    if app_logger.handlers:
+        return
+    handler = logging.StreamHandler()
+    handler.setFormatter(DefaultFormatter("%(levelprefix)s %(name)s: %(message)s"))
+    app_logger.addHandler(handler)
+    app_logger.setLevel(LOG_LEVEL)
+    app_logger.propagate = False
+
+
+configure_logging()
 
 # Создаем таблицы в базе данных
 Base.metadata.create_all(bind=engine)
 
-# Создаем папку для загрузок, если её нет
-os.makedirs(UPLOAD_DIR, exist_ok=True)
-
 # Создаем приложение FastAPI
 app = FastAPI(
     title=APP_NAME,
@@ -24,6 +50,10 @@ app = FastAPI(
     version="1.0.0"
 )
 
+# Кэш публичных страниц меню; добавляется раньше CORS, чтобы заголовки CORS
+# вычислялись для каждого запроса, а не попадали в закэшированный ответ
+app.add_middleware(PageCacheMiddleware)
+
 # Настройка CORS
 app.add_middleware(
     CORSMiddleware,
@@ -33,9 +63,13 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Сжатие ответов - внешний слой: кэш страниц хранит несжатый HTML
+app.add_middleware(CompressionMiddleware)
+
 # Подключаем статические файлы
-app.mount("/uploads", StaticFiles(directory=UPLOAD_DIR), name="uploads")
-app.mount("/static", StaticFiles(directory="static"), name="static")
+# Имена загрузок и пути статики с отпечатком уникальны - кэшируются навсегда
+app.mount("/uploads", UploadFiles(), name="uploads")
+app.mount("/static", FingerprintedStaticFiles(directory=STATIC_DIR), name="static")
 
 # Подключаем API роуты
 app.include_router(auth.router, prefix="/api/v1")
@@ -43,12 +77,15 @@ app.include_router(restaurants.router, prefix="/api/v1")
 app.include_router(sections.router, prefix="/api/v1")
 app.include_router(categories.router, prefix="/api/v1")
 app.include_router(products.router, prefix="/api/v1")
+app.include_router(menu_events.router, prefix="/api/v1")
+app.include_router(admin.router, prefix="/api/v1")
 
 # Подключаем веб-роуты
 app.include_router(web_router)
 
 # Регистрируем глобальный обработчик ошибок для HTTPException
 app.add_exception_handler(HTTPException, custom_http_exception_handler)
+app.add_exception_handler(NotModified, not_modified_handler)
 
 
 @app.get("/")
@@ -61,6 +98,24 @@ def read_root() -> Dict[str, Any]:
     }
 
 
+@app.on_event("startup")
+async def start_background_jobs() -> None:
+    """Манифест статики, прогрев шаблонов и запуск фоновой очистки удаленных продуктов и файлов"""
+    asset_manifest.build()
+    precompile_templates()
+    purge_service.start()
+    upload_gc_service.start()
+
+
+@app.on_event("shutdown")
+async def dispose_engines() -> None:
+    """Остановка фоновых задач и закрытие соединений пула асинхронного движка"""
+    await purge_service.stop()
+    await upload_gc_service.stop()
+    await image_service.stop()
+    await async_engine.dispose()
+
+
 @app.get("/health")
 def health_check() -> Dict[str, str]:
     """Проверка здоровья приложения"""
@@ -0,0 +1,32 @@
+from typing import Any, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.infrastructure.database.database import get_async_db
+from app.presentation.api.auth import get_current_active_user
+from app.infrastructure.cache.identity_cache import CurrentUser
+from app.domain.entities.schemas import MenuEvent, Page
+from app.infrastructure.repositories.pagination import InvalidCursorError
+from app.infrastructure.repositories.async_crud import get_accessible_restaurant_ids, get_menu_events_page
+
+router = APIRouter(prefix="/menu-events", tags=["menu-events"])
+
+
+@router.get("/", response_model=Page[MenuEvent])
+async def read_menu_events(
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1),
+    restaurant_id: Optional[int] = None,
+    current_user: CurrentUser = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_async_db)
+) -> Any:
+    """Журнал изменений меню от новых записей к старым (пагинация по курсору)"""
+    restaurant_ids = await get_accessible_restaurant_ids(db, current_user.id, current_user.role)
+    if restaurant_id is not None:
+        if restaurant_ids is not None and restaurant_id not in restaurant_ids:
+            raise HTTPException(status_code=403, detail="Not enough permissions")
+        restaurant_ids = [restaurant_id]
+    try:
+        items, next_cursor = await get_menu_events_page(db, restaurant_ids=restaurant_ids, cursor=cursor, limit=limit)
+    except InvalidCursorError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return {"items": items, "next_cursor": next_cursor}
@@ -1,36 +1,49 @@
-from typing import List, Any
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from app.infrastructure.database.database import get_db
+from typing import List, Any, Optional, Union
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.infrastructure.database.database import get_async_db
 from app.presentation.api.auth import get_current_active_user
-from app.domain.entities.models import User
-from app.domain.entities.schemas import Product, ProductCreate
-from app.infrastructure.repositories.crud import (
-    create_product, get_product, get_products
+from app.infrastructure.cache.identity_cache import CurrentUser
+from app.domain.entities.schemas import Page, Product, ProductCreate
+from app.infrastructure.repositories.pagination import InvalidCursorError
+from app.presentation.api.conditional import conditional_menu_get
+from app.infrastructure.repositories.async_crud import (
+    create_product, get_product, get_products, get_products_page
 )
 
-router = APIRouter(prefix="/products", tags=["products"])
+router = APIRouter(prefix="/products", tags=["products"], dependencies=[Depends(conditional_menu_get)])
 
 
-@router.get("/", response_model=List[Product])
-def read_products(
+@router.get("/", response_model=Union[List[Product], Page[Product]])
+async def read_products(
     skip: int = 0,
-    limit: int = 100,
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    limit: int = Query(100, ge=1),
+    cursor: Optional[str] = None,
+    current_user: CurrentUser = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_async_db)
 ) -> Any:
-    """Получение списка продуктов"""
-    return get_products(db, skip=skip, limit=limit)
+    """Получение списка продуктов
+
+    По умолчанию ответ - список со смещением skip. С параметром cursor (пустым
+    для первой страницы) ответ - страница {items, next_cursor} с обходом по курсору.
+    """
+    if cursor is None:
+        return await get_products(db, skip=skip, limit=limit)
+    try:
+        items, next_cursor = await get_products_page(db, cursor=cursor, limit=limit)
+    except InvalidCursorError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return {"items": items, "next_cursor": next_cursor}
 
 
 @router.get("/{product_id}", response_model=Product)
-def read_product(
+async def read_product(
     product_id: int,
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    current_user: CurrentUser = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_async_db)
 ) -> Any:
     """Получение детальной информации о продукте"""
-    product = get_product(db, product_id=product_id)
+    product = await get_product(db, product_id=product_id)
     if product is None:
         raise HTTPException(status_code=404, detail="Product not found")
     
@@ -38,13 +51,13 @@ def read_product(
 
 
 @router.post("/", response_model=Product)
-def create_new_product(
+async def create_new_product(
     product: ProductCreate,
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    current_user: CurrentUser = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_async_db)
 ) -> Any:
     """Создание нового продукта (только для staff)"""
-    return create_product(db=db, product=product)
+    return await create_product(db=db, product=product)
 
 
  
\ No newline at end of file
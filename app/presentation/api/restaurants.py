@@ -1,36 +1,49 @@
-from typing import List, Any
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from app.infrastructure.database.database import get_db
+from typing import List, Any, Optional, Union
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.infrastructure.database.database import get_async_db
 from app.presentation.api.auth import get_current_active_user, get_current_staff_user
-from app.domain.entities.models import User
-from app.domain.entities.schemas import Restaurant, RestaurantCreate, RestaurantWithRelations
-from app.infrastructure.repositories.crud import (
-    create_restaurant, get_restaurant, get_restaurants
+from app.infrastructure.cache.identity_cache import CurrentUser
+from app.domain.entities.schemas import Page, Restaurant, RestaurantCreate, RestaurantWithRelations
+from app.infrastructure.repositories.pagination import InvalidCursorError
+from app.presentation.api.conditional import conditional_menu_get
+from app.infrastructure.repositories.async_crud import (
+    create_restaurant, get_restaurant_with_relations, get_restaurants, get_restaurants_page
 )
 
-router = APIRouter(prefix="/restaurants", tags=["restaurants"])
+router = APIRouter(prefix="/restaurants", tags=["restaurants"], dependencies=[Depends(conditional_menu_get)])
 
 
-@router.get("/", response_model=List[Restaurant])
-def read_restaurants(
+@router.get("/", response_model=Union[List[Restaurant], Page[Restaurant]])
+async def read_restaurants(
     skip: int = 0,
-    limit: int = 100,
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    limit: int = Query(100, ge=1),
+    cursor: Optional[str] = None,
+    current_user: CurrentUser = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_async_db)
 ) -> Any:
-    """Получение списка ресторанов, доступных пользователю"""
-    return get_restaurants(db, skip=skip, limit=limit)
+    """Получение списка ресторанов, доступных пользователю
+
+    По умолчанию ответ - список со смещением skip. С параметром cursor (пустым
+    для первой страницы) ответ - страница {items, next_cursor} с обходом по курсору.
+    """
+    if cursor is None:
+        return await get_restaurants(db, skip=skip, limit=limit)
+    try:
+        items, next_cursor = await get_restaurants_page(db, cursor=cursor, limit=limit)
+    except InvalidCursorError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return {"items": items, "next_cursor": next_cursor}
 
 
 @router.get("/{restaurant_id}", response_model=RestaurantWithRelations)
-def read_restaurant(
+async def read_restaurant(
     restaurant_id: int,
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    current_user: CurrentUser = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_async_db)
 ) -> Any:
     """Получение детальной информации о ресторане"""
-    restaurant = get_restaurant(db, restaurant_id=restaurant_id)
+    restaurant = await get_restaurant_with_relations(db, restaurant_id=restaurant_id)
     if restaurant is None:
         raise HTTPException(status_code=404, detail="Restaurant not found")
     
@@ -39,10 +52,10 @@ def read_restaurant(
 
 
 @router.post("/", response_model=Restaurant)
-def create_new_restaurant(
+async def create_new_restaurant(
     restaurant: RestaurantCreate,
-    current_user: User = Depends(get_current_staff_user),
-    db: Session = Depends(get_db)
+    current_user: CurrentUser = Depends(get_current_staff_user),
+    db: AsyncSession = Depends(get_async_db)
 ) -> Any:
     """Создание нового ресторана (только для staff)"""
-    return create_restaurant(db=db, restaurant=restaurant) 
\ No newline at end of file
+    return await create_restaurant(db=db, restaurant=restaurant) 
\ No newline at end of file
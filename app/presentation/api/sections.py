@@ -1,46 +1,59 @@
-from typing import List, Any
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from app.infrastructure.database.database import get_db
+from typing import List, Any, Optional, Union
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.infrastructure.database.database import get_async_db
 from app.presentation.api.auth import get_current_active_user
-from app.domain.entities.models import User
-from app.domain.entities.schemas import Section, SectionCreate, SectionWithRelations
-from app.infrastructure.repositories.crud import (
-    create_section, get_section, get_sections, get_sections_by_restaurant
+from app.infrastructure.cache.identity_cache import CurrentUser
+from app.domain.entities.schemas import Page, Section, SectionCreate, SectionWithRelations
+from app.infrastructure.repositories.pagination import InvalidCursorError
+from app.presentation.api.conditional import conditional_menu_get
+from app.infrastructure.repositories.async_crud import (
+    create_section, get_section_with_relations, get_sections, get_sections_page, get_sections_by_restaurant
 )
 
-router = APIRouter(prefix="/sections", tags=["sections"])
+router = APIRouter(prefix="/sections", tags=["sections"], dependencies=[Depends(conditional_menu_get)])
 
 
-@router.get("/", response_model=List[Section])
-def read_sections(
+@router.get("/", response_model=Union[List[Section], Page[Section]])
+async def read_sections(
     skip: int = 0,
-    limit: int = 100,
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    limit: int = Query(100, ge=1),
+    cursor: Optional[str] = None,
+    current_user: CurrentUser = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_async_db)
 ) -> Any:
-    """Получение списка разделов"""
-    return get_sections(db, skip=skip, limit=limit)
+    """Получение списка разделов
+
+    По умолчанию ответ - список со смещением skip. С параметром cursor (пустым
+    для первой страницы) ответ - страница {items, next_cursor} с обходом по курсору.
+    """
+    if cursor is None:
+        return await get_sections(db, skip=skip, limit=limit)
+    try:
+        items, next_cursor = await get_sections_page(db, cursor=cursor, limit=limit)
+    except InvalidCursorError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return {"items": items, "next_cursor": next_cursor}
 
 
 @router.get("/restaurant/{restaurant_id}", response_model=List[Section])
-def read_sections_by_restaurant(
+async def read_sections_by_restaurant(
     restaurant_id: int,
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    current_user: CurrentUser = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_async_db)
 ) -> Any:
     """Получение списка разделов ресторана"""
-    return get_sections_by_restaurant(db, restaurant_id)
+    return await get_sections_by_restaurant(db, restaurant_id)
 
 
 @router.get("/{section_id}", response_model=SectionWithRelations)
-def read_section(
+async def read_section(
     section_id: int,
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    current_user: CurrentUser = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_async_db)
 ) -> Any:
     """Получение детальной информации о разделе"""
-    section = get_section(db, section_id=section_id)
+    section = await get_section_with_relations(db, section_id=section_id)
     if section is None:
         raise HTTPException(status_code=404, detail="Section not found")
     
@@ -48,10 +61,10 @@ def read_section(
 
 
 @router.post("/", response_model=Section)
-def create_new_section(
+async def create_new_section(
     section: SectionCreate,
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    current_user: CurrentUser = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_async_db)
 ) -> Any:
     """Создание нового раздела (только для staff)"""
-    return create_section(db=db, section=section) 
\ No newline at end of file
+    return await create_section(db=db, section=section) 
\ No newline at end of file
@@ -43,9 +43,8 @@ async def process_new_password(message: Message, state: FSMContext) -> None:
             await message.answer("❌ Пользователь не найден. Попробуйте снова или зарегистрируйтесь.")
             await state.clear()
             return
-        from app.presentation.api.auth import get_password_hash
-        setattr(user, 'hashed_password', get_password_hash(new_password))
-        db.commit()
+        from app.application.services.user_service import UserService
+        await UserService.change_password(db, user, new_password)
         await message.answer("✅ Пароль успешно изменён! Теперь вы можете использовать новый пароль для входа в систему через веб-интерфейс.")
         await state.clear()
     finally:
@@ -7,7 +7,8 @@ from aiogram.fsm.context import FSMContext
 from app.domain.entities.telegram_states import RegistrationStates
 from app.application.services.telegram_service import TelegramService
 from app.presentation.telegram.keyboards import get_manager_menu_keyboard, get_admin_menu_keyboard, get_waiter_menu_keyboard
-from app.infrastructure.repositories.crud import get_user_by_telegram_id, get_user_by_username, create_user
+from app.infrastructure.repositories.crud import get_user_by_telegram_id, get_user_by_username
+from app.application.services.user_service import UserService
 from app.domain.entities.schemas import UserCreate
 from app.presentation.telegram.utils import get_db_session, send_welcome_message, handle_database_error
 from dotenv import load_dotenv
@@ -53,7 +54,7 @@ async def cmd_start(message: Message, state: FSMContext) -> None:
                         password=ADMIN_PASSWORD,
                         role="admin"
                     )
-                    admin = create_user(db, user_data)
+                    admin = await UserService.create_user(db, user_data)
                     
                     # Устанавливаем Telegram данные для админа
                     assert message.from_user is not None
@@ -197,7 +198,7 @@ async def complete_registration(message: Message, state: FSMContext, role: str =
                 'first_name': message.from_user.first_name,
                 'last_name': message.from_user.last_name
             }
-            user = TelegramService.register_user(
+            user = await TelegramService.register_user(
                 db=db,
                 username=username,
                 password=password,
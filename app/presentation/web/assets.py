@@ -0,0 +1,109 @@
+"""
+Статические файлы с отпечатком содержимого в имени.
+
+При старте для каждого файла static/ считается хеш содержимого, и шаблоны
+ссылаются на css/style.<хеш>.css через глобальную функцию static_url(). Такой
+URL меняется вместе с файлом, поэтому ответ кэшируется браузером навсегда
+(immutable) и не перепроверяется при каждом визите. На диске файлы хранятся
+под исходными именами, соответствие хранится в манифесте в памяти.
+"""
+import hashlib
+import logging
+import os
+import posixpath
+import time
+from typing import Any, Dict, Optional
+
+from starlette.responses import Response
+from starlette.types import Scope
+
+from app.config import STATIC_DIR, TEMPLATE_AUTO_RELOAD
+from app.presentation.api.compression import PrecompressedStaticFiles
+
+logger = logging.getLogger(__name__)
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+STATIC_URL_PREFIX = "/static/"
+FINGERPRINT_LENGTH = 10
+
+# Сжатые копии из compress_static.py отдаются вместо исходника и в манифест не входят
+_SKIPPED_SUFFIXES = (".gz", ".br", ".tmp", ".py", ".pyc")
+
+
+def fingerprinted_name(path: str, digest: str) -> str:
+    root, ext = posixpath.splitext(path)
+    return f"{root}.{digest[:FINGERPRINT_LENGTH]}{ext}"
+
+
+class AssetManifest:
+    """Соответствие "исходный путь -> путь с отпечатком" для файлов каталога"""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._urls: Optional[Dict[str, str]] = None
+        self._sources: Dict[str, str] = {}
+
+    def build(self) -> int:
+        started = time.perf_counter()
+        urls: Dict[str, str] = {}
+        sources: Dict[str, str] = {}
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if name.endswith(_SKIPPED_SUFFIXES):
+                    continue
+                full_path = os.path.join(root, name)
+                path = os.path.relpath(full_path, self.directory).replace(os.sep, "/")
+                with open(full_path, "rb") as f:
+                    digest = hashlib.sha256(f.read()).hexdigest()
+                hashed = fingerprinted_name(path, digest)
+                urls[path] = hashed
+                sources[hashed] = path
+        self._urls, self._sources = urls, sources
+        logger.info(
+            "Манифест статики: %s файлов за %.1f мс", len(urls), (time.perf_counter() - started) * 1000
+        )
+        return len(urls)
+
+    def url(self, path: str) -> str:
+        """URL файла static/<path> с отпечатком; неизвестный файл - по исходному пути"""
+        path = path.lstrip("/")
+        if TEMPLATE_AUTO_RELOAD:
+            # При разработке файлы меняются без перезапуска - отпечаток устарел бы
+            return STATIC_URL_PREFIX + path
+        if self._urls is None:
+            self.build()
+        assert self._urls is not None
+        return STATIC_URL_PREFIX + self._urls.get(path, path)
+
+    def source(self, hashed_path: str) -> Optional[str]:
+        if self._urls is None:
+            self.build()
+        return self._sources.get(hashed_path)
+
+
+asset_manifest = AssetManifest(STATIC_DIR)
+
+
+def static_url(path: str) -> str:
+    return asset_manifest.url(path)
+
+
+def _set_immutable(response: Response) -> Response:
+    if response.status_code in (200, 304):
+        response.headers["Cache-Control"] = IMMUTABLE_CACHE_CONTROL
+    return response
+
+
+class FingerprintedStaticFiles(PrecompressedStaticFiles):
+    """Раздача static/: пути с отпечатком отображаются на исходные файлы и кэшируются навсегда"""
+
+    def __init__(self, *args: Any, manifest: AssetManifest = asset_manifest, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self.manifest = manifest
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        source = self.manifest.source(path.replace(os.sep, "/"))
+        if source is None:
+            return await super().get_response(path, scope)
+        return _set_immutable(await super().get_response(source, scope))
+
@@ -0,0 +1,149 @@
+"""
+Кэш публичных страниц меню для анонимных посетителей.
+
+Анонимный посетитель видит только демо-ресторан, и разметка его страниц
+одинакова для всех, поэтому готовый HTML (/demo и страницы ресторана, разделов,
+категорий и блюд) переиспользуется между запросами. Ключ - путь запроса без
+параметров, версия - id последней записи menu_events ресторана: любая запись
+через crud добавляет событие, и следующий запрос видит новую версию без явного
+сброса, в том числе в других воркерах.
+
+Запросы с cookie access_token, не-GET запросы и прочие пути проходят мимо кэша.
+"""
+import asyncio
+import re
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from app.infrastructure.cache.page_cache import CachedPage, PageCache, page_cache
+from app.infrastructure.database.database import AsyncSessionLocal
+from app.infrastructure.repositories.async_crud import get_menu_version
+from app.presentation.web.web import get_demo_restaurant_id
+
+Scope = Dict[str, Any]
+Message = Dict[str, Any]
+Receive = Callable[[], Awaitable[Message]]
+Send = Callable[[Message], Awaitable[None]]
+ASGIApp = Callable[[Scope, Receive, Send], Awaitable[None]]
+
+_MENU_PAGE_PATH = re.compile(
+    r"^/restaurants/(\d+)(?:/sections/\d+(?:/categories/\d+(?:/products/\d+)?)?)?$"
+)
+_DEMO_PATH = "/demo"
+
+# Условные заголовки снимаются перед отрисовкой: в кэш нужен полный ответ 200,
+# If-None-Match клиента проверяется уже по закэшированному ETag
+_CONDITIONAL_HEADERS = (b"if-none-match", b"if-modified-since")
+_NOT_MODIFIED_HEADERS = (b"etag", b"cache-control", b"vary", b"last-modified")
+
+
+def _has_session_cookie(scope: Scope) -> bool:
+    for name, value in scope["headers"]:
+        if name == b"cookie" and b"access_token=" in value:
+            return True
+    return False
+
+
+def _request_header(scope: Scope, name: bytes) -> Optional[str]:
+    for key, value in scope["headers"]:
+        if key == name:
+            return value.decode("latin-1")
+    return None
+
+
+async def _resolve_version(path: str) -> Optional[int]:
+    """Версия меню демо-ресторана, если путь относится к нему; иначе None (кэш не используется)"""
+    match = _MENU_PAGE_PATH.match(path)
+    if match is None and path != _DEMO_PATH:
+        return None
+    async with AsyncSessionLocal() as db:
+        demo_restaurant_id = await get_demo_restaurant_id(db)
+        if demo_restaurant_id is None:
+            return None
+        # Остальные рестораны анониму недоступны (редирект на вход) - их не кэшируем
+        if match is not None and int(match.group(1)) != demo_restaurant_id:
+            return None
+        version = await get_menu_version(db, demo_restaurant_id)
+    return int(version.id) if version else 0
+
+
+async def render_page(app: ASGIApp, scope: Scope) -> CachedPage:
+    """Выполнение запроса приложением с полным чтением ответа в память"""
+    finished = asyncio.Event()
+    request_sent = False
+
+    async def receive() -> Message:
+        nonlocal request_sent
+        if not request_sent:
+            request_sent = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        # Отключение "клиента" только после завершения ответа: отрисовка может
+        # продолжаться в фоне, когда исходный запрос уже закрыт
+        await finished.wait()
+        return {"type": "http.disconnect"}
+
+    status = 500
+    headers: List[Tuple[bytes, bytes]] = []
+    chunks: List[bytes] = []
+
+    async def send(message: Message) -> None:
+        nonlocal status, headers
+        if message["type"] == "http.response.start":
+            status = message["status"]
+            headers = list(message.get("headers", []))
+        elif message["type"] == "http.response.body":
+            chunks.append(message.get("body", b""))
+
+    try:
+        await app(scope, receive, send)
+    finally:
+        finished.set()
+    return CachedPage(status, headers, b"".join(chunks))
+
+
+def _is_not_modified(scope: Scope, page: CachedPage) -> bool:
+    etag = page.header(b"etag")
+    if_none_match = _request_header(scope, b"if-none-match")
+    if page.status != 200 or etag is None or if_none_match is None:
+        return False
+    tags = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in tags or etag in tags
+
+
+class PageCacheMiddleware:
+    """ASGI-middleware, отдающее страницы меню демо-ресторана из PageCache"""
+
+    def __init__(self, app: ASGIApp, cache: PageCache = page_cache):
+        self.app = app
+        self.cache = cache
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] != "GET" or _has_session_cookie(scope):
+            await self.app(scope, receive, send)
+            return
+        version = await _resolve_version(scope["path"])
+        if version is None:
+            await self.app(scope, receive, send)
+            return
+
+        # Страницы меню не читают параметры запроса: ключ - только путь, и отрисовка
+        # идет без query string. Иначе ?x=1, ?x=2, ... обходили бы кэш и вытесняли записи
+        key = scope["path"]
+        render_scope = dict(scope, query_string=b"", headers=[
+            (name, value) for name, value in scope["headers"] if name not in _CONDITIONAL_HEADERS
+        ])
+        page, source = await self.cache.get(key, version, lambda: render_page(self.app, render_scope))
+
+        if _is_not_modified(scope, page):
+            await send({
+                "type": "http.response.start",
+                "status": 304,
+                "headers": [(name, value) for name, value in page.headers if name.lower() in _NOT_MODIFIED_HEADERS],
+            })
+            await send({"type": "http.response.body", "body": b""})
+            return
+        await send({
+            "type": "http.response.start",
+            "status": page.status,
+            "headers": page.headers + [(b"x-cache", source.encode())],
+        })
+        await send({"type": "http.response.body", "body": page.body})
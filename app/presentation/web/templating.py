@@ -0,0 +1,109 @@
+"""
+Окружение Jinja2 для веб-интерфейса.
+
+Скомпилированные шаблоны сохраняются в файловый кэш байткода, общий для всех
+воркеров: после перезапуска шаблон загружается из кэша без разбора исходника.
+Ключ кэша включает контрольную сумму исходника, поэтому измененный шаблон
+перекомпилируется, а устаревший байткод просто не используется.
+"""
+import logging
+import os
+import time
+from typing import Any, AsyncIterator, Dict, List, Mapping, Optional
+
+from fastapi.templating import Jinja2Templates
+from jinja2 import FileSystemBytecodeCache, Template
+from starlette.requests import Request
+from starlette.responses import StreamingResponse
+
+from app.config import TEMPLATES_DIR, TEMPLATE_BYTECODE_CACHE_DIR, TEMPLATE_AUTO_RELOAD
+from app.infrastructure.storage.backend import upload_url
+from app.presentation.web.assets import static_url
+
+logger = logging.getLogger(__name__)
+
+# Jinja отдает отрендеренный текст мелкими фрагментами; в сокет они уходят
+# пачками не меньше этого размера (в символах)
+STREAM_CHUNK_SIZE = 16 * 1024
+
+
+async def _render_chunks(template: Template, context: Dict[str, Any]) -> AsyncIterator[bytes]:
+    buffer: List[str] = []
+    size = 0
+    for piece in template.generate(context):
+        buffer.append(piece)
+        size += len(piece)
+        if size >= STREAM_CHUNK_SIZE:
+            yield "".join(buffer).encode("utf-8")
+            buffer = []
+            size = 0
+    if buffer:
+        yield "".join(buffer).encode("utf-8")
+
+
+class _StreamingTemplateResponse(StreamingResponse):
+    """Ответ, который отправляет страницу частями по мере рендеринга (Template.generate).
+
+    Первые байты уходят клиенту до того, как отрендерен весь список, а в памяти
+    держится только текущая пачка, а не вся страница. Ошибка шаблона после начала
+    отправки обрывает ответ, поэтому все данные должны быть загружены заранее.
+
+    Шаблон рендерится после выхода из обработчика, вне AsyncSession: ленивая
+    загрузка связи здесь приводит к MissingGreenlet. Связи, которые использует
+    шаблон, загружаются жадно или заполняются явно (см. crud.get_menu_tree),
+    а объекты передаются в контекст - identity map сессии держит их только
+    слабыми ссылками.
+    """
+    media_type = "text/html"
+
+    def __init__(
+        self,
+        template: Template,
+        context: Dict[str, Any],
+        status_code: int = 200,
+        headers: Optional[Mapping[str, str]] = None,
+    ):
+        self.template = template
+        self.context = context
+        super().__init__(_render_chunks(template, context), status_code=status_code, headers=headers)
+
+
+class Templates(Jinja2Templates):
+    def StreamingTemplateResponse(
+        self,
+        name: str,
+        context: Dict[str, Any],
+        status_code: int = 200,
+        headers: Optional[Mapping[str, str]] = None,
+    ) -> _StreamingTemplateResponse:
+        """Аналог TemplateResponse для страниц с большими списками"""
+        if "request" not in context:
+            raise ValueError('context must include a "request" key')
+        request: Request = context["request"]
+        for context_processor in self.context_processors:
+            context.update(context_processor(request))
+        return _StreamingTemplateResponse(self.get_template(name), context, status_code, headers)
+
+
+os.makedirs(TEMPLATE_BYTECODE_CACHE_DIR, exist_ok=True)
+
+# auto_reload=False: без проверки mtime исходника при каждом get_template
+templates = Templates(
+    directory=TEMPLATES_DIR,
+    bytecode_cache=FileSystemBytecodeCache(TEMPLATE_BYTECODE_CACHE_DIR),
+    auto_reload=TEMPLATE_AUTO_RELOAD,
+)
+templates.env.globals["static_url"] = static_url
+templates.env.globals["upload_url"] = upload_url
+
+
+def precompile_templates() -> int:
+    """Компиляция всех шаблонов (включая manage/ и components/) при старте воркера"""
+    started = time.perf_counter()
+    names = templates.env.list_templates(extensions=["html"])
+    for name in names:
+        templates.env.get_template(name)
+    logger.info(
+        "Скомпилировано шаблонов: %s за %.1f мс", len(names), (time.perf_counter() - started) * 1000
+    )
+    return len(names)
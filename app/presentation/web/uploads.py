@@ -0,0 +1,278 @@
+"""
+Раздача загруженных изображений (/uploads).
+
+Ответы поддерживают диапазоны байт (Range, If-Range): оборванная загрузка
+большого оригинала продолжается с места обрыва. Сильный ETag и
+Last-Modified позволяют браузеру перепроверить файл ответом 304 без тела.
+
+Файл не читается в память целиком. Если ASGI-сервер поддерживает расширения
+http.response.zerocopysend или http.response.pathsend, тело отправляет сам
+сервер (sendfile). Иначе файл передается частями по UPLOAD_CHUNK_SIZE. За
+nginx можно включить UPLOADS_ACCEL_REDIRECT_PREFIX: приложение проверяет
+доступ, а файл, диапазоны и условные запросы обслуживает nginx. При
+хранении в S3 ответ - перенаправление на подписанную ссылку хранилища.
+
+При UPLOADS_ACCESS_CONTROL изображения ресторанов, кроме демо, доступны
+только пользователям с доступом к одному из ресторанов, чьи продукты
+используют это изображение.
+"""
+import mimetypes
+import os
+import stat
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+from urllib.parse import quote
+
+import anyio
+from sqlalchemy.orm import Session
+from starlette.datastructures import Headers
+from starlette.exceptions import HTTPException
+from starlette.requests import Request
+
+from app.config import (
+    UPLOAD_CHUNK_SIZE, UPLOADS_ACCESS_CONTROL, UPLOADS_ACCEL_REDIRECT_PREFIX, S3_PRESIGNED_URL_EXPIRES,
+)
+from app.infrastructure.cache.access_cache import get_cached_image_restaurant_ids
+from app.infrastructure.database.database import AsyncSessionLocal
+from app.infrastructure.images.derivatives import image_key
+from app.infrastructure.repositories import crud
+from app.infrastructure.storage.backend import storage as default_storage
+from app.infrastructure.storage.base import Storage
+from app.presentation.web.assets import IMMUTABLE_CACHE_CONTROL
+from app.presentation.web.web import check_restaurant_access, get_demo_restaurant_id, get_user_from_cookies
+
+Scope = Dict[str, Any]
+Message = Dict[str, Any]
+Receive = Callable[[], Awaitable[Message]]
+Send = Callable[[Message], Awaitable[None]]
+
+PRIVATE_CACHE_CONTROL = "private, max-age=31536000, immutable"
+
+
+def file_etag(stat_result: os.stat_result) -> str:
+    """Сильный ETag: меняется при любой перезаписи файла"""
+    return f'"{stat_result.st_size:x}-{stat_result.st_mtime_ns:x}"'
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    """Слабое сравнение для If-None-Match (префикс W/ не учитывается)"""
+    if header.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in header.split(","))
+
+
+def _not_modified(request_headers: Headers, etag: str, mtime: float) -> bool:
+    if_none_match = request_headers.get("if-none-match")
+    if if_none_match is not None:
+        # При наличии If-None-Match дата не проверяется
+        return _etag_matches(if_none_match, etag)
+    if_modified_since = request_headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            return int(mtime) <= parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+def _if_range_matches(request_headers: Headers, etag: str, last_modified: str) -> bool:
+    """If-Range: диапазон отдается, только если у клиента та же версия файла"""
+    if_range = request_headers.get("if-range")
+    if if_range is None:
+        return True
+    if_range = if_range.strip()
+    if if_range.startswith(('"', "W/")):
+        return if_range == etag  # для If-Range нужно сильное сравнение
+    return if_range == last_modified
+
+
+def parse_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """Диапазон "bytes=a-b" в виде (start, end) включительно.
+
+    None - заголовок не разобран или содержит несколько диапазонов: отдается
+    весь файл (так разрешает RFC 9110). ValueError - диапазон вне файла (416).
+    """
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+    first, sep, last = spec.strip().partition("-")
+    if not sep or not (first or last) or not (first or "0").isdigit() or not (last or "0").isdigit():
+        return None
+    if not first:
+        # Последние N байт файла
+        if int(last) == 0:
+            raise ValueError("empty suffix range")
+        return max(size - int(last), 0), size - 1
+    start = int(first)
+    if last and int(last) < start:
+        return None
+    if start >= size:
+        raise ValueError("range not satisfiable")
+    return start, min(int(last), size - 1) if last else size - 1
+
+
+def _get_image_restaurant_ids(db: Session, key: str) -> Tuple[int, ...]:
+    crud.sync_access_caches(db)
+    return get_cached_image_restaurant_ids(key, lambda: crud.get_image_restaurant_ids(db, key))
+
+
+class UploadFiles:
+    """ASGI-приложение для монтирования в /uploads"""
+
+    def __init__(
+        self,
+        storage: Storage = default_storage,
+        access_control: bool = UPLOADS_ACCESS_CONTROL,
+        accel_redirect_prefix: str = UPLOADS_ACCEL_REDIRECT_PREFIX,
+        presigned_url_expires: int = S3_PRESIGNED_URL_EXPIRES,
+    ):
+        self.storage = storage
+        self.directory = os.path.realpath(storage.local_directory) if storage.local_directory else None
+        self.access_control = access_control
+        self.accel_redirect_prefix = accel_redirect_prefix
+        self.presigned_url_expires = presigned_url_expires
+
+    def _lookup(self, relative_path: str) -> Tuple[str, os.stat_result]:
+        assert self.directory is not None
+        full_path = os.path.realpath(os.path.join(self.directory, *relative_path.split("/")))
+        if os.path.commonpath([full_path, self.directory]) != self.directory:
+            raise FileNotFoundError(relative_path)
+        stat_result = os.stat(full_path)
+        if not stat.S_ISREG(stat_result.st_mode):
+            raise FileNotFoundError(relative_path)
+        return full_path, stat_result
+
+    async def _is_allowed(self, scope: Scope, relative_path: str) -> Tuple[bool, bool]:
+        """(доступ разрешен, изображение публичное - используется в демо-ресторане)"""
+        if not self.access_control:
+            return True, True
+        async with AsyncSessionLocal() as db:
+            restaurant_ids = await db.run_sync(_get_image_restaurant_ids, image_key(relative_path))
+            if await get_demo_restaurant_id(db) in restaurant_ids:
+                return True, True
+            user = await get_user_from_cookies(Request(scope), db)
+            if user is None:
+                return False, False
+            for restaurant_id in restaurant_ids:
+                try:
+                    await check_restaurant_access(user, restaurant_id, db)
+                    return True, False
+                except HTTPException:
+                    continue
+        return False, False
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        assert scope["type"] == "http"
+        method = scope["method"]
+        if method not in ("GET", "HEAD"):
+            await self._send_empty(send, 405, [(b"allow", b"GET, HEAD")])
+            return
+        relative_path = scope["path"].lstrip("/")
+        if not relative_path or ".." in relative_path.split("/"):
+            await self._send_empty(send, 404)
+            return
+        if self.directory is None:
+            await self._redirect_to_storage(scope, send, relative_path)
+            return
+        try:
+            full_path, stat_result = await anyio.to_thread.run_sync(self._lookup, relative_path)
+        except (FileNotFoundError, NotADirectoryError):
+            await self._send_empty(send, 404)
+            return
+
+        allowed, public = await self._is_allowed(scope, relative_path)
+        if not allowed:
+            await self._send_empty(send, 403)
+            return
+
+        etag = file_etag(stat_result)
+        last_modified = formatdate(stat_result.st_mtime, usegmt=True)
+        headers = [
+            (b"cache-control", (IMMUTABLE_CACHE_CONTROL if public else PRIVATE_CACHE_CONTROL).encode()),
+            (b"etag", etag.encode()),
+            (b"last-modified", last_modified.encode()),
+            (b"accept-ranges", b"bytes"),
+        ]
+        if not public:
+            headers.append((b"vary", b"cookie"))
+
+        if self.accel_redirect_prefix:
+            location = self.accel_redirect_prefix.rstrip("/") + "/" + quote(relative_path)
+            await self._send_empty(send, 200, headers + [(b"x-accel-redirect", location.encode("latin-1"))])
+            return
+
+        request_headers = Headers(scope=scope)
+        if _not_modified(request_headers, etag, stat_result.st_mtime):
+            await self._send_empty(send, 304, headers)
+            return
+
+        size = stat_result.st_size
+        start, end = 0, size - 1
+        status_code = 200
+        range_header = request_headers.get("range")
+        if range_header and size and _if_range_matches(request_headers, etag, last_modified):
+            try:
+                byte_range = parse_range(range_header, size)
+            except ValueError:
+                await self._send_empty(send, 416, headers + [(b"content-range", f"bytes */{size}".encode())])
+                return
+            if byte_range is not None:
+                start, end = byte_range
+                status_code = 206
+                headers.append((b"content-range", f"bytes {start}-{end}/{size}".encode()))
+
+        length = end - start + 1 if size else 0
+        media_type = mimetypes.guess_type(full_path)[0] or "application/octet-stream"
+        headers += [(b"content-type", media_type.encode()), (b"content-length", str(length).encode())]
+        await send({"type": "http.response.start", "status": status_code, "headers": headers})
+        if method == "HEAD" or not length:
+            await send({"type": "http.response.body", "body": b""})
+            return
+        await self._send_file(scope, send, full_path, start, length, whole=status_code == 200)
+
+    async def _redirect_to_storage(self, scope: Scope, send: Send, relative_path: str) -> None:
+        """Удаленное хранилище: перенаправление на временную ссылку, байты идут мимо приложения"""
+        allowed, _ = await self._is_allowed(scope, relative_path)
+        if not allowed:
+            await self._send_empty(send, 403)
+            return
+        location = await anyio.to_thread.run_sync(
+            self.storage.download_url, relative_path, self.presigned_url_expires
+        )
+        if location is None:
+            await self._send_empty(send, 404)
+            return
+        # Перенаправление кэшируется браузером, пока ссылка заведомо действительна
+        headers = [
+            (b"location", location.encode("latin-1")),
+            (b"cache-control", f"private, max-age={self.presigned_url_expires // 2}".encode()),
+        ]
+        await self._send_empty(send, 307, headers)
+
+    async def _send_file(self, scope: Scope, send: Send, full_path: str, offset: int, count: int, whole: bool) -> None:
+        extensions = scope.get("extensions") or {}
+        if "http.response.zerocopysend" in extensions:
+            with open(full_path, "rb") as file:
+                await send({"type": "http.response.zerocopysend", "file": file.fileno(), "offset": offset, "count": count})
+            return
+        if whole and "http.response.pathsend" in extensions:
+            await send({"type": "http.response.pathsend", "path": full_path})
+            return
+        async with await anyio.open_file(full_path, "rb") as file:
+            await file.seek(offset)
+            remaining = count
+            while remaining:
+                chunk = await file.read(min(UPLOAD_CHUNK_SIZE, remaining))
+                if not chunk:
+                    break  # файл укоротили во время отправки
+                remaining -= len(chunk)
+                await send({"type": "http.response.body", "body": chunk, "more_body": remaining > 0})
+            if remaining:
+                await send({"type": "http.response.body", "body": b""})
+
+    async def _send_empty(self, send: Send, status_code: int, headers: Optional[list] = None) -> None:
+        headers = list(headers or [])
+        if status_code != 304:
+            headers.append((b"content-length", b"0"))
+        await send({"type": "http.response.start", "status": status_code, "headers": headers})
+        await send({"type": "http.response.body", "body": b""})
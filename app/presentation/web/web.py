@@ -1,32 +1,60 @@
 from fastapi import APIRouter, Request, Depends, HTTPException, Form, UploadFile, File
 from fastapi.responses import HTMLResponse, RedirectResponse
-from fastapi.templating import Jinja2Templates
 from sqlalchemy.orm import Session
-from app.infrastructure.database.database import get_db
-from app.presentation.api.auth import get_current_user_from_cookies, authenticate_user, create_access_token
-from app.domain.entities.models import User
-from app.infrastructure.repositories.crud import (
-    get_restaurants, get_restaurant, get_sections_by_restaurant, get_section,
-    get_categories_by_section, get_category, get_products_by_category, get_product,
-    get_recent_products, create_section, update_section, delete_section,
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.infrastructure.database.database import get_async_db
+from app.presentation.api.auth import get_current_user_from_cookies, create_access_token
+from app.application.services.user_service import UserService
+from app.infrastructure.cache.identity_cache import CurrentUser
+from app.infrastructure.repositories import crud
+from app.infrastructure.repositories.crud import find_section_in_tree, find_category_in_tree
+from app.infrastructure.repositories.pagination import InvalidCursorError
+from app.presentation.api.conditional import Validators, menu_validators
+from app.presentation.web.templating import templates
+from app.application.services.file_service import file_service
+from app.application.services.image_service import image_service
+from app.infrastructure.repositories.async_crud import (
+    get_restaurants, get_restaurant, get_section, get_section_with_relations,
+    get_category, get_category_with_relations, get_products_by_category, get_product_neighbors, get_product, get_product_with_relations,
+    create_section, update_section, delete_section,
     create_category, update_category, delete_category,
     create_product, update_product, delete_product,
-    get_restaurants_by_manager, get_restaurants_by_waiter_via_manager, create_restaurant,
-    get_recent_products_by_restaurants, get_first_product_by_category
+    get_restaurants_by_manager, get_restaurants_by_waiter_via_manager, create_restaurant, update_restaurant,
+    get_accessible_restaurant_ids, get_menu_events_page,
+    get_menu_tree
 )
-from app.domain.entities.schemas import SectionCreate, SectionUpdate, CategoryCreate, CategoryUpdate, ProductCreate, ProductUpdate, RestaurantCreate
+from app.domain.entities.schemas import SectionCreate, SectionUpdate, CategoryCreate, CategoryUpdate, ProductCreate, ProductUpdate, RestaurantCreate, RestaurantUpdate
 from typing import Optional, Any
-from datetime import timedelta
+from datetime import datetime, timedelta
 from app.config import ACCESS_TOKEN_EXPIRE_MINUTES
+from app.infrastructure.cache.access_cache import (
+    get_cached_demo_restaurant_id, get_access_decision, set_access_decision
+)
 from starlette.exceptions import HTTPException
 
 router = APIRouter()
-templates = Jinja2Templates(directory="templates")
+
+# Обработчики работают с AsyncSession; проверки доступа переиспользуют синхронный
+# код crud и выполняются целиком внутри AsyncSession.run_sync.
+
+
+async def get_user_from_cookies(request: Request, db: AsyncSession) -> Optional[CurrentUser]:
+    """Получение текущего пользователя из cookies"""
+    return await db.run_sync(lambda session: get_current_user_from_cookies(request, session))
 
 
-def get_demo_restaurant_id(db: Session) -> Optional[int]:
+async def get_demo_restaurant_id(db: AsyncSession) -> Optional[int]:
     """Получение ID демо-ресторана (первый ресторан без привязки к пользователям)"""
-    restaurants = get_restaurants(db, limit=1)
+    return await db.run_sync(_get_demo_restaurant_id)
+
+
+def _get_demo_restaurant_id(db: Session) -> Optional[int]:
+    crud.sync_access_caches(db)
+    return get_cached_demo_restaurant_id(lambda: _load_demo_restaurant_id(db))
+
+
+def _load_demo_restaurant_id(db: Session) -> Optional[int]:
+    restaurants = crud.get_restaurants(db, limit=1)
     if restaurants:
         restaurant = restaurants[0]
         # Проверяем, что это демо-ресторан (без manager_id и waiter_id)
@@ -35,16 +63,35 @@ def get_demo_restaurant_id(db: Session) -> Optional[int]:
     return None
 
 
-def check_manager_access(user: Optional[User]) -> None:
+def check_manager_access(user: Optional[CurrentUser]) -> None:
     """Проверка доступа менеджера"""
     if not user or user.role not in ["admin", "manager"]:
         raise HTTPException(status_code=403, detail="Доступ запрещен. Требуются права менеджера.")
 
 
-def check_restaurant_access(user: Optional[User], restaurant_id: int, db: Session) -> None:
+async def check_restaurant_access(user: Optional[CurrentUser], restaurant_id: int, db: AsyncSession) -> None:
     """Проверка доступа к ресторану"""
+    await db.run_sync(_check_restaurant_access, user, restaurant_id)
+
+
+async def check_section_access(user: Optional[CurrentUser], section_id: int, db: AsyncSession) -> None:
+    """Проверка доступа к разделу"""
+    await db.run_sync(_check_section_access, user, section_id)
+
+
+async def check_category_access(user: Optional[CurrentUser], category_id: int, db: AsyncSession) -> None:
+    """Проверка доступа к категории"""
+    await db.run_sync(_check_category_access, user, category_id)
+
+
+async def check_product_access(user: Optional[CurrentUser], product_id: int, db: AsyncSession) -> None:
+    """Проверка доступа к продукту"""
+    await db.run_sync(_check_product_access, user, product_id)
+
+
+def _check_restaurant_access(db: Session, user: Optional[CurrentUser], restaurant_id: int) -> None:
     # Проверяем, является ли это демо-рестораном
-    demo_restaurant_id = get_demo_restaurant_id(db)
+    demo_restaurant_id = _get_demo_restaurant_id(db)
     if demo_restaurant_id and restaurant_id == demo_restaurant_id:
         # Демо-ресторан доступен всем
         return
@@ -54,64 +101,66 @@ def check_restaurant_access(user: Optional[User], restaurant_id: int, db: Sessio
         raise HTTPException(status_code=302, detail="Требуется авторизация", headers={"Location": "/login"})
     
     # Админы имеют доступ ко всем ресторанам
-    if str(user.role) == "admin":  # type: ignore
+    if user.role == "admin":
         return
     
-    # Проверяем доступ менеджера или официанта к ресторану
-    if str(user.role) == "manager":  # type: ignore
-        user_restaurants = get_restaurants_by_manager(db, user.id)  # type: ignore
-    elif str(user.role) == "waiter":  # type: ignore
-        # Официанты получают доступ к ресторанам через своих менеджеров
-        user_restaurants = get_restaurants_by_waiter_via_manager(db, user.id)  # type: ignore
-    else:
+    if user.role not in ["manager", "waiter"]:
         raise HTTPException(status_code=403, detail="Недостаточно прав")
     
+    allowed = get_access_decision(user.id, user.role, restaurant_id)
+    if allowed is None:
+        # Проверяем доступ менеджера или официанта к ресторану
+        if user.role == "manager":
+            user_restaurants = crud.get_restaurants_by_manager(db, user.id)
+        else:
+            # Официанты получают доступ к ресторанам через своих менеджеров
+            user_restaurants = crud.get_restaurants_by_waiter_via_manager(db, user.id)
+        allowed = any(r.id == restaurant_id for r in user_restaurants)
+        set_access_decision(user.id, user.role, restaurant_id, allowed)
+    
     # Проверяем, есть ли у пользователя доступ к данному ресторану
-    if not any(r.id == restaurant_id for r in user_restaurants):
+    if not allowed:
         raise HTTPException(status_code=403, detail="Доступ к ресторану запрещен")
 
 
-def check_section_access(user: Optional[User], section_id: int, db: Session) -> None:
-    """Проверка доступа к разделу"""
-    section = get_section(db, section_id)
+def _check_section_access(db: Session, user: Optional[CurrentUser], section_id: int) -> None:
+    section = crud.get_section(db, section_id)
     if not section:
         raise HTTPException(status_code=404, detail="Раздел не найден")
     
-    check_restaurant_access(user, section.restaurant_id, db)  # type: ignore
+    _check_restaurant_access(db, user, section.restaurant_id)  # type: ignore
 
 
-def check_category_access(user: Optional[User], category_id: int, db: Session) -> None:
-    """Проверка доступа к категории"""
-    category = get_category(db, category_id)
+def _check_category_access(db: Session, user: Optional[CurrentUser], category_id: int) -> None:
+    category = crud.get_category(db, category_id)
     if not category:
         raise HTTPException(status_code=404, detail="Категория не найдена")
     
-    check_restaurant_access(user, category.restaurant_id, db)  # type: ignore
+    _check_restaurant_access(db, user, category.restaurant_id)  # type: ignore
 
 
-def check_product_access(user: Optional[User], product_id: int, db: Session) -> None:
-    """Проверка доступа к продукту"""
-    product = get_product(db, product_id)
+def _check_product_access(db: Session, user: Optional[CurrentUser], product_id: int) -> None:
+    product = crud.get_product(db, product_id)
     if not product:
         raise HTTPException(status_code=404, detail="Продукт не найден")
     
-    check_restaurant_access(user, product.restaurant_id, db)  # type: ignore
+    _check_restaurant_access(db, user, product.restaurant_id)  # type: ignore
 
 
 @router.get("/", response_class=HTMLResponse)
 async def index(
     request: Request,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> Any:
     """Главная страница"""
-    current_user = get_current_user_from_cookies(request, db)
+    current_user = await get_user_from_cookies(request, db)
     
     # Если пользователь менеджер или официант, перенаправляем на его ресторан
     if current_user and str(current_user.role) in ['manager', 'waiter']:  # type: ignore
         if str(current_user.role) == 'manager':  # type: ignore
-            user_restaurants = get_restaurants_by_manager(db, current_user.id)  # type: ignore
+            user_restaurants = await get_restaurants_by_manager(db, current_user.id)  # type: ignore
         else:
-            user_restaurants = get_restaurants_by_waiter_via_manager(db, current_user.id)  # type: ignore
+            user_restaurants = await get_restaurants_by_waiter_via_manager(db, current_user.id)  # type: ignore
         
         if user_restaurants:
             # Перенаправляем на ресторан пользователя
@@ -136,22 +185,20 @@ async def about(request: Request) -> Any:
 @router.get("/demo", response_class=HTMLResponse)
 async def demo_page(
     request: Request,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> Any:
     """Демо-страница с примером ресторана"""
-    # Получаем первый ресторан (демо-ресторан)
-    restaurants = get_restaurants(db, limit=1)
-    if not restaurants:
+    # Демо-ресторан - первый ресторан без привязки к пользователям (id кэшируется)
+    demo_restaurant_id = await get_demo_restaurant_id(db)
+    demo_restaurant = await get_menu_tree(db, demo_restaurant_id) if demo_restaurant_id else None
+    if not demo_restaurant:
         raise HTTPException(status_code=404, detail="Demo restaurant not found")
     
-    demo_restaurant = restaurants[0]
-    sections = get_sections_by_restaurant(db, demo_restaurant.id)  # type: ignore
-    
-    return templates.TemplateResponse("restaurant_detail.html", {
+    return templates.StreamingTemplateResponse("restaurant_detail.html", {
         "request": request,
         "user": None,  # Неавторизованный пользователь
         "restaurant": demo_restaurant,
-        "sections": sections,
+        "sections": demo_restaurant.sections,
         "is_demo": True  # Флаг для демо-режима
     })
 
@@ -170,10 +217,10 @@ async def login_post(
     request: Request,
     username: str = Form(...),
     password: str = Form(...),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> Any:
     """Обработка входа через веб-форму"""
-    user = authenticate_user(db, username, password)
+    user = await UserService.authenticate_user(db, username, password)
     if not user:
         return templates.TemplateResponse(
             "login.html", 
@@ -212,17 +259,17 @@ async def logout() -> Any:
 @router.get("/restaurants", response_class=HTMLResponse)
 async def restaurants_page(
     request: Request,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> Any:
     """Страница со списком ресторанов"""
-    current_user = get_current_user_from_cookies(request, db)
+    current_user = await get_user_from_cookies(request, db)
     
     # Если пользователь не админ, перенаправляем на его ресторан
     if current_user and str(current_user.role) != 'admin':  # type: ignore
         if str(current_user.role) == 'manager':  # type: ignore
-            user_restaurants = get_restaurants_by_manager(db, current_user.id)  # type: ignore
+            user_restaurants = await get_restaurants_by_manager(db, current_user.id)  # type: ignore
         elif str(current_user.role) == 'waiter':  # type: ignore
-            user_restaurants = get_restaurants_by_waiter_via_manager(db, current_user.id)  # type: ignore
+            user_restaurants = await get_restaurants_by_waiter_via_manager(db, current_user.id)  # type: ignore
         else:
             raise HTTPException(status_code=403, detail="Access denied")
         
@@ -234,7 +281,7 @@ async def restaurants_page(
             raise HTTPException(status_code=404, detail="Restaurant not found for user")
     
     # Только админы видят список всех ресторанов
-    restaurants = get_restaurants(db)
+    restaurants = await get_restaurants(db)
     
     return templates.TemplateResponse("restaurants.html", {
         "request": request,
@@ -243,58 +290,82 @@ async def restaurants_page(
     })
 
 
+async def menu_page_validators(
+    request: Request,
+    restaurant_id: int,
+    db: AsyncSession,
+    user: Optional[CurrentUser]
+) -> Optional[Validators]:
+    """ETag страницы меню; вызывается после проверки доступа и до загрузки меню.
+
+    Разметка зависит от пользователя (кнопки управления, навигация), поэтому
+    в ETag входят id и роль пользователя, а ответ помечается Vary: Cookie.
+    При совпадении If-None-Match выбрасывается NotModified (ответ 304).
+    """
+    demo_restaurant_id = await get_demo_restaurant_id(db)
+    validators = await menu_validators(
+        db,
+        restaurant_id,
+        f"u{user.id}{user.role}" if user else "anon",
+        "demo" if demo_restaurant_id == restaurant_id else "",
+        vary="Cookie",
+        use_last_modified=False,
+    )
+    return validators.check(request) if validators else None
+
+
+def with_validators(response: Any, validators: Optional[Validators]) -> Any:
+    return validators.apply(response) if validators else response
+
+
 @router.get("/restaurants/{restaurant_id}", response_class=HTMLResponse)
 async def restaurant_detail(
     request: Request,
     restaurant_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> Any:
     """Детальная страница ресторана"""
-    current_user = get_current_user_from_cookies(request, db)
-    check_restaurant_access(current_user, restaurant_id, db)
-    restaurant = get_restaurant(db, restaurant_id)
+    current_user = await get_user_from_cookies(request, db)
+    await check_restaurant_access(current_user, restaurant_id, db)
+    validators = await menu_page_validators(request, restaurant_id, db, current_user)
+    restaurant = await get_menu_tree(db, restaurant_id)
     if not restaurant:
         raise HTTPException(status_code=404, detail="Restaurant not found")
-    sections = get_sections_by_restaurant(db, restaurant_id)
-    demo_restaurant_id = get_demo_restaurant_id(db)
+    demo_restaurant_id = await get_demo_restaurant_id(db)
     is_demo = demo_restaurant_id and restaurant_id == demo_restaurant_id
-    return templates.TemplateResponse("restaurant_detail.html", {
+    return with_validators(templates.StreamingTemplateResponse("restaurant_detail.html", {
         "request": request,
         "user": current_user,
         "restaurant": restaurant,
-        "sections": sections,
+        "sections": restaurant.sections,
         "is_demo": is_demo
-    })
+    }), validators)
 
 @router.get("/restaurants/{restaurant_id}/sections/{section_id}", response_class=HTMLResponse)
 async def section_detail(
     request: Request,
     restaurant_id: int,
     section_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> Any:
     """Детальная страница раздела"""
-    current_user = get_current_user_from_cookies(request, db)
-    section = get_section(db, section_id)
-    if section is None or int(getattr(section, 'restaurant_id', -1)) != int(restaurant_id):
+    current_user = await get_user_from_cookies(request, db)
+    await check_restaurant_access(current_user, restaurant_id, db)
+    validators = await menu_page_validators(request, restaurant_id, db, current_user)
+    restaurant = await get_menu_tree(db, restaurant_id)
+    section = find_section_in_tree(restaurant, section_id) if restaurant else None
+    if section is None:
         raise HTTPException(status_code=404, detail="Section not found or does not belong to restaurant")
-    check_restaurant_access(current_user, restaurant_id, db)
-    categories = get_categories_by_section(db, section_id)
-    for cat in categories:
-        cat_id = getattr(cat, 'id', None)
-        if isinstance(cat_id, int):
-            cat.first_product = get_first_product_by_category(db, cat_id)
-        else:
-            cat.first_product = None
-    demo_restaurant_id = get_demo_restaurant_id(db)
+    categories = section.categories
+    demo_restaurant_id = await get_demo_restaurant_id(db)
     is_demo = demo_restaurant_id and restaurant_id == demo_restaurant_id
-    return templates.TemplateResponse("section_detail.html", {
+    return with_validators(templates.TemplateResponse("section_detail.html", {
         "request": request,
         "user": current_user,
         "section": section,
         "categories": categories,
         "is_demo": is_demo
-    })
+    }), validators)
 
 @router.get("/restaurants/{restaurant_id}/sections/{section_id}/categories/{category_id}", response_class=HTMLResponse)
 async def category_detail(
@@ -302,24 +373,26 @@ async def category_detail(
     restaurant_id: int,
     section_id: int,
     category_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> Any:
     """Детальная страница категории"""
-    current_user = get_current_user_from_cookies(request, db)
-    category = get_category(db, category_id)
-    if category is None or int(getattr(category, 'section_id', -1)) != int(section_id) or int(getattr(category, 'restaurant_id', -1)) != int(restaurant_id):
+    current_user = await get_user_from_cookies(request, db)
+    await check_restaurant_access(current_user, restaurant_id, db)
+    validators = await menu_page_validators(request, restaurant_id, db, current_user)
+    restaurant = await get_menu_tree(db, restaurant_id)
+    category = find_category_in_tree(restaurant, category_id) if restaurant else None
+    if category is None or int(getattr(category, 'section_id', -1)) != int(section_id):
         raise HTTPException(status_code=404, detail="Category not found or does not belong to section/restaurant")
-    check_restaurant_access(current_user, restaurant_id, db)
-    products = [p for p in get_products_by_category(db, category_id) if not getattr(p, 'is_deleted', False)]
-    demo_restaurant_id = get_demo_restaurant_id(db)
+    products = await get_products_by_category(db, category_id)
+    demo_restaurant_id = await get_demo_restaurant_id(db)
     is_demo = demo_restaurant_id and restaurant_id == demo_restaurant_id
-    return templates.TemplateResponse("category_detail.html", {
+    return with_validators(templates.StreamingTemplateResponse("category_detail.html", {
         "request": request,
         "user": current_user,
         "category": category,
         "products": products,
         "is_demo": is_demo
-    })
+    }), validators)
 
 @router.get("/restaurants/{restaurant_id}/sections/{section_id}/categories/{category_id}/products/{product_id}", response_class=HTMLResponse)
 async def product_detail(
@@ -328,98 +401,103 @@ async def product_detail(
     section_id: int,
     category_id: int,
     product_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> Any:
     """Детальная страница продукта с навигацией по продуктам категории"""
-    current_user = get_current_user_from_cookies(request, db)
-    product = get_product(db, product_id)
+    current_user = await get_user_from_cookies(request, db)
+    await check_restaurant_access(current_user, restaurant_id, db)
+    validators = await menu_page_validators(request, restaurant_id, db, current_user)
+    # Продукт вместе с категорией, разделом и рестораном - один запрос по первичному ключу
+    product = await get_product_with_relations(db, product_id)
     if product is None or int(getattr(product, 'category_id', -1)) != int(category_id) or int(getattr(product, 'restaurant_id', -1)) != int(restaurant_id):
         raise HTTPException(status_code=404, detail="Product not found or does not belong to category/restaurant")
     # Проверяем, что категория и секция тоже соответствуют
-    category = get_category(db, category_id)
+    category = product.category
     if category is None or int(getattr(category, 'section_id', -1)) != int(section_id) or int(getattr(category, 'restaurant_id', -1)) != int(restaurant_id):
         raise HTTPException(status_code=404, detail="Category not found or does not belong to section/restaurant")
-    section = get_section(db, section_id)
+    section = category.section
     if section is None or int(getattr(section, 'restaurant_id', -1)) != int(restaurant_id):
         raise HTTPException(status_code=404, detail="Section not found or does not belong to restaurant")
-    check_restaurant_access(current_user, restaurant_id, db)
-    demo_restaurant_id = get_demo_restaurant_id(db)
+    demo_restaurant_id = await get_demo_restaurant_id(db)
     is_demo = demo_restaurant_id and restaurant_id == demo_restaurant_id
 
-    # Получаем все продукты категории (не удалённые, по порядку)
-    products = [p for p in get_products_by_category(db, category_id) if not getattr(p, 'is_deleted', False)]
-    product_ids = [p.id for p in products]
-    try:
-        idx = product_ids.index(product.id)
-    except ValueError:
-        idx = -1
-    prev_product = products[idx-1] if idx > 0 else None
-    next_product = products[idx+1] if idx != -1 and idx < len(products)-1 else None
+    # Соседние продукты категории для навигации (id и title)
+    prev_product, next_product = await get_product_neighbors(db, category_id, product_id)
 
-    return templates.TemplateResponse("product_detail.html", {
+    return with_validators(templates.TemplateResponse("product_detail.html", {
         "request": request,
         "user": current_user,
         "product": product,
         "is_demo": is_demo,
         "prev_product": prev_product,
         "next_product": next_product
-    })
+    }), validators)
 
 
 @router.get("/recent-changes", response_class=HTMLResponse)
 async def recent_changes(
     request: Request,
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = None,
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db)
 ) -> Any:
-    """Страница с недавними изменениями"""
-    current_user = get_current_user_from_cookies(request, db)
+    """Страница с недавними изменениями меню (постранично, с фильтром по датам)"""
+    current_user = await get_user_from_cookies(request, db)
     if not current_user:
         return RedirectResponse(url="/login", status_code=302)
-    # Админы видят все изменения
-    if str(current_user.role) == "admin":  # type: ignore
-        recent_products = get_recent_products(db, limit=20)
-    else:
-        # Менеджеры и официанты видят только изменения в своих ресторанах
-        if str(current_user.role) == "manager":  # type: ignore
-            user_restaurants = get_restaurants_by_manager(db, current_user.id)  # type: ignore
-        elif str(current_user.role) == "waiter":  # type: ignore
-            user_restaurants = get_restaurants_by_waiter_via_manager(db, current_user.id)  # type: ignore
-        else:
-            raise HTTPException(status_code=403, detail="Недостаточно прав")
-        # Получаем ID ресторанов пользователя
-        restaurant_ids = [r.id for r in user_restaurants]  # type: ignore
-        recent_products = get_recent_products_by_restaurants(db, restaurant_ids, limit=20)  # type: ignore
-    # Подгружаем связанные category и section для каждого продукта
-    for product in recent_products:
-        category_id = getattr(product, 'category_id', None)
-        category = get_category(db, int(category_id)) if category_id is not None else None
-        product.category = category
-        if category:
-            section_id = getattr(category, 'section_id', None)
-            section = get_section(db, int(section_id)) if section_id is not None else None
-            product.category.section = section
-    return templates.TemplateResponse("recent_changes.html", {
+    # Админы видят все изменения, менеджеры и официанты - только в своих ресторанах
+    if str(current_user.role) not in ("admin", "manager", "waiter"):  # type: ignore
+        raise HTTPException(status_code=403, detail="Недостаточно прав")
+    restaurant_ids = await get_accessible_restaurant_ids(db, current_user.id, current_user.role)
+    created_from = _parse_filter_date(date_from)
+    created_to = _parse_filter_date(date_to)
+    try:
+        events, next_cursor = await get_menu_events_page(
+            db,
+            restaurant_ids=restaurant_ids,
+            cursor=cursor,
+            limit=20,
+            created_from=created_from,
+            # Дата "по" включается в диапазон целиком
+            created_to=created_to + timedelta(days=1) if created_to else None,
+        )
+    except InvalidCursorError:
+        raise HTTPException(status_code=400, detail="Некорректный курсор")
+    return templates.StreamingTemplateResponse("recent_changes.html", {
         "request": request,
         "user": current_user,
-        "recent_products": recent_products
+        "events": events,
+        "next_cursor": next_cursor,
+        "date_from": date_from or "",
+        "date_to": date_to or ""
     })
 
 
+def _parse_filter_date(value: Optional[str]) -> Optional[datetime]:
+    if not value:
+        return None
+    try:
+        return datetime.strptime(value, "%Y-%m-%d")
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Некорректная дата")
+
+
 # === УПРАВЛЕНИЕ РАЗДЕЛАМИ ===
 @router.get("/restaurants/{restaurant_id}/manage/sections/create", response_class=HTMLResponse)
 async def create_section_page(
     request: Request,
     restaurant_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> Any:
     """Страница создания раздела"""
-    current_user = get_current_user_from_cookies(request, db)
+    current_user = await get_user_from_cookies(request, db)
     check_manager_access(current_user)
     
     # Проверяем доступ к ресторану
-    check_restaurant_access(current_user, restaurant_id, db)
+    await check_restaurant_access(current_user, restaurant_id, db)
     
-    restaurant = get_restaurant(db, restaurant_id)
+    restaurant = await get_restaurant(db, restaurant_id)
     if not restaurant:
         raise HTTPException(status_code=404, detail="Restaurant not found")
     
@@ -436,14 +514,14 @@ async def create_section_post(
     restaurant_id: int,
     name: str = Form(...),
     description: str = Form(""),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> Any:
     """Создание раздела"""
-    current_user = get_current_user_from_cookies(request, db)
+    current_user = await get_user_from_cookies(request, db)
     check_manager_access(current_user)
     
     # Проверяем доступ к ресторану
-    check_restaurant_access(current_user, restaurant_id, db)
+    await check_restaurant_access(current_user, restaurant_id, db)
     
     section_data = SectionCreate(
         name=name,
@@ -451,7 +529,7 @@ async def create_section_post(
         restaurant_id=restaurant_id
     )
     
-    new_section = create_section(db, section_data)
+    new_section = await create_section(db, section_data)
     return RedirectResponse(url=f"/restaurants/{restaurant_id}", status_code=302)
 
 @router.get("/restaurants/{restaurant_id}/sections/{section_id}/manage/edit", response_class=HTMLResponse)
@@ -459,16 +537,16 @@ async def edit_section_page(
     request: Request,
     restaurant_id: int,
     section_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> Any:
     """Страница редактирования раздела"""
-    current_user = get_current_user_from_cookies(request, db)
+    current_user = await get_user_from_cookies(request, db)
     check_manager_access(current_user)
     
     # Проверяем доступ к разделу
-    check_section_access(current_user, section_id, db)
+    await check_section_access(current_user, section_id, db)
     
-    section = get_section(db, section_id)
+    section = await get_section_with_relations(db, section_id)
     if not section:
         raise HTTPException(status_code=404, detail="Section not found")
     
@@ -486,21 +564,21 @@ async def edit_section_post(
     section_id: int,
     name: str = Form(...),
     description: str = Form(""),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> Any:
     """Редактирование раздела"""
-    current_user = get_current_user_from_cookies(request, db)
+    current_user = await get_user_from_cookies(request, db)
     check_manager_access(current_user)
     
     # Проверяем доступ к разделу
-    check_section_access(current_user, section_id, db)
+    await check_section_access(current_user, section_id, db)
     
-    section = get_section(db, section_id)
+    section = await get_section(db, section_id)
     if not section:
         raise HTTPException(status_code=404, detail="Section not found")
     
     section_update = SectionUpdate(name=name, description=description)
-    update_section(db, section_id, section_update)
+    await update_section(db, section_id, section_update)
     
     return RedirectResponse(url=f"/restaurants/{restaurant_id}/sections/{section_id}", status_code=302)
 
@@ -510,21 +588,21 @@ async def delete_section_post(
     request: Request,
     restaurant_id: int,
     section_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> Any:
     """Удаление раздела"""
-    current_user = get_current_user_from_cookies(request, db)
+    current_user = await get_user_from_cookies(request, db)
     check_manager_access(current_user)
     
     # Проверяем доступ к разделу
-    check_section_access(current_user, section_id, db)
+    await check_section_access(current_user, section_id, db)
     
-    section = get_section(db, section_id)
+    section = await get_section(db, section_id)
     if not section:
         raise HTTPException(status_code=404, detail="Section not found")
     
     restaurant_id = int(getattr(section, 'restaurant_id', -1))
-    delete_section(db, section_id)
+    await delete_section(db, section_id)
     
     return RedirectResponse(url=f"/restaurants/{restaurant_id}", status_code=302)
 
@@ -535,16 +613,16 @@ async def create_category_page(
     request: Request,
     restaurant_id: int,
     section_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> Any:
     """Страница создания категории"""
-    current_user = get_current_user_from_cookies(request, db)
+    current_user = await get_user_from_cookies(request, db)
     check_manager_access(current_user)
     
     # Проверяем доступ к разделу
-    check_section_access(current_user, section_id, db)
+    await check_section_access(current_user, section_id, db)
     
-    section = get_section(db, section_id)
+    section = await get_section_with_relations(db, section_id)
     if not section:
         raise HTTPException(status_code=404, detail="Section not found")
     
@@ -562,16 +640,16 @@ async def create_category_post(
     section_id: int,
     title: str = Form(...),
     description: str = Form(""),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> Any:
     """Создание категории"""
-    current_user = get_current_user_from_cookies(request, db)
+    current_user = await get_user_from_cookies(request, db)
     check_manager_access(current_user)
     
     # Проверяем доступ к разделу
-    check_section_access(current_user, section_id, db)
+    await check_section_access(current_user, section_id, db)
     
-    section = get_section(db, section_id)
+    section = await get_section(db, section_id)
     if not section:
         raise HTTPException(status_code=404, detail="Section not found")
     
@@ -582,7 +660,7 @@ async def create_category_post(
         restaurant_id=section.restaurant_id  # type: ignore
     )
     
-    new_category = create_category(db, category_data)
+    new_category = await create_category(db, category_data)
     return RedirectResponse(url=f"/restaurants/{restaurant_id}/sections/{section_id}", status_code=302)
 
 @router.get("/restaurants/{restaurant_id}/sections/{section_id}/categories/{category_id}/manage/edit", response_class=HTMLResponse)
@@ -591,16 +669,16 @@ async def edit_category_page(
     restaurant_id: int,
     section_id: int,
     category_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> Any:
     """Страница редактирования категории"""
-    current_user = get_current_user_from_cookies(request, db)
+    current_user = await get_user_from_cookies(request, db)
     check_manager_access(current_user)
     
     # Проверяем доступ к категории
-    check_category_access(current_user, category_id, db)
+    await check_category_access(current_user, category_id, db)
     
-    category = get_category(db, category_id)
+    category = await get_category_with_relations(db, category_id)
     if not category:
         raise HTTPException(status_code=404, detail="Category not found")
     
@@ -619,21 +697,21 @@ async def edit_category_post(
     category_id: int,
     title: str = Form(...),
     description: str = Form(""),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> Any:
     """Редактирование категории"""
-    current_user = get_current_user_from_cookies(request, db)
+    current_user = await get_user_from_cookies(request, db)
     check_manager_access(current_user)
     
     # Проверяем доступ к категории
-    check_category_access(current_user, category_id, db)
+    await check_category_access(current_user, category_id, db)
     
-    category = get_category(db, category_id)
+    category = await get_category(db, category_id)
     if not category:
         raise HTTPException(status_code=404, detail="Category not found")
     
     category_update = CategoryUpdate(title=title, description=description)
-    update_category(db, category_id, category_update)
+    await update_category(db, category_id, category_update)
     
     return RedirectResponse(url=f"/restaurants/{restaurant_id}/sections/{section_id}/categories/{category_id}", status_code=302)
 
@@ -644,21 +722,21 @@ async def delete_category_post(
     restaurant_id: int,
     section_id: int,
     category_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> Any:
     """Удаление категории"""
-    current_user = get_current_user_from_cookies(request, db)
+    current_user = await get_user_from_cookies(request, db)
     check_manager_access(current_user)
     
     # Проверяем доступ к категории
-    check_category_access(current_user, category_id, db)
+    await check_category_access(current_user, category_id, db)
     
-    category = get_category(db, category_id)
+    category = await get_category(db, category_id)
     if not category:
         raise HTTPException(status_code=404, detail="Category not found")
     
     section_id = int(getattr(category, 'section_id', -1))
-    delete_category(db, category_id)
+    await delete_category(db, category_id)
     
     return RedirectResponse(url=f"/restaurants/{restaurant_id}/sections/{section_id}", status_code=302)
 
@@ -670,16 +748,16 @@ async def create_product_page(
     restaurant_id: int,
     section_id: int,
     category_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> Any:
     """Страница создания продукта"""
-    current_user = get_current_user_from_cookies(request, db)
+    current_user = await get_user_from_cookies(request, db)
     check_manager_access(current_user)
     
     # Проверяем доступ к категории
-    check_category_access(current_user, category_id, db)
+    await check_category_access(current_user, category_id, db)
     
-    category = get_category(db, category_id)
+    category = await get_category_with_relations(db, category_id)
     if not category:
         raise HTTPException(status_code=404, detail="Category not found")
     
@@ -709,28 +787,18 @@ async def create_product_post(
     table_setting: str = Form(""),
     gastronomic_pairings: str = Form(""),
     image: UploadFile = File(None),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> Any:
     """Создание продукта с поддержкой загрузки изображения"""
-    import os
-    from uuid import uuid4
-    current_user = get_current_user_from_cookies(request, db)
+    current_user = await get_user_from_cookies(request, db)
     check_manager_access(current_user)
-    check_category_access(current_user, category_id, db)
-    category = get_category(db, category_id)
+    await check_category_access(current_user, category_id, db)
+    category = await get_category(db, category_id)
     if not category:
         raise HTTPException(status_code=404, detail="Category not found")
 
-    image_path = None
-    if image and image.filename:
-        uploads_dir = "uploads"
-        os.makedirs(uploads_dir, exist_ok=True)
-        ext = os.path.splitext(image.filename)[1]
-        unique_name = f"product_{uuid4().hex}{ext}"
-        file_path = os.path.join(uploads_dir, unique_name)
-        with open(file_path, "wb") as f:
-            f.write(await image.read())
-        image_path = unique_name
+    upload = await file_service.save_upload(image)
+    image_path = upload.path if upload else None
 
     product_data = ProductCreate(
         title=title,
@@ -745,7 +813,8 @@ async def create_product_post(
         category_id=category_id,
         restaurant_id=category.restaurant_id  # type: ignore
     )
-    create_product(db, product_data)
+    product = await create_product(db, product_data, upload.metadata if upload else None)
+    image_service.schedule(product.id, image_path)  # type: ignore
     return RedirectResponse(url=f"/restaurants/{restaurant_id}/sections/{section_id}/categories/{category_id}", status_code=302)
 
 @router.get("/restaurants/{restaurant_id}/sections/{section_id}/categories/{category_id}/products/{product_id}/manage/edit", response_class=HTMLResponse)
@@ -755,16 +824,16 @@ async def edit_product_page(
     section_id: int,
     category_id: int,
     product_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> Any:
     """Страница редактирования продукта"""
-    current_user = get_current_user_from_cookies(request, db)
+    current_user = await get_user_from_cookies(request, db)
     check_manager_access(current_user)
     
     # Проверяем доступ к продукту
-    check_product_access(current_user, product_id, db)
+    await check_product_access(current_user, product_id, db)
     
-    product = get_product(db, product_id)
+    product = await get_product_with_relations(db, product_id)
     if not product:
         raise HTTPException(status_code=404, detail="Product not found")
     
@@ -791,15 +860,13 @@ async def edit_product_post(
     table_setting: str = Form(""),
     gastronomic_pairings: str = Form(""),
     image: UploadFile = File(None),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> Any:
     """Редактирование продукта с поддержкой смены изображения"""
-    import os
-    from uuid import uuid4
-    current_user = get_current_user_from_cookies(request, db)
+    current_user = await get_user_from_cookies(request, db)
     check_manager_access(current_user)
-    check_product_access(current_user, product_id, db)
-    product = get_product(db, product_id)
+    await check_product_access(current_user, product_id, db)
+    product = await get_product(db, product_id)
     if not product:
         raise HTTPException(status_code=404, detail="Product not found")
 
@@ -808,15 +875,9 @@ async def edit_product_post(
         image_path = image_path
     elif image_path is not None:
         image_path = str(image_path)
-    if image and image.filename:
-        uploads_dir = "uploads"
-        os.makedirs(uploads_dir, exist_ok=True)
-        ext = os.path.splitext(image.filename)[1]
-        unique_name = f"product_{uuid4().hex}{ext}"
-        file_path = os.path.join(uploads_dir, unique_name)
-        with open(file_path, "wb") as f:
-            f.write(await image.read())
-        image_path = unique_name
+    upload = await file_service.save_upload(image)
+    if upload:
+        image_path = upload.path
 
     product_update = ProductUpdate(
         title=title,
@@ -829,7 +890,8 @@ async def edit_product_post(
         gastronomic_pairings=gastronomic_pairings if gastronomic_pairings else None,
         image_path=image_path
     )
-    update_product(db, product_id, product_update)
+    await update_product(db, product_id, product_update, upload.metadata if upload else None)
+    image_service.schedule(product_id, upload.path if upload else None)
     return RedirectResponse(url=f"/restaurants/{restaurant_id}/sections/{section_id}/categories/{category_id}/products/{product_id}", status_code=302)
 
 
@@ -840,21 +902,21 @@ async def delete_product_post(
     section_id: int,
     category_id: int,
     product_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> Any:
     """Удаление продукта"""
-    current_user = get_current_user_from_cookies(request, db)
+    current_user = await get_user_from_cookies(request, db)
     check_manager_access(current_user)
     
     # Проверяем доступ к продукту
-    check_product_access(current_user, product_id, db)
+    await check_product_access(current_user, product_id, db)
     
-    product = get_product(db, product_id)
+    product = await get_product(db, product_id)
     if not product:
         raise HTTPException(status_code=404, detail="Product not found")
     
     category_id = int(getattr(product, 'category_id', -1))
-    delete_product(db, product_id)
+    await delete_product(db, product_id)
     
     return RedirectResponse(url=f"/restaurants/{restaurant_id}/sections/{section_id}/categories/{category_id}", status_code=302)
 
@@ -864,10 +926,10 @@ async def delete_product_post(
 @router.get("/manage/restaurants/create", response_class=HTMLResponse)
 async def create_restaurant_page(
     request: Request,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> Any:
     """Страница создания ресторана"""
-    current_user = get_current_user_from_cookies(request, db)
+    current_user = await get_user_from_cookies(request, db)
     check_manager_access(current_user)
     
     return templates.TemplateResponse("manage/create_restaurant.html", {
@@ -881,14 +943,14 @@ async def create_restaurant_post(
     request: Request,
     name: str = Form(...),
     concept: str = Form(""),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> Any:
     """Создание ресторана"""
-    current_user = get_current_user_from_cookies(request, db)
+    current_user = await get_user_from_cookies(request, db)
     check_manager_access(current_user)
     
     # Проверяем, есть ли уже ресторан у этого менеджера
-    existing_restaurants = get_restaurants_by_manager(db, current_user.id)  # type: ignore
+    existing_restaurants = await get_restaurants_by_manager(db, current_user.id)  # type: ignore
     if existing_restaurants:
         return templates.TemplateResponse(
             "manage/create_restaurant.html", 
@@ -905,19 +967,19 @@ async def create_restaurant_post(
         manager_id=current_user.id  # type: ignore
     )
     
-    create_restaurant(db, restaurant_data)
+    await create_restaurant(db, restaurant_data)
     return RedirectResponse(url="/restaurants", status_code=302)
 
 @router.get("/restaurants/{restaurant_id}/manage/edit", response_class=HTMLResponse)
 async def edit_restaurant_page(
     request: Request,
     restaurant_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> Any:
-    current_user = get_current_user_from_cookies(request, db)
+    current_user = await get_user_from_cookies(request, db)
     check_manager_access(current_user)
-    check_restaurant_access(current_user, restaurant_id, db)
-    restaurant = get_restaurant(db, restaurant_id)
+    await check_restaurant_access(current_user, restaurant_id, db)
+    restaurant = await get_restaurant(db, restaurant_id)
     if not restaurant:
         raise HTTPException(status_code=404, detail="Restaurant not found")
     return templates.TemplateResponse("manage/edit_restaurant.html", {
@@ -936,63 +998,60 @@ async def edit_restaurant_modal(
     restaurant_id: int,
     name: str = Form(...),
     concept: str = Form(""),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> Any:
-    current_user = get_current_user_from_cookies(request, db)
+    current_user = await get_user_from_cookies(request, db)
     check_manager_access(current_user)
-    check_restaurant_access(current_user, restaurant_id, db)
-    restaurant = get_restaurant(db, restaurant_id)
+    await check_restaurant_access(current_user, restaurant_id, db)
+    restaurant = await get_restaurant(db, restaurant_id)
     if not restaurant:
         raise HTTPException(status_code=404, detail="Restaurant not found")
-    update_data = RestaurantCreate(name=name, concept=concept if concept else None)
     # Обновляем только name и concept
-    setattr(restaurant, 'name', name)
-    setattr(restaurant, 'concept', concept if concept else None)
-    db.commit()
-    db.refresh(restaurant)
+    update_data = RestaurantUpdate(name=name, concept=concept if concept else None)
+    await update_restaurant(db, restaurant_id, update_data)
     # После сохранения возвращаемся на detail ресторана
     return RedirectResponse(url=f"/restaurants/{restaurant_id}", status_code=302)
 
 # --- REDIRECTS FROM OLD MANAGE ROUTES TO NEW NESTED ROUTES ---
 @router.get("/manage/products/edit/{product_id}")
-async def legacy_edit_product_redirect(product_id: int, db: Session = Depends(get_db)):
-    product = get_product(db, product_id)
+async def legacy_edit_product_redirect(product_id: int, db: AsyncSession = Depends(get_async_db)):
+    product = await get_product(db, product_id)
     if not product:
         raise HTTPException(status_code=404, detail="Product not found")
     category_id = int(getattr(product, 'category_id', -1))
-    category = get_category(db, category_id)
+    category = await get_category(db, category_id)
     if not category:
         raise HTTPException(status_code=404, detail="Category not found")
     section_id = int(getattr(category, 'section_id', -1))
-    section = get_section(db, section_id)
+    section = await get_section(db, section_id)
     if not section:
         raise HTTPException(status_code=404, detail="Section not found")
     restaurant_id = int(getattr(product, 'restaurant_id', -1))
     return RedirectResponse(url=f"/restaurants/{restaurant_id}/sections/{section.id}/categories/{category.id}/products/{product.id}/manage/edit", status_code=302)
 
 @router.get("/manage/products/create/{category_id}")
-async def legacy_create_product_redirect(category_id: int, db: Session = Depends(get_db)):
-    category = get_category(db, category_id)
+async def legacy_create_product_redirect(category_id: int, db: AsyncSession = Depends(get_async_db)):
+    category = await get_category(db, category_id)
     if not category:
         raise HTTPException(status_code=404, detail="Category not found")
     section_id = int(getattr(category, 'section_id', -1))
-    section = get_section(db, section_id)
+    section = await get_section(db, section_id)
     if not section:
         raise HTTPException(status_code=404, detail="Section not found")
     restaurant_id = int(getattr(category, 'restaurant_id', -1))
     return RedirectResponse(url=f"/restaurants/{restaurant_id}/sections/{section.id}/categories/{category.id}/manage/products/create", status_code=302)
 
 @router.post("/manage/products/delete/{product_id}")
-async def legacy_delete_product_redirect(product_id: int, db: Session = Depends(get_db)):
-    product = get_product(db, product_id)
+async def legacy_delete_product_redirect(product_id: int, db: AsyncSession = Depends(get_async_db)):
+    product = await get_product(db, product_id)
     if not product:
         raise HTTPException(status_code=404, detail="Product not found")
     category_id = int(getattr(product, 'category_id', -1))
-    category = get_category(db, category_id)
+    category = await get_category(db, category_id)
     if not category:
         raise HTTPException(status_code=404, detail="Category not found")
     section_id = int(getattr(category, 'section_id', -1))
-    section = get_section(db, section_id)
+    section = await get_section(db, section_id)
     if not section:
         raise HTTPException(status_code=404, detail="Section not found")
     restaurant_id = int(getattr(product, 'restaurant_id', -1))
@@ -1000,40 +1059,40 @@ async def legacy_delete_product_redirect(product_id: int, db: Session = Depends(
 
 # Аналогично для категорий и секций (edit/create/delete)
 @router.get("/manage/categories/edit/{category_id}")
-async def legacy_edit_category_redirect(category_id: int, db: Session = Depends(get_db)):
-    category = get_category(db, category_id)
+async def legacy_edit_category_redirect(category_id: int, db: AsyncSession = Depends(get_async_db)):
+    category = await get_category(db, category_id)
     if not category:
         raise HTTPException(status_code=404, detail="Category not found")
     section_id = int(getattr(category, 'section_id', -1))
-    section = get_section(db, section_id)
+    section = await get_section(db, section_id)
     if not section:
         raise HTTPException(status_code=404, detail="Section not found")
     restaurant_id = int(getattr(category, 'restaurant_id', -1))
     return RedirectResponse(url=f"/restaurants/{restaurant_id}/sections/{section.id}/categories/{category.id}/manage/edit", status_code=302)
 
 @router.get("/manage/categories/create/{section_id}")
-async def legacy_create_category_redirect(section_id: int, db: Session = Depends(get_db)):
-    section = get_section(db, section_id)
+async def legacy_create_category_redirect(section_id: int, db: AsyncSession = Depends(get_async_db)):
+    section = await get_section(db, section_id)
     if not section:
         raise HTTPException(status_code=404, detail="Section not found")
     restaurant_id = int(getattr(section, 'restaurant_id', -1))
     return RedirectResponse(url=f"/restaurants/{restaurant_id}/sections/{section.id}/manage/categories/create", status_code=302)
 
 @router.post("/manage/categories/delete/{category_id}")
-async def legacy_delete_category_redirect(category_id: int, db: Session = Depends(get_db)):
-    category = get_category(db, category_id)
+async def legacy_delete_category_redirect(category_id: int, db: AsyncSession = Depends(get_async_db)):
+    category = await get_category(db, category_id)
     if not category:
         raise HTTPException(status_code=404, detail="Category not found")
     section_id = int(getattr(category, 'section_id', -1))
-    section = get_section(db, section_id)
+    section = await get_section(db, section_id)
     if not section:
         raise HTTPException(status_code=404, detail="Section not found")
     restaurant_id = int(getattr(category, 'restaurant_id', -1))
     return RedirectResponse(url=f"/restaurants/{restaurant_id}/sections/{section.id}/categories/{category.id}/manage/delete", status_code=307)
 
 @router.get("/manage/sections/edit/{section_id}")
-async def legacy_edit_section_redirect(section_id: int, db: Session = Depends(get_db)):
-    section = get_section(db, section_id)
+async def legacy_edit_section_redirect(section_id: int, db: AsyncSession = Depends(get_async_db)):
+    section = await get_section(db, section_id)
     if not section:
         raise HTTPException(status_code=404, detail="Section not found")
     restaurant_id = int(getattr(section, 'restaurant_id', -1))
@@ -1044,8 +1103,8 @@ async def legacy_create_section_redirect(restaurant_id: int):
     return RedirectResponse(url=f"/restaurants/{restaurant_id}/manage/sections/create", status_code=302)
 
 @router.post("/manage/sections/delete/{section_id}")
-async def legacy_delete_section_redirect(section_id: int, db: Session = Depends(get_db)):
-    section = get_section(db, section_id)
+async def legacy_delete_section_redirect(section_id: int, db: AsyncSession = Depends(get_async_db)):
+    section = await get_section(db, section_id)
     if not section:
         raise HTTPException(status_code=404, detail="Section not found")
     restaurant_id = int(getattr(section, 'restaurant_id', -1))
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+import sys
+import os
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.config import IMAGE_DERIVATIVE_WIDTHS, IMAGE_WORKERS
+from app.infrastructure.database.database import SessionLocal
+from app.infrastructure.images.derivatives import generate_stored_derivatives, stored_image_metadata
+from app.infrastructure.storage.backend import storage
+from app.infrastructure.repositories.crud import (
+    get_products_without_image_variants, set_product_image_variants,
+    get_products_without_image_metadata, set_product_image_metadata,
+)
+
+
+def backfill_images() -> None:
+    """Уменьшенные копии, размеры и заглушки для уже загруженных изображений продуктов"""
+    db = SessionLocal()
+    try:
+        pending_variants = [(product.id, product.image_path) for product in get_products_without_image_variants(db)]
+        pending_metadata = [(product.id, product.image_path) for product in get_products_without_image_metadata(db)]
+        print(f"Изображений без копий: {len(pending_variants)}, без размеров: {len(pending_metadata)}")
+        done = 0
+        with ProcessPoolExecutor(max_workers=IMAGE_WORKERS, mp_context=multiprocessing.get_context("spawn")) as pool:
+            futures = {}
+            for product_id, image_path in pending_variants:
+                future = pool.submit(generate_stored_derivatives, storage, image_path, IMAGE_DERIVATIVE_WIDTHS)
+                futures[future] = (product_id, image_path, set_product_image_variants)
+            for product_id, image_path in pending_metadata:
+                future = pool.submit(stored_image_metadata, storage, image_path)
+                futures[future] = (product_id, image_path, set_product_image_metadata)
+            for future in as_completed(futures):
+                product_id, image_path, save_result = futures[future]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    print(f"  Продукт {product_id}, {image_path}: {e}")
+                    continue
+                if save_result(db, product_id, image_path, result):
+                    done += 1
+        print(f"Обработано: {done}")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    backfill_images()
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+import argparse
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import time
+from typing import Dict, List, Optional
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import httpx
+
+
+def find_demo_category_path() -> str:
+    """Путь к первой категории демо-ресторана (данные init_db.py)"""
+    from app.infrastructure.database.database import SessionLocal
+    from app.domain.entities.models import Category, Restaurant
+
+    db = SessionLocal()
+    try:
+        restaurant = db.query(Restaurant).filter(Restaurant.manager_id.is_(None)).order_by(Restaurant.id).first()
+        if not restaurant:
+            raise SystemExit("В базе нет демо-ресторана, сначала запустите init_db.py")
+        category = (
+            db.query(Category)
+            .filter(Category.restaurant_id == restaurant.id)
+            .order_by(Category.id)
+            .first()
+        )
+        if not category:
+            raise SystemExit("У демо-ресторана нет категорий")
+        return f"/restaurants/{restaurant.id}/sections/{category.section_id}/categories/{category.id}"
+    finally:
+        db.close()
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(port: int) -> subprocess.Popen:
+    """Один воркер uvicorn с тем же окружением (DATABASE_URL, DB_POOL_* и т.д.)"""
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.presentation.api.main:app",
+         "--host", "127.0.0.1", "--port", str(port), "--workers", "1", "--log-level", "warning"],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+    )
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise SystemExit("uvicorn завершился при запуске")
+        try:
+            httpx.get(f"http://127.0.0.1:{port}/about", timeout=1)
+            return server
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    server.terminate()
+    raise SystemExit("uvicorn не ответил за 30 секунд")
+
+
+async def run_load(base_url: str, path: str, total: int, concurrency: int, cookies: Dict[str, str]) -> Dict[str, float]:
+    """total GET-запросов к path, concurrency одновременных клиентов"""
+    latencies: List[float] = []
+    errors = 0
+    remaining = total
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, cookies=cookies, limits=limits, timeout=60) as client:
+        async def worker() -> None:
+            nonlocal remaining, errors
+            while remaining > 0:
+                remaining -= 1
+                started = time.perf_counter()
+                try:
+                    response = await client.get(path)
+                    if response.status_code != 200:
+                        errors += 1
+                except httpx.HTTPError:
+                    errors += 1
+                latencies.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "rps": len(latencies) / elapsed,
+        "p50": latencies[len(latencies) // 2] * 1000,
+        "p95": latencies[int(len(latencies) * 0.95) - 1] * 1000,
+        "errors": errors,
+    }
+
+
+def bench_pages() -> None:
+    """Пропускная способность страниц меню: один воркер, N одновременных клиентов"""
+    parser = argparse.ArgumentParser(description=bench_pages.__doc__)
+    parser.add_argument("--url", help="адрес запущенного сервера; по умолчанию запускается локальный uvicorn")
+    parser.add_argument("--path", action="append", help="страница (можно несколько); по умолчанию категория демо-ресторана и /demo")
+    parser.add_argument("--requests", type=int, default=300, help="запросов на страницу и уровень параллелизма")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[8, 32], help="число одновременных клиентов")
+    parser.add_argument("--warmup", type=int, default=20, help="запросов на прогрев перед замером")
+    parser.add_argument(
+        "--page-cache", action="store_true",
+        help="не обходить кэш страниц (по умолчанию запросы идут с cookie access_token и читают БД)",
+    )
+    args = parser.parse_args()
+
+    paths = args.path or [find_demo_category_path(), "/demo"]
+    # Кэш страниц пропускает запросы с cookie access_token; невалидный токен - анонимный посетитель
+    cookies = {} if args.page_cache else {"access_token": "bench"}
+
+    server: Optional[subprocess.Popen] = None
+    base_url = args.url
+    if not base_url:
+        port = free_port()
+        server = start_server(port)
+        base_url = f"http://127.0.0.1:{port}"
+    try:
+        print(f"{'страница':<48} {'клиентов':>8} {'req/s':>8} {'p50 мс':>8} {'p95 мс':>8} {'ошибок':>7}")
+        for path in paths:
+            asyncio.run(run_load(base_url, path, args.warmup, 1, cookies))
+            for concurrency in args.concurrency:
+                result = asyncio.run(run_load(base_url, path, args.requests, concurrency, cookies))
+                print(
+                    f"{path:<48} {concurrency:>8} {result['rps']:>8.0f} {result['p50']:>8.1f}"
+                    f" {result['p95']:>8.1f} {result['errors']:>7}"
+                )
+    finally:
+        if server:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    bench_pages()
@@ -0,0 +1,19 @@
+#!/usr/bin/env python3
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.config import STATIC_DIR
+from app.presentation.api.compression import brotli, precompress_directory
+
+
+def compress_static(directory: str = STATIC_DIR) -> None:
+    """Сборка сжатых копий (.gz/.br) статических файлов"""
+    written = precompress_directory(directory)
+    print(f"Записано сжатых копий: {written}")
+    if brotli is None:
+        print("Пакет brotli не установлен - копии .br не созданы")
+
+
+if __name__ == "__main__":
+    compress_static(*sys.argv[1:2])
@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+import argparse
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.application.services.upload_gc_service import upload_gc_service
+
+
+def gc_uploads() -> None:
+    """Удаление (или перенос в карантин) файлов uploads/, не используемых продуктами"""
+    parser = argparse.ArgumentParser(description=gc_uploads.__doc__)
+    parser.add_argument("--dry-run", action="store_true", help="только показать, сколько места освободится")
+    parser.add_argument(
+        "--quarantine", metavar="DIR",
+        help="переносить файлы в DIR вне хранилища вместо удаления (для S3 - префикс ключа)",
+    )
+    parser.add_argument("--grace-hours", type=float, help="не трогать файлы моложе N часов")
+    args = parser.parse_args()
+    local_directory = upload_gc_service.storage.local_directory
+    if args.quarantine and local_directory:
+        quarantine = os.path.abspath(args.quarantine)
+        if os.path.commonpath([quarantine, os.path.abspath(local_directory)]) == os.path.abspath(local_directory):
+            parser.error("каталог карантина должен быть вне каталога загрузок")
+    if args.grace_hours is not None:
+        upload_gc_service.grace_seconds = int(args.grace_hours * 3600)
+
+    report = upload_gc_service.collect(dry_run=args.dry_run, quarantine_dir=args.quarantine)
+    print(f"Просмотрено файлов: {report.scanned}")
+    print(f"Неиспользуемых: {report.orphaned} (моложе срока ожидания, пропущено: {report.skipped_recent})")
+    action = "Будет освобождено" if args.dry_run else "Освобождено"
+    print(f"{action}: {report.reclaimed_bytes / (1024 * 1024):.1f} МБ ({report.reclaimed_bytes} байт)")
+    if report.released_records:
+        print(f"Удалено записей stored_files: {report.released_records}")
+
+
+if __name__ == "__main__":
+    gc_uploads()
@@ -0,0 +1,51 @@
+"""Индексы для частых фильтров и внешних ключей
+
+Базы, созданные через Base.metadata.create_all до появления миграций,
+содержат таблицы, но не эти индексы. Новые базы получают индексы сразу
+из моделей, поэтому создаются только отсутствующие.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18
+"""
+from typing import List, Sequence, Tuple, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "0001"
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+INDEXES: List[Tuple[str, str, List[str]]] = [
+    ("ix_users_manager_id", "users", ["manager_id"]),
+    ("ix_restaurants_manager_id", "restaurants", ["manager_id"]),
+    ("ix_restaurants_waiter_id", "restaurants", ["waiter_id"]),
+    ("ix_sections_restaurant_id", "sections", ["restaurant_id"]),
+    ("ix_categories_section_id", "categories", ["section_id"]),
+    ("ix_categories_restaurant_id", "categories", ["restaurant_id"]),
+    ("ix_products_restaurant_id_is_deleted_modified_at", "products", ["restaurant_id", "is_deleted", "modified_at"]),
+    ("ix_products_category_id_is_deleted_id", "products", ["category_id", "is_deleted", "id"]),
+    ("ix_telegram_sessions_user_id", "telegram_sessions", ["user_id"]),
+    ("ix_invitations_manager_id", "invitations", ["manager_id"]),
+]
+
+
+def _existing_indexes(table: str) -> set:
+    inspector = sa.inspect(op.get_bind())
+    return {index["name"] for index in inspector.get_indexes(table)}
+
+
+def upgrade() -> None:
+    for name, table, columns in INDEXES:
+        if name not in _existing_indexes(table):
+            op.create_index(name, table, columns)
+
+
+def downgrade() -> None:
+    for name, table, _ in reversed(INDEXES):
+        if name in _existing_indexes(table):
+            op.drop_index(name, table_name=table)
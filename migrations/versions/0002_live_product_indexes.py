@@ -0,0 +1,66 @@
+"""Частичные индексы по неудаленным продуктам
+
+Составные индексы с is_deleted заменяются частичными индексами по живым
+строкам (is_deleted = false) и обычными индексами внешних ключей, которые
+нужны запросам с include_deleted и очистке удаленных продуктов.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "0002"
+down_revision: Union[str, None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+LIVE_ROWS_SQLITE = sa.text("is_deleted = 0")
+LIVE_ROWS_POSTGRESQL = sa.text("is_deleted = false")
+
+
+def _existing_indexes() -> set:
+    inspector = sa.inspect(op.get_bind())
+    return {index["name"] for index in inspector.get_indexes("products")}
+
+
+def upgrade() -> None:
+    existing = _existing_indexes()
+    for name in ("ix_products_restaurant_id_is_deleted_modified_at", "ix_products_category_id_is_deleted_id"):
+        if name in existing:
+            op.drop_index(name, table_name="products")
+    if "ix_products_category_id" not in existing:
+        op.create_index("ix_products_category_id", "products", ["category_id"])
+    if "ix_products_restaurant_id" not in existing:
+        op.create_index("ix_products_restaurant_id", "products", ["restaurant_id"])
+    if "ix_products_live_restaurant_id_modified_at" not in existing:
+        op.create_index(
+            "ix_products_live_restaurant_id_modified_at", "products", ["restaurant_id", "modified_at"],
+            sqlite_where=LIVE_ROWS_SQLITE, postgresql_where=LIVE_ROWS_POSTGRESQL,
+        )
+    if "ix_products_live_category_id_id" not in existing:
+        op.create_index(
+            "ix_products_live_category_id_id", "products", ["category_id", "id"],
+            sqlite_where=LIVE_ROWS_SQLITE, postgresql_where=LIVE_ROWS_POSTGRESQL,
+        )
+
+
+def downgrade() -> None:
+    existing = _existing_indexes()
+    for name in (
+        "ix_products_live_category_id_id",
+        "ix_products_live_restaurant_id_modified_at",
+        "ix_products_restaurant_id",
+        "ix_products_category_id",
+    ):
+        if name in existing:
+            op.drop_index(name, table_name="products")
+    op.create_index(
+        "ix_products_restaurant_id_is_deleted_modified_at", "products", ["restaurant_id", "is_deleted", "modified_at"]
+    )
+    op.create_index("ix_products_category_id_is_deleted_id", "products", ["category_id", "is_deleted", "id"])
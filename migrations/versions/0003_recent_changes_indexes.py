@@ -0,0 +1,49 @@
+"""Индексы ленты изменений по (modified_at, id)
+
+Лента изменений показывает и удаленные продукты, поэтому частичный индекс
+по живым строкам ей не подходит. Он заменяется полным индексом
+(restaurant_id, modified_at, id), который также покрывает внешний ключ
+restaurant_id, и индексом (modified_at, id) для ленты по всем ресторанам.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "0003"
+down_revision: Union[str, None] = "0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _existing_indexes() -> set:
+    inspector = sa.inspect(op.get_bind())
+    return {index["name"] for index in inspector.get_indexes("products")}
+
+
+def upgrade() -> None:
+    existing = _existing_indexes()
+    for name in ("ix_products_live_restaurant_id_modified_at", "ix_products_restaurant_id"):
+        if name in existing:
+            op.drop_index(name, table_name="products")
+    if "ix_products_restaurant_id_modified_at_id" not in existing:
+        op.create_index("ix_products_restaurant_id_modified_at_id", "products", ["restaurant_id", "modified_at", "id"])
+    if "ix_products_modified_at_id" not in existing:
+        op.create_index("ix_products_modified_at_id", "products", ["modified_at", "id"])
+
+
+def downgrade() -> None:
+    existing = _existing_indexes()
+    for name in ("ix_products_modified_at_id", "ix_products_restaurant_id_modified_at_id"):
+        if name in existing:
+            op.drop_index(name, table_name="products")
+    op.create_index("ix_products_restaurant_id", "products", ["restaurant_id"])
+    op.create_index(
+        "ix_products_live_restaurant_id_modified_at", "products", ["restaurant_id", "modified_at"],
+        sqlite_where=sa.text("is_deleted = 0"), postgresql_where=sa.text("is_deleted = false"),
+    )
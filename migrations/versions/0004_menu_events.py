@@ -0,0 +1,68 @@
+"""Журнал изменений меню menu_events
+
+Таблица заполняется историей из существующих данных: создание ресторанов,
+разделов и категорий и последнее изменение (или удаление) каждого продукта.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "0004"
+down_revision: Union[str, None] = "0003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+BACKFILL = """
+INSERT INTO menu_events (restaurant_id, section_id, category_id, entity_type, entity_id, action, title, created_at)
+SELECT restaurant_id, section_id, category_id, entity_type, entity_id, action, title, created_at FROM (
+    SELECT id AS restaurant_id, NULL AS section_id, NULL AS category_id, 'restaurant' AS entity_type,
+           id AS entity_id, 'created' AS action, name AS title, created_at
+    FROM restaurants
+    UNION ALL
+    SELECT restaurant_id, id, NULL, 'section', id, 'created', name, created_at
+    FROM sections
+    UNION ALL
+    SELECT restaurant_id, section_id, id, 'category', id, 'created', title, created_at
+    FROM categories
+    UNION ALL
+    SELECT p.restaurant_id, c.section_id, p.category_id, 'product', p.id,
+           CASE WHEN p.is_deleted THEN 'deleted' ELSE 'updated' END, p.title, p.modified_at
+    FROM products p LEFT JOIN categories c ON c.id = p.category_id
+) AS history
+ORDER BY created_at
+"""
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if "menu_events" not in sa.inspect(bind).get_table_names():
+        op.create_table(
+            "menu_events",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("restaurant_id", sa.Integer(), nullable=True),
+            sa.Column("section_id", sa.Integer(), nullable=True),
+            sa.Column("category_id", sa.Integer(), nullable=True),
+            sa.Column("entity_type", sa.String(), nullable=True),
+            sa.Column("entity_id", sa.Integer(), nullable=True),
+            sa.Column("action", sa.String(), nullable=True),
+            sa.Column("title", sa.String(), nullable=True),
+            sa.Column("created_at", sa.DateTime(), nullable=True),
+        )
+        op.create_index("ix_menu_events_id", "menu_events", ["id"])
+        op.create_index("ix_menu_events_restaurant_id_id", "menu_events", ["restaurant_id", "id"])
+    # Новые базы получают записи журнала сразу от crud, история нужна только пустому журналу
+    if bind.execute(sa.text("SELECT COUNT(*) FROM menu_events")).scalar() == 0:
+        op.execute(BACKFILL)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_menu_events_restaurant_id_id", table_name="menu_events")
+    op.drop_index("ix_menu_events_id", table_name="menu_events")
+    op.drop_table("menu_events")
@@ -0,0 +1,35 @@
+"""Уменьшенные копии изображений продуктов: products.image_variants
+
+Колонка заполняется в фоне после загрузки изображения; для уже загруженных
+изображений - командой python backfill_images.py.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "0005"
+down_revision: Union[str, None] = "0004"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _existing_columns() -> set:
+    inspector = sa.inspect(op.get_bind())
+    return {column["name"] for column in inspector.get_columns("products")}
+
+
+def upgrade() -> None:
+    if "image_variants" not in _existing_columns():
+        op.add_column("products", sa.Column("image_variants", sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    if "image_variants" in _existing_columns():
+        with op.batch_alter_table("products") as batch_op:
+            batch_op.drop_column("image_variants")
@@ -0,0 +1,53 @@
+"""Учет загруженных файлов stored_files
+
+Новые загрузки хранятся по хешу содержимого, и у одного файла может быть
+несколько продуктов. Таблица заполняется по уже загруженным изображениям:
+файлы с прежними именами product_<uuid> учитываются без хеша.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "0006"
+down_revision: Union[str, None] = "0005"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+BACKFILL = """
+INSERT INTO stored_files (path, sha256, ref_count, created_at)
+SELECT image_path, NULL, COUNT(*), MIN(created_at)
+FROM products
+WHERE image_path IS NOT NULL AND image_path != ''
+GROUP BY image_path
+"""
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if "stored_files" not in sa.inspect(bind).get_table_names():
+        op.create_table(
+            "stored_files",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("path", sa.String(), nullable=True),
+            sa.Column("sha256", sa.String(length=64), nullable=True),
+            sa.Column("ref_count", sa.Integer(), nullable=False, server_default="0"),
+            sa.Column("created_at", sa.DateTime(), nullable=True),
+        )
+        op.create_index("ix_stored_files_id", "stored_files", ["id"])
+        op.create_index("ix_stored_files_path", "stored_files", ["path"], unique=True)
+    # Ссылки продуктов, сохраненных до появления таблицы
+    if bind.execute(sa.text("SELECT COUNT(*) FROM stored_files")).scalar() == 0:
+        op.execute(BACKFILL)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_stored_files_path", table_name="stored_files")
+    op.drop_index("ix_stored_files_id", table_name="stored_files")
+    op.drop_table("stored_files")
@@ -0,0 +1,46 @@
+"""Размеры и размытые заглушки изображений продуктов
+
+Колонки products.image_width, image_height и image_placeholder заполняются
+при загрузке изображения; для уже загруженных изображений - командой
+python backfill_images.py.
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-18
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "0007"
+down_revision: Union[str, None] = "0006"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+_COLUMNS = (
+    ("image_width", sa.Integer),
+    ("image_height", sa.Integer),
+    ("image_placeholder", sa.Text),
+)
+
+
+def _existing_columns() -> set:
+    inspector = sa.inspect(op.get_bind())
+    return {column["name"] for column in inspector.get_columns("products")}
+
+
+def upgrade() -> None:
+    existing = _existing_columns()
+    for name, column_type in _COLUMNS:
+        if name not in existing:
+            op.add_column("products", sa.Column(name, column_type(), nullable=True))
+
+
+def downgrade() -> None:
+    existing = _existing_columns()
+    with op.batch_alter_table("products") as batch_op:
+        for name, _ in reversed(_COLUMNS):
+            if name in existing:
+                batch_op.drop_column(name)
@@ -0,0 +1,30 @@
+"""Общий счетчик сбросов кэшей доступа: cache_versions
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-18
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "0008"
+down_revision: Union[str, None] = "0007"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    if "cache_versions" not in sa.inspect(op.get_bind()).get_table_names():
+        op.create_table(
+            "cache_versions",
+            sa.Column("name", sa.String(), primary_key=True),
+            sa.Column("version", sa.Integer(), nullable=False, server_default="0"),
+        )
+
+
+def downgrade() -> None:
+    if "cache_versions" in sa.inspect(op.get_bind()).get_table_names():
+        op.drop_table("cache_versions")
@@ -0,0 +1,61 @@
+"""products.is_deleted NOT NULL
+
+Фильтр soft_delete (is_deleted = false) и частичные индексы по живым строкам
+не видят строк с is_deleted IS NULL, которые могли остаться от ранних версий
+или вставок в обход ORM. NULL заполняется значением false, колонка получает
+NOT NULL и серверное значение по умолчанию false.
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-18
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "0009"
+down_revision: Union[str, None] = "0008"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+LIVE_ROWS_SQLITE = sa.text("is_deleted = 0")
+LIVE_ROWS_POSTGRESQL = sa.text("is_deleted = false")
+LIVE_INDEX = "ix_products_live_category_id_id"
+
+
+def _is_deleted_nullable() -> bool:
+    inspector = sa.inspect(op.get_bind())
+    columns = {column["name"]: column for column in inspector.get_columns("products")}
+    return bool(columns["is_deleted"]["nullable"])
+
+
+def _recreate_live_index() -> None:
+    # Пересоздание таблицы в batch-режиме SQLite может потерять условие WHERE
+    # частичного индекса, поэтому индекс создается заново явно
+    inspector = sa.inspect(op.get_bind())
+    if LIVE_INDEX in {index["name"] for index in inspector.get_indexes("products")}:
+        op.drop_index(LIVE_INDEX, table_name="products")
+    op.create_index(
+        LIVE_INDEX, "products", ["category_id", "id"],
+        sqlite_where=LIVE_ROWS_SQLITE, postgresql_where=LIVE_ROWS_POSTGRESQL,
+    )
+
+
+def upgrade() -> None:
+    op.execute(sa.text("UPDATE products SET is_deleted = :value WHERE is_deleted IS NULL").bindparams(value=False))
+    if _is_deleted_nullable():
+        with op.batch_alter_table("products") as batch_op:
+            batch_op.alter_column(
+                "is_deleted", existing_type=sa.Boolean(), nullable=False, server_default=sa.false()
+            )
+        _recreate_live_index()
+
+
+def downgrade() -> None:
+    if not _is_deleted_nullable():
+        with op.batch_alter_table("products") as batch_op:
+            batch_op.alter_column("is_deleted", existing_type=sa.Boolean(), nullable=True, server_default=None)
+        _recreate_live_index()
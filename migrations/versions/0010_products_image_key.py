@@ -0,0 +1,70 @@
+"""products.image_key для проверки доступа к /uploads
+
+При UPLOADS_ACCESS_CONTROL каждый запрос изображения ищет рестораны его
+продуктов. Условие image_path LIKE 'key.%' не использует индекс (LIKE в SQLite
+регистронезависим, а в PostgreSQL индекс по строке с локалью не подходит для
+префикса), поэтому ключ хранится в отдельной индексированной колонке и
+сравнивается на равенство. Для существующих продуктов ключ вычисляется
+из image_path.
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-18
+"""
+import os
+import re
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "0010"
+down_revision: Union[str, None] = "0009"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEX = "ix_products_image_key"
+
+# Копия app.infrastructure.images.derivatives.image_key: миграция не зависит от кода приложения
+_DERIVATIVE_SUFFIX = re.compile(r"_\d+w$")
+
+
+def _image_key(path: str) -> str:
+    return _DERIVATIVE_SUFFIX.sub("", os.path.splitext(path)[0])
+
+
+def _existing_columns() -> set:
+    inspector = sa.inspect(op.get_bind())
+    return {column["name"] for column in inspector.get_columns("products")}
+
+
+def _existing_indexes() -> set:
+    inspector = sa.inspect(op.get_bind())
+    return {index["name"] for index in inspector.get_indexes("products")}
+
+
+def upgrade() -> None:
+    if "image_key" not in _existing_columns():
+        op.add_column("products", sa.Column("image_key", sa.String(), nullable=True))
+    if INDEX not in _existing_indexes():
+        op.create_index(INDEX, "products", ["image_key"])
+
+    bind = op.get_bind()
+    rows = bind.execute(sa.text(
+        "SELECT id, image_path FROM products "
+        "WHERE image_key IS NULL AND image_path IS NOT NULL AND image_path != ''"
+    )).all()
+    if rows:
+        bind.execute(
+            sa.text("UPDATE products SET image_key = :key WHERE id = :id"),
+            [{"id": product_id, "key": _image_key(image_path)} for product_id, image_path in rows],
+        )
+
+
+def downgrade() -> None:
+    if INDEX in _existing_indexes():
+        op.drop_index(INDEX, table_name="products")
+    if "image_key" in _existing_columns():
+        with op.batch_alter_table("products") as batch_op:
+            batch_op.drop_column("image_key")
@@ -0,0 +1,49 @@
+"""Удаление индексов ленты изменений продуктов
+
+Лента изменений читает журнал menu_events, запросы к products по
+(modified_at, id) больше не выполняются, а индексы удорожали каждую запись.
+Внешний ключ restaurant_id снова покрывается простым индексом
+ix_products_restaurant_id (его заменял индекс ленты из 0003).
+
+Revision ID: 0011
+Revises: 0010
+Create Date: 2026-10-18
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "0011"
+down_revision: Union[str, None] = "0010"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+FEED_INDEXES = (
+    ("ix_products_restaurant_id_modified_at_id", ["restaurant_id", "modified_at", "id"]),
+    ("ix_products_modified_at_id", ["modified_at", "id"]),
+)
+
+
+def _existing_indexes() -> set:
+    inspector = sa.inspect(op.get_bind())
+    return {index["name"] for index in inspector.get_indexes("products")}
+
+
+def upgrade() -> None:
+    existing = _existing_indexes()
+    if "ix_products_restaurant_id" not in existing:
+        op.create_index("ix_products_restaurant_id", "products", ["restaurant_id"])
+    for name, _ in FEED_INDEXES:
+        if name in existing:
+            op.drop_index(name, table_name="products")
+
+
+def downgrade() -> None:
+    existing = _existing_indexes()
+    for name, columns in FEED_INDEXES:
+        if name not in existing:
+            op.create_index(name, "products", columns)
+    if "ix_products_restaurant_id" in existing:
+        op.drop_index("ix_products_restaurant_id", table_name="products")
@@ -0,0 +1,160 @@
+"""
+Общие фикстуры тестов.
+
+Конфигурация читается из окружения при импорте app.config, поэтому
+переменные задаются до импорта приложения: база SQLite и кэш шаблонов - во
+временном каталоге, фоновые задачи отключены.
+"""
+import os
+import sys
+import tempfile
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Iterator, List, Optional
+
+import pytest
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+os.chdir(ROOT_DIR)  # пути шаблонов и статики в конфигурации относительные
+
+_TMP_DIR = tempfile.mkdtemp(prefix="tastyskills-tests-")
+os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(_TMP_DIR, "test.db")
+os.environ.pop("ASYNC_DATABASE_URL", None)
+os.environ.setdefault("ADMIN_ID", "1")
+os.environ["TEMPLATE_BYTECODE_CACHE_DIR"] = os.path.join(_TMP_DIR, "jinja")
+os.environ["SOFT_DELETE_RETENTION_DAYS"] = "0"
+os.environ["UPLOAD_GC_INTERVAL_SECONDS"] = "0"
+# Сверка общего счетчика сбросов кэшей - вручную в тестах, иначе число запросов плавает
+os.environ["ACCESS_CACHE_SYNC_SECONDS"] = "3600"
+
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy import event  # noqa: E402
+
+from app.presentation.api.main import app  # noqa: E402
+from app.presentation.api.auth import create_access_token  # noqa: E402
+from app.infrastructure.database.database import SessionLocal, engine, async_engine  # noqa: E402
+from app.infrastructure.repositories import crud  # noqa: E402
+from app.domain.entities.models import User  # noqa: E402
+from app.domain.entities.schemas import (  # noqa: E402
+    RestaurantCreate, SectionCreate, CategoryCreate, ProductCreate,
+)
+
+
+@dataclass
+class MenuIds:
+    restaurant_id: int
+    section_id: int
+    category_id: int
+    product_id: int
+
+    def url(self, page: str) -> str:
+        return page.format(r=self.restaurant_id, s=self.section_id, c=self.category_id, p=self.product_id)
+
+
+def create_user(db: Any, username: str, role: str) -> User:
+    # Вход в тестах - по токену в cookie, пароль не проверяется
+    user = User(username=username, hashed_password="-", role=role)
+    db.add(user)
+    db.commit()
+    db.refresh(user)
+    return user
+
+
+def create_menu(db: Any, name: str, manager_id: Optional[int] = None, products: int = 3) -> MenuIds:
+    restaurant = crud.create_restaurant(db, RestaurantCreate(name=name, manager_id=manager_id))
+    section = crud.create_section(db, SectionCreate(name=f"{name}: раздел", restaurant_id=restaurant.id))
+    category = crud.create_category(
+        db, CategoryCreate(title=f"{name}: категория", section_id=section.id, restaurant_id=restaurant.id)
+    )
+    product_ids = add_products(db, category.id, restaurant.id, products)
+    return MenuIds(restaurant.id, section.id, category.id, product_ids[0])
+
+
+def add_products(db: Any, category_id: int, restaurant_id: int, count: int) -> List[int]:
+    return [
+        crud.create_product(db, ProductCreate(
+            title=f"Блюдо {i}", ingredients="-", category_id=category_id, restaurant_id=restaurant_id
+        )).id
+        for i in range(count)
+    ]
+
+
+def add_categories(db: Any, menu: MenuIds, count: int, products: int) -> None:
+    """Новые категории с продуктами в разделе menu - меню становится больше"""
+    for i in range(count):
+        category = crud.create_category(
+            db, CategoryCreate(title=f"Категория {i}", section_id=menu.section_id, restaurant_id=menu.restaurant_id)
+        )
+        add_products(db, category.id, menu.restaurant_id, products)
+
+
+@pytest.fixture
+def db() -> Iterator[Any]:
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture(scope="session", autouse=True)
+def menus() -> dict:
+    """Демо-ресторан (первый, без менеджера) и ресторан менеджера.
+
+    Создаются до первого запроса: id демо-ресторана кэшируется приложением.
+    """
+    session = SessionLocal()
+    try:
+        demo = create_menu(session, "Демо")
+        manager = create_user(session, "manager", "manager")
+        return {
+            "demo": demo,
+            "manager": create_menu(session, "Ресторан менеджера", manager_id=manager.id),
+            "manager_username": manager.username,
+        }
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def client() -> Iterator[TestClient]:
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+def login(client: TestClient, username: str) -> None:
+    client.cookies.set("access_token", create_access_token({"sub": username}))
+
+
+class QueryCounter:
+    def __init__(self) -> None:
+        self.statements: List[str] = []
+        self.parameters: List[Any] = []
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    def _on_execute(self, conn: Any, cursor: Any, statement: str, parameters: Any, *args: Any) -> None:
+        self.statements.append(statement)
+        self.parameters.append(parameters)
+
+
+@pytest.fixture
+def count_queries() -> Any:
+    """Контекстный менеджер: SQL-запросы обоих движков (синхронного и асинхронного)"""
+    engines = (engine, async_engine.sync_engine)
+
+    @contextmanager
+    def counting() -> Iterator[QueryCounter]:
+        counter = QueryCounter()
+        for db_engine in engines:
+            event.listen(db_engine, "before_cursor_execute", counter._on_execute)
+        try:
+            yield counter
+        finally:
+            for db_engine in engines:
+                event.remove(db_engine, "before_cursor_execute", counter._on_execute)
+
+    return counting
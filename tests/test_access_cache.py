@@ -0,0 +1,46 @@
+"""Сброс кэшей доступа, выполненный другим процессом, доходит до веб-процесса"""
+from app.domain.entities.models import Restaurant
+from app.infrastructure.cache.invalidation import shared_invalidation
+from app.infrastructure.repositories import crud
+
+from conftest import login
+
+
+def _set_manager(db, restaurant_id, manager_id):
+    # Изменение "из бота": запись в БД и общий счетчик, без сброса кэшей этого процесса
+    db.query(Restaurant).filter(Restaurant.id == restaurant_id).update({Restaurant.manager_id: manager_id})
+    crud.bump_cache_version(db)
+    db.commit()
+
+
+def test_access_revoked_in_other_process(client, db, menus, monkeypatch):
+    menu = menus["manager"]
+    manager_id = db.query(Restaurant.manager_id).filter(Restaurant.id == menu.restaurant_id).scalar()
+    url = menu.url("/restaurants/{r}")
+    login(client, menus["manager_username"])
+    monkeypatch.setattr(shared_invalidation, "interval", 0)
+    assert client.get(url).status_code == 200
+
+    try:
+        _set_manager(db, menu.restaurant_id, None)
+        assert client.get(url).status_code == 403
+    finally:
+        _set_manager(db, menu.restaurant_id, manager_id)
+    assert client.get(url).status_code == 200
+
+
+def test_cached_decision_is_kept_between_syncs(client, db, menus, monkeypatch):
+    menu = menus["manager"]
+    manager_id = db.query(Restaurant.manager_id).filter(Restaurant.id == menu.restaurant_id).scalar()
+    url = menu.url("/restaurants/{r}")
+    login(client, menus["manager_username"])
+    monkeypatch.setattr(shared_invalidation, "interval", 0)
+    assert client.get(url).status_code == 200
+
+    # До следующей сверки счетчика решение берется из кэша
+    monkeypatch.setattr(shared_invalidation, "interval", 3600)
+    try:
+        _set_manager(db, menu.restaurant_id, None)
+        assert client.get(url).status_code == 200
+    finally:
+        _set_manager(db, menu.restaurant_id, manager_id)
@@ -0,0 +1,48 @@
+"""Списки API: массив по умолчанию, страница {items, next_cursor} по параметру cursor"""
+import pytest
+
+from app.presentation.api.auth import create_access_token
+
+LIST_ENDPOINTS = [
+    "/api/v1/restaurants/",
+    "/api/v1/sections/",
+    "/api/v1/categories/",
+    "/api/v1/products/",
+]
+
+
+@pytest.fixture
+def headers(menus):
+    return {"Authorization": "Bearer " + create_access_token({"sub": menus["manager_username"]})}
+
+
+@pytest.mark.parametrize("url", LIST_ENDPOINTS)
+def test_list_is_plain_array_by_default(client, headers, url):
+    response = client.get(url, headers=headers)
+
+    assert response.status_code == 200
+    assert isinstance(response.json(), list)
+
+
+@pytest.mark.parametrize("url", LIST_ENDPOINTS)
+def test_cursor_walk_matches_plain_list(client, headers, url):
+    expected = [item["id"] for item in client.get(url, headers=headers).json()]
+
+    seen = []
+    cursor = ""
+    while cursor is not None:
+        response = client.get(url, params={"cursor": cursor, "limit": 2}, headers=headers)
+        assert response.status_code == 200
+        page = response.json()
+        seen.extend(item["id"] for item in page["items"])
+        cursor = page["next_cursor"]
+
+    # Список без курсора ограничен limit (по умолчанию 100), обход по курсору - нет
+    assert seen[:len(expected)] == expected
+    assert len(seen) == len(set(seen))
+
+
+def test_invalid_cursor_is_rejected(client, headers):
+    response = client.get("/api/v1/products/", params={"cursor": "not-a-cursor"}, headers=headers)
+
+    assert response.status_code == 400
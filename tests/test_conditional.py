@@ -0,0 +1,115 @@
+"""Условные GET API меню: If-Modified-Since не дает устаревший 304"""
+import os
+import shutil
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+import pytest
+
+from app.domain.entities.models import MenuEvent
+from app.domain.entities.schemas import ProductCreate
+from app.infrastructure.cache.page_cache import page_cache
+from app.infrastructure.repositories import crud
+from app.presentation.api.auth import create_access_token
+from app.presentation.api.conditional import _build_token, settled_last_modified
+
+from conftest import add_products
+
+URL = "/api/v1/products/"
+
+
+@pytest.fixture
+def headers(menus):
+    return {"Authorization": "Bearer " + create_access_token({"sub": menus["manager_username"]})}
+
+
+def _set_latest_event_time(db, seconds_ago):
+    event = db.query(MenuEvent).order_by(MenuEvent.id.desc()).first()
+    event.created_at = datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(seconds=seconds_ago)
+    db.commit()
+    return event.created_at.replace(tzinfo=timezone.utc)
+
+
+def test_build_token_depends_on_content_only(tmp_path):
+    hosts = [tmp_path / "host-a", tmp_path / "host-b"]
+    for host, mtime in zip(hosts, (1_000_000, 2_000_000)):
+        shutil.copytree("templates", host / "templates")
+        for root, _, files in os.walk(host):
+            for name in files:
+                os.utime(os.path.join(root, name), (mtime, mtime))
+    # Сжатая копия есть только на одном хосте
+    (hosts[0] / "templates" / "base.html.gz").write_bytes(b"gz")
+
+    tokens = [_build_token("", str(host / "templates")) for host in hosts]
+    assert tokens[0] == tokens[1]
+
+    (hosts[1] / "templates" / "base.html").write_text("changed")
+    assert _build_token("", str(hosts[1] / "templates")) != tokens[0]
+    assert _build_token("release-1", str(hosts[1] / "templates")) == _build_token("release-1")
+
+
+def test_settled_last_modified():
+    changed = datetime(2026, 10, 18, 12, 0, 0, 400000, tzinfo=timezone.utc)
+
+    assert settled_last_modified(changed, now=changed + timedelta(milliseconds=500)) is None
+    assert settled_last_modified(changed, now=changed + timedelta(milliseconds=600)) == changed
+    assert settled_last_modified(None) is None
+
+
+def test_no_last_modified_within_second_of_change(client, db, menus, headers):
+    menu = menus["manager"]
+    add_products(db, menu.category_id, menu.restaurant_id, 1)
+    # Правка "чуть позже текущего момента": ее секунда гарантированно не закончилась к запросу
+    changed_at = _set_latest_event_time(db, seconds_ago=-0.5)
+    since = format_datetime(changed_at.replace(microsecond=0), usegmt=True)
+
+    response = client.get(URL, headers=headers)
+    assert response.status_code == 200
+    assert "last-modified" not in response.headers
+    assert response.headers["etag"]
+
+    # Клиент с датой той же секунды получает полный ответ: правка могла быть после его копии
+    response = client.get(URL, headers={**headers, "If-Modified-Since": since})
+    assert response.status_code == 200
+
+
+def test_if_modified_since_after_second_has_passed(client, db, menus, headers):
+    menu = menus["manager"]
+    add_products(db, menu.category_id, menu.restaurant_id, 1)
+    _set_latest_event_time(db, seconds_ago=5)
+
+    response = client.get(URL, headers=headers)
+    last_modified = response.headers["last-modified"]
+    assert client.get(URL, headers={**headers, "If-Modified-Since": last_modified}).status_code == 304
+
+    # Следующая правка попадает в более позднюю секунду, чем отданный Last-Modified
+    add_products(db, menu.category_id, menu.restaurant_id, 1)
+    assert client.get(URL, headers={**headers, "If-Modified-Since": last_modified}).status_code == 200
+
+
+def test_page_etag_changes_after_image_processing(client, db, menus, monkeypatch):
+    # Без stale-while-revalidate: следующий запрос сразу получает перерисованную страницу
+    monkeypatch.setattr(page_cache, "stale_seconds", 0)
+    menu = menus["demo"]
+    product = crud.create_product(db, ProductCreate(
+        title="С фото", ingredients="-", category_id=menu.category_id,
+        restaurant_id=menu.restaurant_id, image_path="images/processed.jpg",
+    ))
+    url = menu.url("/restaurants/{r}/sections/{s}/categories/{c}")
+    etag = client.get(url).headers["etag"]
+
+    # Копии и размеры сохраняются фоновой обработкой, а не правкой меню
+    crud.set_product_image_variants(db, product.id, "images/processed.jpg", [
+        {"name": "images/processed_480w.webp", "width": 480, "height": 320, "format": "webp"},
+    ])
+    response = client.get(url, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert "images/processed_480w.webp 480w" in response.text
+    etag = response.headers["etag"]
+
+    crud.set_product_image_metadata(db, product.id, "images/processed.jpg", {
+        "width": 960, "height": 640, "placeholder": None,
+    })
+    response = client.get(url, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert 'width="960" height="640"' in response.text
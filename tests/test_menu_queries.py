@@ -0,0 +1,72 @@
+"""Число SQL-запросов страниц меню не зависит от размера меню (get_menu_tree)"""
+import pytest
+
+from conftest import add_categories, login
+
+MENU_PAGES = [
+    "/restaurants/{r}",
+    "/restaurants/{r}/sections/{s}",
+    "/restaurants/{r}/sections/{s}/categories/{c}",
+    "/restaurants/{r}/sections/{s}/categories/{c}/products/{p}",
+]
+
+# Пользователь, доступ, версия меню и загрузка страницы
+MAX_PAGE_QUERIES = 8
+
+
+@pytest.mark.parametrize("page", MENU_PAGES)
+def test_menu_page_query_count_is_constant(client, db, menus, count_queries, page):
+    menu = menus["manager"]
+    url = menu.url(page)
+    login(client, menus["manager_username"])
+    assert client.get(url).status_code == 200  # прогрев кэшей пользователя и доступа
+
+    with count_queries() as small_menu:
+        assert client.get(url).status_code == 200
+    add_categories(db, menu, count=10, products=5)
+    with count_queries() as large_menu:
+        assert client.get(url).status_code == 200
+
+    assert large_menu.count == small_menu.count, large_menu.statements
+    assert small_menu.count <= MAX_PAGE_QUERIES, small_menu.statements
+
+
+def test_demo_page_query_count_is_constant(client, db, menus, count_queries):
+    # С cookie сессии запрос проходит мимо кэша страниц
+    login(client, menus["manager_username"])
+    assert client.get("/demo").status_code == 200
+
+    with count_queries() as small_menu:
+        assert client.get("/demo").status_code == 200
+    add_categories(db, menus["demo"], count=10, products=5)
+    with count_queries() as large_menu:
+        assert client.get("/demo").status_code == 200
+
+    assert large_menu.count == small_menu.count, large_menu.statements
+    assert small_menu.count <= MAX_PAGE_QUERIES, small_menu.statements
+
+
+def test_product_page_does_not_load_menu_tree(client, menus, count_queries):
+    # Странице продукта достаточно самого продукта со связями, без агрегата по меню
+    url = menus["manager"].url(MENU_PAGES[-1])
+    login(client, menus["manager_username"])
+    client.get(url)
+
+    with count_queries() as queries:
+        assert client.get(url).status_code == 200
+
+    assert not any("GROUP BY" in statement for statement in queries.statements), queries.statements
+
+
+def test_product_page_links_category_neighbours(client, menus):
+    menu = menus["manager"]
+    login(client, menus["manager_username"])
+    product_url = menu.url("/restaurants/{r}/sections/{s}/categories/{c}/products/")
+
+    first = client.get(product_url + str(menu.product_id)).text
+    second = client.get(product_url + str(menu.product_id + 1)).text
+
+    # Первое блюдо категории - только ссылка вперед, следующее - в обе стороны
+    assert 'rel="prev"' not in first
+    assert f'href="{product_url}{menu.product_id + 1}" class="btn-back" rel="next"' in first
+    assert f'href="{product_url}{menu.product_id}" class="btn-back" rel="prev"' in second
@@ -0,0 +1,162 @@
+"""Кэш страниц: версии, stale-while-revalidate, single-flight, вытеснение и ключ middleware"""
+import asyncio
+
+import pytest
+
+from app.infrastructure.cache.page_cache import HIT, MISS, STALE, CachedPage, PageCache, page_cache
+
+from conftest import add_products
+
+
+class Renderer:
+    """Отрисовка с подсчетом вызовов; gate задерживает завершение"""
+
+    def __init__(self, body: bytes = b"page", status: int = 200):
+        self.body = body
+        self.status = status
+        self.calls = 0
+        self.gate = None
+
+    async def __call__(self) -> CachedPage:
+        self.calls += 1
+        if self.gate is not None:
+            await self.gate.wait()
+        return CachedPage(self.status, [(b"etag", f'"{self.calls}"'.encode())], self.body + str(self.calls).encode())
+
+
+def _cache(**options):
+    return PageCache(**{"max_entries": 10, "max_bytes": 1024, "stale_seconds": 60, **options})
+
+
+def test_version_hit_and_invalidation():
+    async def scenario():
+        cache, render = _cache(stale_seconds=0), Renderer()
+        first = await cache.get("/demo", 1, render)
+        hit = await cache.get("/demo", 1, render)
+        # Новая версия без окна устаревания - сразу перерисовка
+        fresh = await cache.get("/demo", 2, render)
+        return first, hit, fresh, render.calls
+
+    first, hit, fresh, calls = asyncio.run(scenario())
+    assert first[1] == MISS and hit == (first[0], HIT)
+    assert fresh[1] == MISS and fresh[0].body == b"page2"
+    assert calls == 2
+
+
+def test_stale_while_revalidate():
+    async def scenario():
+        cache, render = _cache(), Renderer()
+        await cache.get("/demo", 1, render)
+        render.gate = asyncio.Event()
+        stale = await cache.get("/demo", 2, render)
+        # Пока идет перерисовка, повторные запросы тоже получают старую копию
+        stale_again = await cache.get("/demo", 2, render)
+        render.gate.set()
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)
+        return stale, stale_again, await cache.get("/demo", 2, render), render.calls
+
+    stale, stale_again, fresh, calls = asyncio.run(scenario())
+    assert stale[1] == STALE and stale[0].body == b"page1"
+    assert stale_again[1] == STALE
+    assert fresh[1] == HIT and fresh[0].body == b"page2"
+    assert calls == 2
+
+
+def test_stale_copy_expires_after_window(monkeypatch):
+    async def scenario():
+        cache, render = _cache(stale_seconds=5), Renderer()
+        await cache.get("/demo", 1, render)
+        clock = [100.0]
+        monkeypatch.setattr("app.infrastructure.cache.page_cache.time.monotonic", lambda: clock[0])
+        render.gate = asyncio.Event()
+        stale = await cache.get("/demo", 2, render)
+        clock[0] += 10
+        render.gate.set()
+        # Фоновая перерисовка той же версии уже идет - ожидание ее, а не новая
+        return stale, await cache.get("/demo", 2, render), render.calls
+
+    stale, late, calls = asyncio.run(scenario())
+    assert stale[1] == STALE
+    assert late[1] == MISS and late[0].body == b"page2"
+    assert calls == 2
+
+
+def test_single_flight():
+    async def scenario():
+        cache, render = _cache(), Renderer()
+        render.gate = asyncio.Event()
+        waiters = [asyncio.ensure_future(cache.get("/demo", 1, render)) for _ in range(5)]
+        await asyncio.sleep(0)
+        render.gate.set()
+        return await asyncio.gather(*waiters), render.calls, cache.stats()
+
+    results, calls, stats = asyncio.run(scenario())
+    assert calls == 1
+    assert {page.body for page, _ in results} == {b"page1"}
+    assert stats["misses"] == 5 and stats["in_flight"] == 0
+
+
+def test_cancelled_initiator_does_not_cancel_render():
+    async def scenario():
+        cache, render = _cache(), Renderer()
+        render.gate = asyncio.Event()
+        initiator = asyncio.ensure_future(cache.get("/demo", 1, render))
+        follower = asyncio.ensure_future(cache.get("/demo", 1, render))
+        await asyncio.sleep(0)
+        initiator.cancel()
+        render.gate.set()
+        return await follower, render.calls
+
+    (page, source), calls = asyncio.run(scenario())
+    assert source == MISS and page.body == b"page1"
+    assert calls == 1
+
+
+def test_lru_eviction_by_entries_and_bytes():
+    async def scenario():
+        cache = _cache(max_entries=2, max_bytes=12)
+        render = Renderer(b"12345")  # 6 байт с номером отрисовки
+        await cache.get("/a", 1, render)
+        await cache.get("/b", 1, render)
+        await cache.get("/a", 1, render)  # /a - недавно использованная
+        await cache.get("/c", 1, render)
+        by_entries = [(await cache.get(key, 1, Renderer()))[1] for key in ("/a", "/c")]
+        # Страница больше лимита по размеру не сохраняется
+        await cache.get("/big", 1, Renderer(b"x" * 20))
+        return by_entries, cache.stats(), (await cache.get("/b", 1, render))[1]
+
+    by_entries, stats, evicted = asyncio.run(scenario())
+    assert by_entries == [HIT, HIT]
+    assert evicted == MISS
+    assert stats["entries"] == 2 and stats["bytes"] <= 12
+
+
+def test_error_page_drops_stale_copy():
+    async def scenario():
+        cache = _cache(stale_seconds=0)
+        await cache.get("/demo", 1, Renderer())
+        page, _ = await cache.get("/demo", 2, Renderer(status=404))
+        return page.status, cache.stats()["entries"]
+
+    assert asyncio.run(scenario()) == (404, 0)
+
+
+@pytest.fixture
+def clean_page_cache(monkeypatch):
+    page_cache.clear()
+    monkeypatch.setattr(page_cache, "stale_seconds", 0)
+    yield page_cache
+    page_cache.clear()
+
+
+def test_query_string_does_not_split_cache(client, db, menus, clean_page_cache):
+    menu = menus["demo"]
+    # Новое событие меню: версия, которой еще нет в кэше
+    add_products(db, menu.category_id, menu.restaurant_id, 1)
+    url = menu.url("/restaurants/{r}/sections/{s}")
+
+    assert client.get(url).headers["x-cache"] == MISS
+    for i in range(3):
+        assert client.get(f"{url}?x={i}").headers["x-cache"] == HIT
+    assert clean_page_cache.stats()["entries"] == 1
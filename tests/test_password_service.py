@@ -0,0 +1,56 @@
+"""Учет очереди пула bcrypt и смена пароля"""
+import asyncio
+import threading
+
+from app.application.services.password_service import PasswordService
+from app.application.services.user_service import UserService
+from app.infrastructure.repositories import crud
+
+from conftest import create_user
+
+
+def test_cancelled_waiter_leaves_queue():
+    service = PasswordService(max_workers=1)
+    release = threading.Event()
+
+    async def scenario():
+        loop = asyncio.get_running_loop()
+        # Единственный воркер занят, следующее задание остается в очереди
+        busy = asyncio.ensure_future(service._submit(release.wait))
+        queued = asyncio.ensure_future(service._submit(lambda: "hash"))
+        await asyncio.sleep(0.05)
+        assert service.stats()["queue_depth"] == 1
+
+        queued.cancel()
+        await asyncio.gather(queued, return_exceptions=True)
+        await loop.run_in_executor(None, release.set)
+        await busy
+
+    asyncio.run(scenario())
+
+    stats = service.stats()
+    assert stats["queue_depth"] == 0
+    assert stats["running"] == 0
+    assert stats["completed"] == 1
+
+
+def test_hash_and_verify():
+    service = PasswordService(max_workers=1)
+
+    async def scenario():
+        hashed = await service.hash("secret")
+        return await service.verify("secret", hashed), await service.verify("other", hashed)
+
+    assert asyncio.run(scenario()) == (True, False)
+    assert service.stats()["queue_depth"] == 0
+
+
+def test_change_password_signals_other_processes(db):
+    user = create_user(db, "password-owner", "waiter")
+    version = crud.get_cache_version(db)
+
+    asyncio.run(UserService.change_password(db, user, "new-secret"))
+
+    # Снимок пользователя в кэше других процессов сбрасывается по общему счетчику
+    assert crud.get_cache_version(db) == version + 1
+    assert asyncio.run(UserService.authenticate_user(db, "password-owner", "new-secret")) is not None
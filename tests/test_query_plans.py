@@ -0,0 +1,65 @@
+"""Запросы к products из crud используют индексы, а не полный просмотр таблицы.
+
+Частичные индексы (WHERE is_deleted = 0) применимы, только если условие фильтра
+soft_delete совпадает с условием индекса буквально, поэтому план проверяется по
+тем SQL-строкам и параметрам, которые ORM отправляет в SQLite.
+"""
+from typing import Any, Callable, List
+
+import pytest
+
+from app.infrastructure.database.database import engine
+from app.infrastructure.repositories import crud
+
+
+def _query_plans(count_queries: Any, call: Callable[[], Any]) -> List[str]:
+    with count_queries() as counter:
+        call()
+    plans = []
+    with engine.connect() as conn:
+        for statement, parameters in zip(counter.statements, counter.parameters):
+            rows = conn.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters).all()
+            plans.append("\n".join(row[-1] for row in rows))
+    return plans
+
+
+PRODUCT_QUERIES = {
+    "get_product": lambda db, menu: crud.get_product(db, menu.product_id),
+    "get_product_with_relations": lambda db, menu: crud.get_product_with_relations(db, menu.product_id),
+    "get_products_by_category": lambda db, menu: crud.get_products_by_category(db, menu.category_id),
+    "get_products_by_restaurant": lambda db, menu: crud.get_products_by_restaurant(db, menu.restaurant_id),
+    "get_product_neighbors": lambda db, menu: crud.get_product_neighbors(db, menu.category_id, menu.product_id),
+    "get_products_page": lambda db, menu: crud.get_products_page(
+        db, cursor=crud.encode_cursor([menu.product_id]), limit=10
+    ),
+    "get_menu_tree": lambda db, menu: crud.get_menu_tree(db, menu.restaurant_id),
+}
+
+
+@pytest.mark.parametrize("name", PRODUCT_QUERIES)
+def test_product_queries_do_not_scan_products(db, menus, count_queries, name):
+    menu = menus["demo"]
+
+    plans = _query_plans(count_queries, lambda: PRODUCT_QUERIES[name](db, menu))
+
+    product_plans = [plan for plan in plans if "products" in plan]
+    assert product_plans
+    for plan in product_plans:
+        assert "SCAN products" not in plan, plan
+
+
+def test_live_rows_index_matches_soft_delete_filter(db, menus, count_queries):
+    menu = menus["demo"]
+    with count_queries() as counter:
+        crud.get_products_by_category(db, menu.category_id)
+    [statement] = counter.statements
+    [parameters] = counter.parameters
+
+    # Без статистики планировщик волен выбрать и ix_products_category_id; INDEXED BY
+    # заставляет взять частичный индекс, а если условие фильтра не совпадает
+    # с условием индекса, SQLite отвечает ошибкой "no query solution"
+    forced = statement.replace("FROM products", "FROM products INDEXED BY ix_products_live_category_id_id", 1)
+    with engine.connect() as conn:
+        rows = conn.exec_driver_sql("EXPLAIN QUERY PLAN " + forced, parameters).all()
+
+    assert "ix_products_live_category_id_id" in rows[0][-1]
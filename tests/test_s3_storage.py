@@ -0,0 +1,147 @@
+"""Драйвер S3 на эмуляции moto и перенаправление /uploads на подписанную ссылку"""
+from urllib.parse import urlsplit
+
+import pytest
+from fastapi.testclient import TestClient
+from starlette.applications import Starlette
+from starlette.routing import Mount
+
+pytest.importorskip("boto3")
+moto = pytest.importorskip("moto")
+import requests  # noqa: E402  зависимость moto
+
+from app.domain.entities.schemas import ProductCreate  # noqa: E402
+from app.infrastructure.repositories import crud  # noqa: E402
+from app.infrastructure.storage.s3 import OBJECT_CACHE_CONTROL, S3Storage  # noqa: E402
+from app.presentation.web.uploads import UploadFiles  # noqa: E402
+
+BUCKET = "media-bucket"
+PREFIX = "media/"
+
+
+@pytest.fixture
+def storage():
+    with moto.mock_aws():
+        s3_storage = S3Storage(
+            BUCKET, "/uploads", prefix=PREFIX, region="us-east-1",
+            access_key_id="test", secret_access_key="test",
+        )
+        s3_storage.client.create_bucket(Bucket=BUCKET)
+        yield s3_storage
+
+
+def _put(storage, tmp_path, path, content=b"image"):
+    source = tmp_path / "upload.tmp"
+    source.write_bytes(content)
+    storage.put_file(str(source), path)
+    return source
+
+
+def _keys(storage, prefix=""):
+    response = storage.client.list_objects_v2(Bucket=BUCKET, Prefix=prefix)
+    return sorted(item["Key"] for item in response.get("Contents", []))
+
+
+def test_put_file_uploads_under_prefix(storage, tmp_path):
+    source = _put(storage, tmp_path, "images/dish.jpg")
+
+    assert not source.exists()
+    head = storage.client.head_object(Bucket=BUCKET, Key=PREFIX + "images/dish.jpg")
+    assert head["ContentType"] == "image/jpeg"
+    assert head["CacheControl"] == OBJECT_CACHE_CONTROL
+    assert storage.exists("images/dish.jpg")
+    assert not storage.exists("images/missing.jpg")
+
+
+def test_download(storage, tmp_path):
+    _put(storage, tmp_path, "images/dish.jpg", b"content")
+    destination = tmp_path / "copy.jpg"
+
+    storage.download("images/dish.jpg", str(destination))
+
+    assert destination.read_bytes() == b"content"
+
+
+def test_touch_keeps_object_and_headers(storage, tmp_path):
+    _put(storage, tmp_path, "images/dish.webp", b"content")
+
+    assert storage.touch("images/dish.webp")
+    assert not storage.touch("images/missing.webp")
+
+    obj = storage.client.get_object(Bucket=BUCKET, Key=PREFIX + "images/dish.webp")
+    assert obj["Body"].read() == b"content"
+    assert obj["ContentType"] == "image/webp"
+    assert obj["CacheControl"] == OBJECT_CACHE_CONTROL
+
+
+def test_delete(storage, tmp_path):
+    _put(storage, tmp_path, "images/dish.jpg")
+
+    assert storage.delete("images/dish.jpg")
+    assert not storage.exists("images/dish.jpg")
+    # Удаление отсутствующего объекта в S3 не ошибка
+    assert storage.delete("images/dish.jpg")
+
+
+def test_iter_objects_strips_prefix(storage, tmp_path):
+    _put(storage, tmp_path, "images/a.jpg", b"a")
+    _put(storage, tmp_path, "images/b_480w.webp", b"bb")
+    storage.client.put_object(Bucket=BUCKET, Key="other/c.jpg", Body=b"c")
+
+    objects = sorted(storage.iter_objects(), key=lambda obj: obj.path)
+
+    assert [(obj.path, obj.size) for obj in objects] == [("images/a.jpg", 1), ("images/b_480w.webp", 2)]
+    assert all(obj.mtime > 0 for obj in objects)
+
+
+def test_iter_objects_pages(storage, tmp_path):
+    for i in range(1005):
+        storage.client.put_object(Bucket=BUCKET, Key=f"{PREFIX}images/{i:04d}.jpg", Body=b"")
+
+    # list_objects_v2 отдает до 1000 ключей за запрос
+    assert len(list(storage.iter_objects())) == 1005
+
+
+def test_quarantine_moves_object_out_of_prefix(storage, tmp_path):
+    _put(storage, tmp_path, "images/orphan.jpg", b"orphan")
+
+    storage.quarantine("images/orphan.jpg", "/quarantine/")
+
+    assert not storage.exists("images/orphan.jpg")
+    assert _keys(storage) == ["quarantine/images/orphan.jpg"]
+    assert list(storage.iter_objects()) == []
+
+
+def test_uploads_redirects_to_presigned_url(storage, tmp_path):
+    _put(storage, tmp_path, "images/dish.jpg", b"content")
+    app = Starlette(routes=[Mount("/uploads", app=UploadFiles(
+        storage=storage, access_control=False, presigned_url_expires=600,
+    ))])
+
+    with TestClient(app) as client:
+        response = client.get("/uploads/images/dish.jpg", follow_redirects=False)
+        assert client.post("/uploads/images/dish.jpg").status_code == 405
+
+    assert response.status_code == 307
+    assert response.headers["cache-control"] == "private, max-age=300"
+    location = response.headers["location"]
+    assert urlsplit(location).path.endswith(f"/{PREFIX}images/dish.jpg")
+    # Ссылка подписана и отдает объект без учетных данных (moto перехватывает и requests)
+    assert requests.get(location).content == b"content"
+    assert requests.get(location.split("?")[0]).status_code == 403
+
+
+def test_uploads_checks_access_before_redirect(storage, tmp_path, db, menus):
+    menu = menus["manager"]
+    _put(storage, tmp_path, "images/s3-private.jpg")
+    crud.create_product(db, ProductCreate(
+        title="С фото", ingredients="-", category_id=menu.category_id,
+        restaurant_id=menu.restaurant_id, image_path="images/s3-private.jpg",
+    ))
+    app = Starlette(routes=[Mount("/uploads", app=UploadFiles(storage=storage, access_control=True))])
+
+    with TestClient(app) as client:
+        response = client.get("/uploads/images/s3-private.jpg", follow_redirects=False)
+
+    assert response.status_code == 403
+    assert "location" not in response.headers
@@ -0,0 +1,31 @@
+"""Мягкое удаление: фильтр is_deleted = false не теряет живые продукты"""
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import IntegrityError
+
+from app.infrastructure.repositories import crud
+
+
+def test_product_inserted_without_is_deleted_is_visible(db, menus):
+    menu = menus["demo"]
+    # Вставка в обход ORM (старые скрипты, ручной импорт): значение дает сервер
+    product_id = db.execute(
+        text("INSERT INTO products (title, ingredients, category_id, restaurant_id) VALUES ('Без флага', '-', :c, :r)"),
+        {"c": menu.category_id, "r": menu.restaurant_id},
+    ).lastrowid
+    db.commit()
+
+    assert product_id in [p.id for p in crud.get_products_by_category(db, menu.category_id)]
+    crud.delete_product(db, product_id)
+    assert product_id not in [p.id for p in crud.get_products_by_category(db, menu.category_id)]
+
+
+def test_is_deleted_cannot_be_null(db, menus):
+    menu = menus["demo"]
+
+    with pytest.raises(IntegrityError):
+        db.execute(
+            text("INSERT INTO products (title, ingredients, category_id, restaurant_id, is_deleted) VALUES ('x', '-', :c, :r, NULL)"),
+            {"c": menu.category_id, "r": menu.restaurant_id},
+        )
+    db.rollback()
@@ -0,0 +1,28 @@
+"""Сообщения приложения при старте видны в логах uvicorn"""
+import logging
+
+from app.presentation.web.templating import precompile_templates
+
+
+class _Records(logging.Handler):
+    def __init__(self) -> None:
+        super().__init__()
+        self.messages: list = []
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self.messages.append(record.getMessage())
+
+
+def test_template_warmup_is_logged():
+    app_logger = logging.getLogger("app")
+    # Обработчик настраивает main при импорте приложения (conftest импортирует app)
+    assert app_logger.handlers and app_logger.isEnabledFor(logging.INFO)
+
+    records = _Records()
+    app_logger.addHandler(records)
+    try:
+        count = precompile_templates()
+    finally:
+        app_logger.removeHandler(records)
+
+    assert any(message.startswith(f"Скомпилировано шаблонов: {count} ") for message in records.messages)
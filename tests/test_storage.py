@@ -0,0 +1,33 @@
+"""Контракт драйверов хранилища"""
+import pytest
+
+from app.infrastructure.storage.base import Storage
+from app.infrastructure.storage.local import LocalStorage
+
+
+def test_incomplete_backend_fails_on_creation():
+    class PartialStorage(Storage):
+        def exists(self, path: str) -> bool:
+            return False
+
+    with pytest.raises(TypeError, match="abstract"):
+        PartialStorage("/uploads/")
+
+
+def test_local_storage_implements_contract(tmp_path):
+    storage = LocalStorage(str(tmp_path / "uploads"), "/uploads/")
+    source = tmp_path / "upload.tmp"
+    source.write_bytes(b"image")
+
+    storage.put_file(str(source), "images/dish.jpg")
+
+    assert not source.exists()
+    assert storage.exists("images/dish.jpg")
+    assert storage.touch("images/dish.jpg") and not storage.touch("images/missing.jpg")
+    assert [(obj.path, obj.size) for obj in storage.iter_objects()] == [("images/dish.jpg", 5)]
+    assert storage.url("images/dish.jpg") == "/uploads/images/dish.jpg"
+    assert storage.download_url("images/dish.jpg", 60) is None
+
+    storage.quarantine("images/dish.jpg", str(tmp_path / "quarantine"))
+    assert (tmp_path / "quarantine" / "images" / "dish.jpg").read_bytes() == b"image"
+    assert not storage.delete("images/dish.jpg")
@@ -0,0 +1,45 @@
+"""Потоковые страницы (StreamingTemplateResponse) рендерятся целиком вне сессии БД"""
+import pytest
+
+from conftest import add_products, login
+
+STREAMED_PAGES = [
+    "/restaurants/{r}",
+    "/restaurants/{r}/sections/{s}/categories/{c}",
+]
+
+
+@pytest.mark.parametrize("page", STREAMED_PAGES)
+def test_manager_restaurant_page_renders(client, menus, page):
+    menu = menus["manager"]
+    login(client, menus["manager_username"])
+
+    response = client.get(menu.url(page))
+
+    assert response.status_code == 200
+    assert "Ресторан менеджера" in response.text
+    assert response.text.rstrip().endswith("</html>")
+
+
+def test_large_category_page_is_streamed_completely(client, db, menus):
+    menu = menus["manager"]
+    # Больше одной пачки STREAM_CHUNK_SIZE
+    add_products(db, menu.category_id, menu.restaurant_id, 200)
+    login(client, menus["manager_username"])
+
+    response = client.get(menu.url("/restaurants/{r}/sections/{s}/categories/{c}"))
+
+    assert response.status_code == 200
+    # Название ресторана и раздела в шаблоне берутся из связей категории
+    assert "Ресторан менеджера: раздел" in response.text
+    assert response.text.count("product-card") >= 200
+    assert response.text.rstrip().endswith("</html>")
+
+
+def test_recent_changes_page_renders(client, menus):
+    login(client, menus["manager_username"])
+
+    response = client.get("/recent-changes")
+
+    assert response.status_code == 200
+    assert "Ресторан менеджера" in response.text
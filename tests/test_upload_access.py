@@ -0,0 +1,91 @@
+"""Проверка доступа к /uploads: рестораны изображения ищутся по индексу и кэшируются"""
+import os
+
+import pytest
+from fastapi.testclient import TestClient
+from starlette.applications import Starlette
+from starlette.routing import Mount
+
+from app.domain.entities.schemas import ProductCreate, ProductUpdate
+from app.infrastructure.database.database import engine
+from app.infrastructure.repositories import crud
+from app.infrastructure.storage.local import LocalStorage
+from app.presentation.web.uploads import UploadFiles
+
+from conftest import login
+
+
+@pytest.fixture
+def storage(tmp_path):
+    return LocalStorage(str(tmp_path), "/uploads")
+
+
+@pytest.fixture
+def uploads(storage):
+    app = Starlette(routes=[Mount("/uploads", app=UploadFiles(storage=storage, access_control=True))])
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+def _write_file(storage, path):
+    full_path = os.path.join(storage.local_directory, *path.split("/"))
+    os.makedirs(os.path.dirname(full_path), exist_ok=True)
+    with open(full_path, "wb") as file:
+        file.write(b"image")
+
+
+def _add_image_product(db, storage, menu, path):
+    _write_file(storage, path)
+    return crud.create_product(db, ProductCreate(
+        title="С фото", ingredients="-", category_id=menu.category_id,
+        restaurant_id=menu.restaurant_id, image_path=path,
+    ))
+
+
+def test_private_image_requires_access(uploads, db, storage, menus):
+    _add_image_product(db, storage, menus["manager"], "images/private.jpg")
+
+    assert uploads.get("/uploads/images/private.jpg").status_code == 403
+    login(uploads, menus["manager_username"])
+    response = uploads.get("/uploads/images/private.jpg")
+    assert response.status_code == 200
+    assert response.headers["vary"] == "cookie"
+
+
+def test_image_restaurants_are_cached(uploads, db, storage, menus, count_queries):
+    _add_image_product(db, storage, menus["demo"], "images/cached.jpg")
+    _write_file(storage, "images/cached_480w.webp")
+    assert uploads.get("/uploads/images/cached.jpg").status_code == 200
+
+    # Копия того же изображения - тот же ключ: повторный поиск продуктов не нужен
+    with count_queries() as counter:
+        assert uploads.get("/uploads/images/cached_480w.webp").status_code == 200
+    assert not [statement for statement in counter.statements if "products" in statement]
+
+
+def test_image_access_follows_product_changes(uploads, db, storage, menus):
+    product = _add_image_product(db, storage, menus["manager"], "images/shared.jpg")
+    assert uploads.get("/uploads/images/shared.jpg").status_code == 403
+
+    # То же изображение в демо-меню становится публичным сразу, без ожидания TTL
+    demo_product = _add_image_product(db, storage, menus["demo"], "images/shared.jpg")
+    assert uploads.get("/uploads/images/shared.jpg").status_code == 200
+
+    crud.delete_product(db, demo_product.id)
+    assert uploads.get("/uploads/images/shared.jpg").status_code == 403
+
+    _write_file(storage, "images/other.jpg")
+    crud.update_product(db, product.id, ProductUpdate(image_path="images/other.jpg"))
+    assert product.image_key == "images/other"
+    assert crud.get_image_restaurant_ids(db, "images/shared") == []
+
+
+def test_image_lookup_uses_index(db, menus, count_queries):
+    with count_queries() as counter:
+        crud.get_image_restaurant_ids(db, "images/any")
+    [statement] = counter.statements
+    [parameters] = counter.parameters
+    with engine.connect() as conn:
+        plan = conn.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters).all()
+
+    assert "ix_products_image_key" in "\n".join(row[-1] for row in plan)